@@ -39,6 +39,9 @@ def build_exe():
         '--hidden-import=PyQt5.QtCore',
         '--hidden-import=PyQt5.QtGui',
         '--hidden-import=PyQt5.QtWidgets',
+        '--hidden-import=PyQt5.QtNetwork',
+        # pomodoro 包中按需导入的子模块
+        '--collect-submodules=pomodoro',
         'pomodoro_timer.py'
     ]
     
@@ -0,0 +1,106 @@
+"""启动导入耗时检查
+
+用 python -X importtime 测量启动时导入 pomodoro.app 的耗时，超过预算或者
+启动时导入了应当按需导入的模块时返回非零退出码，可以在提交前或打包前运行：
+
+    python check_import_time.py
+    python check_import_time.py --budget-ms 150 --runs 7
+"""
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+from typing import Dict, List, Tuple
+
+# 默认检查的启动模块
+DEFAULT_MODULE = "pomodoro.app"
+
+# 启动导入总耗时预算（毫秒）
+DEFAULT_BUDGET_MS = 120.0
+
+# 启动时不应导入的模块（第一次使用时才导入）
+LAZY_MODULES = (
+    "pomodoro.analytics",
+    "pomodoro.chart",
+    "pomodoro.export",
+    "pomodoro.heatmap",
+    "pomodoro.importer",
+    "pomodoro.migrate",
+    "pomodoro.replay",
+    "pomodoro.report",
+    "pomodoro.scene_chart",
+    "pomodoro.snapshot",
+    "numpy",
+    "pyarrow",
+)
+
+
+def parse_importtime(output: str) -> Tuple[float, Dict[str, Tuple[int, int]]]:
+    """解析 -X importtime 的输出，返回 (总耗时毫秒, {模块: (自身微秒, 累计微秒)})"""
+    modules: Dict[str, Tuple[int, int]] = {}
+    total_us = 0
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        # 模块名前的缩进表示嵌套层级，只有最外层的累计耗时计入总耗时
+        depth = len(name) - len(name.lstrip()) - 1
+        name = name.strip()
+        modules[name] = (int(self_us), int(cumulative_us))
+        if depth == 0:
+            total_us += int(cumulative_us)
+    return total_us / 1000, modules
+
+
+def measure(module: str, project_dir: str) -> Tuple[float, Dict[str, Tuple[int, int]]]:
+    env = dict(os.environ)
+    # 与正常启动一样使用已编译的字节码
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=project_dir, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"导入 {module} 失败:\n{result.stderr}")
+    return parse_importtime(result.stderr)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="检查番茄计时器启动时的导入耗时")
+    parser.add_argument("--module", default=DEFAULT_MODULE, help="启动时导入的模块")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="导入耗时预算（毫秒）")
+    parser.add_argument("--runs", type=int, default=5, help="测量次数，取中位数")
+    parser.add_argument("--top", type=int, default=10, help="列出耗时最多的模块数量")
+    args = parser.parse_args(argv)
+
+    project_dir = os.path.dirname(os.path.abspath(__file__))
+
+    # 第一次运行用于生成字节码和预热磁盘缓存，不计入结果
+    measure(args.module, project_dir)
+    totals: List[float] = []
+    modules: Dict[str, Tuple[int, int]] = {}
+    for _ in range(max(1, args.runs)):
+        total_ms, modules = measure(args.module, project_dir)
+        totals.append(total_ms)
+    median_ms = statistics.median(totals)
+
+    print(f"导入 {args.module}: 中位数 {median_ms:.1f} ms（{len(totals)} 次，"
+          f"最少 {min(totals):.1f} ms，最多 {max(totals):.1f} ms），预算 {args.budget_ms:.0f} ms")
+    print(f"共导入 {len(modules)} 个模块，自身耗时最多的模块:")
+    for name, (self_us, cumulative_us) in sorted(modules.items(), key=lambda item: -item[1][0])[:args.top]:
+        print(f"  {self_us / 1000:8.1f} ms  (累计 {cumulative_us / 1000:8.1f} ms)  {name}")
+
+    failed = False
+    eager = [name for name in LAZY_MODULES if name in modules]
+    if eager:
+        print(f"错误: 启动时导入了应当按需导入的模块: {', '.join(eager)}")
+        failed = True
+    if median_ms > args.budget_ms:
+        print(f"错误: 导入耗时 {median_ms:.1f} ms 超出预算 {args.budget_ms:.0f} ms")
+        failed = True
+    if not failed:
+        print("通过")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
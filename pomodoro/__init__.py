@@ -0,0 +1,71 @@
+"""番茄工作法计时器
+
+启动时只导入计时器本身需要的模块（engine、app、tray、storage、model、sessions、dayclock、instance、watchdog），
+报告、图表、趋势分析和导入导出等子系统在第一次使用时才导入。
+通过 pomodoro.report 这样的属性访问子模块时也会按需导入。
+"""
+import importlib
+import sys
+
+# 按需导入的子系统
+LAZY_SUBMODULES = (
+    "analytics",
+    "chart",
+    "export",
+    "heatmap",
+    "importer",
+    "migrate",
+    "replay",
+    "report",
+    "scene_chart",
+    "snapshot",
+)
+
+
+def __getattr__(name):
+    if name in LAZY_SUBMODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def main() -> int:
+    """启动计时器，返回退出码"""
+    from .storage import get_app_dir
+    from .instance import SingleInstance
+
+    # 同一数据目录只允许运行一个实例，再次启动时通知已运行的实例显示窗口后立即退出。
+    # 此时还没有导入界面模块，第二个实例可以很快退出
+    instance = SingleInstance(get_app_dir())
+    if not instance.try_lock():
+        instance.notify_running_instance()
+        return 0
+
+    from PyQt5.QtWidgets import QApplication
+    from .tray import TrayController, tray_available
+
+    app = QApplication(sys.argv)
+    instance.listen()
+    # 后台检测界面卡顿，记录到 pomodoro_stalls.jsonl
+    from .watchdog import StallWatchdog
+    watchdog = StallWatchdog()
+    watchdog.start()
+    if tray_available():
+        # 托盘模式：关闭窗口后计时继续，窗口在需要时重新创建
+        controller = TrayController()
+        # 只剩托盘图标时暂停卡顿检测，不再每秒多次唤醒
+        controller.window_visible.connect(watchdog.set_active)
+        instance.activation_requested.connect(controller.show_window)
+        controller.start()
+        engine = controller.engine
+    else:
+        from .app import PomodoroTimer
+        window = PomodoroTimer()
+        instance.activation_requested.connect(window.bring_to_front)
+        window.show()
+        engine = window.engine
+    # 注销、关机或其他途径退出时也保存状态和数据（已经保存过时不再重复）
+    app.aboutToQuit.connect(engine.shutdown)
+    exit_code = app.exec_()
+    watchdog.stop()
+    instance.release()
+    return exit_code
@@ -0,0 +1,5 @@
+import sys
+
+from pomodoro import main
+
+sys.exit(main())
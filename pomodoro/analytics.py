@@ -0,0 +1,258 @@
+import sys
+import time
+from datetime import date, timedelta
+from operator import mul
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # numpy 是可选依赖，没有时使用纯Python实现
+    np = None
+
+from .model import HistoryModel
+from .store import HistoryStore
+
+# 趋势线使用最近多少天的数据
+TREND_DAYS = 28
+# 指数加权移动平均的跨度（天）
+EWMA_SPANS = (7, 28)
+# 星期规律使用最近多少周的数据
+SEASON_WEEKS = 12
+
+WEEKDAY_NAMES = ("周一", "周二", "周三", "周四", "周五", "周六", "周日")
+
+
+def date_ordinal(key: str) -> int:
+    # 手动解析 YYYY-MM-DD，比 strptime 快一个数量级
+    return date(int(key[:4]), int(key[5:7]), int(key[8:10])).toordinal()
+
+
+# 分析的数据来源：历史数据查询接口（包括归档）、HistoryModel 或 {日期: 记录} 映射
+HistorySource = Union[HistoryStore, Mapping[str, Mapping[str, Any]]]
+
+
+def _history_columns(history: HistorySource, field: str):
+    # HistoryStore 和 HistoryModel 直接提供整列数据，避免逐条创建记录视图
+    if isinstance(history, (HistoryStore, HistoryModel)):
+        return history.column(field)
+    keys = list(history.keys())
+    return keys, [history[key].get(field, 0) for key in keys]
+
+
+def daily_series_numpy(history: HistorySource, field: str = "work_time",
+                       end: Optional[date] = None):
+    """daily_series 的 numpy 版本，日期解析和展开都在C代码中完成"""
+    keys, values = _history_columns(history, field)
+    if not keys:
+        return None, np.zeros(0)
+
+    days = np.array(keys, dtype="datetime64[D]").astype(np.int64)
+    first = int(days.min())
+    last = int(days.max())
+    if end is not None:
+        last = max(last, int(np.datetime64(end, "D").astype(np.int64)))
+
+    series = np.zeros(last - first + 1, dtype=np.float64)
+    series[days - first] = np.asarray(values, dtype=np.float64)
+    return date(1970, 1, 1) + timedelta(days=first), series
+
+
+def daily_series(history: HistorySource, field: str = "work_time",
+                 end: Optional[date] = None) -> Tuple[Optional[date], List[int]]:
+    """把历史数据展开为逐日连续的序列（没有记录的日期为0）
+
+    返回 (第一天, 数值列表)；end 不为空时序列延伸到 end 当天。
+    """
+    keys, values = _history_columns(history, field)
+    if not keys:
+        return None, []
+
+    ordinals = [date_ordinal(key) for key in keys]
+    first = min(ordinals)
+    last = max(ordinals)
+    if end is not None:
+        last = max(last, end.toordinal())
+
+    series = [0] * (last - first + 1)
+    for ordinal, value in zip(ordinals, values):
+        series[ordinal - first] = value
+    return date.fromordinal(first), series
+
+
+# ---------------------------------------------------------------------------
+# 计算（numpy 实现与纯Python实现结果一致）
+# ---------------------------------------------------------------------------
+
+def _slope_numpy(y) -> float:
+    n = len(y)
+    if n < 2:
+        return 0.0
+    x = np.arange(n, dtype=np.float64)
+    x -= x.mean()
+    return float(np.dot(x, y - y.mean()) / np.dot(x, x))
+
+
+def _slope_python(y: Sequence[float]) -> float:
+    # 最小二乘直线的斜率，使用闭式求和
+    n = len(y)
+    if n < 2:
+        return 0.0
+    sum_x = n * (n - 1) / 2
+    sum_xx = (n - 1) * n * (2 * n - 1) / 6
+    sum_y = sum(y)
+    sum_xy = sum(map(mul, range(n), y))
+    return (n * sum_xy - sum_x * sum_y) / (n * sum_xx - sum_x * sum_x)
+
+
+def _ewma_numpy(y, span: int) -> float:
+    # 调整权重的指数加权平均（与 pandas 的 adjust=True 相同），只需要最后一个值
+    if len(y) == 0:
+        return 0.0
+    alpha = 2 / (span + 1)
+    weights = (1 - alpha) ** np.arange(len(y) - 1, -1, -1, dtype=np.float64)
+    return float(np.dot(weights, y) / weights.sum())
+
+
+def _ewma_python(y: Sequence[float], span: int) -> float:
+    if not y:
+        return 0.0
+    decay = 1 - 2 / (span + 1)
+    numerator = denominator = 0.0
+    for value in y:
+        numerator = numerator * decay + value
+        denominator = denominator * decay + 1
+    return numerator / denominator
+
+
+def _weekday_means_numpy(y, first_weekday: int) -> List[float]:
+    weekdays = (np.arange(len(y)) + first_weekday) % 7
+    sums = np.bincount(weekdays, weights=y, minlength=7)
+    counts = np.bincount(weekdays, minlength=7)
+    return [float(s / c) if c else 0.0 for s, c in zip(sums, counts)]
+
+
+def _weekday_means_python(y: Sequence[float], first_weekday: int) -> List[float]:
+    sums = [0.0] * 7
+    counts = [0] * 7
+    for offset in range(7):
+        # 同一星期的数据在序列中间隔7个元素，直接切片求和
+        column = y[offset::7]
+        weekday = (first_weekday + offset) % 7
+        sums[weekday] += sum(column)
+        counts[weekday] += len(column)
+    return [s / c if c else 0.0 for s, c in zip(sums, counts)]
+
+
+class TrendSummary:
+    """学习时间的趋势分析结果（时间单位均为秒）"""
+
+    __slots__ = ("days", "total", "mean", "slope", "ewma", "weekday_means", "weekday_index",
+                 "forecast", "forecast_total", "last_week_total", "backend")
+
+    def __init__(self):
+        self.days = 0
+        self.total = 0
+        self.mean = 0.0
+        # 最近 TREND_DAYS 天的趋势，每天增加的秒数
+        self.slope = 0.0
+        # {跨度: 指数加权平均}
+        self.ewma: Dict[int, float] = {}
+        # 周一到周日的平均值和相对整体平均的季节指数
+        self.weekday_means: List[float] = [0.0] * 7
+        self.weekday_index: List[float] = [1.0] * 7
+        # 接下来7天（从明天开始）每天的预测值
+        self.forecast: List[Tuple[date, float]] = []
+        self.forecast_total = 0.0
+        self.last_week_total = 0
+        self.backend = "numpy" if np is not None else "python"
+
+    def best_weekday(self) -> Optional[int]:
+        if not any(self.weekday_means):
+            return None
+        return max(range(7), key=lambda i: self.weekday_means[i])
+
+
+def analyze(history: HistorySource, today: date,
+            use_numpy: Optional[bool] = None) -> TrendSummary:
+    """对全部历史的每日工作时间做趋势、加权平均、星期规律和下周预测"""
+    if use_numpy is None:
+        use_numpy = np is not None
+    summary = TrendSummary()
+    summary.backend = "numpy" if use_numpy else "python"
+
+    if use_numpy:
+        first, series = daily_series_numpy(history, "work_time", end=today)
+    else:
+        first, series = daily_series(history, "work_time", end=today)
+    if first is None:
+        return summary
+    # 只分析到今天为止的数据
+    series = series[:today.toordinal() - first.toordinal() + 1]
+    if len(series) == 0:
+        return summary
+
+    season_length = min(len(series), SEASON_WEEKS * 7)
+    season_first_weekday = (today - timedelta(days=season_length - 1)).weekday()
+
+    if use_numpy:
+        summary.total = int(series.sum())
+        summary.slope = _slope_numpy(series[-TREND_DAYS:])
+        summary.ewma = {span: _ewma_numpy(series, span) for span in EWMA_SPANS}
+        summary.weekday_means = _weekday_means_numpy(series[-season_length:], season_first_weekday)
+        summary.last_week_total = int(series[-7:].sum())
+    else:
+        summary.total = sum(series)
+        summary.slope = _slope_python(series[-TREND_DAYS:])
+        summary.ewma = {span: _ewma_python(series, span) for span in EWMA_SPANS}
+        summary.weekday_means = _weekday_means_python(series[-season_length:], season_first_weekday)
+        summary.last_week_total = sum(series[-7:])
+
+    summary.days = len(series)
+    summary.mean = summary.total / len(series)
+
+    season_mean = sum(summary.weekday_means) / 7
+    if season_mean > 0:
+        summary.weekday_index = [m / season_mean for m in summary.weekday_means]
+
+    # 预测：以较长跨度的加权平均为水平，叠加近期趋势，再乘以星期指数
+    level = summary.ewma[EWMA_SPANS[-1]]
+    for h in range(1, 8):
+        day = today + timedelta(days=h)
+        value = max(0.0, (level + summary.slope * h) * summary.weekday_index[day.weekday()])
+        summary.forecast.append((day, value))
+    summary.forecast_total = sum(value for _, value in summary.forecast)
+    return summary
+
+
+class TrendAnalyzer:
+    """缓存趋势分析结果，直到历史数据版本或日期变化"""
+
+    def __init__(self):
+        self.key = None
+        self.summary: Optional[TrendSummary] = None
+
+    def get(self, history: HistorySource, data_version: int,
+            today: date) -> TrendSummary:
+        key = (data_version, today)
+        if self.summary is None or self.key != key:
+            self.summary = analyze(history, today)
+            self.key = key
+        return self.summary
+
+
+if __name__ == "__main__":
+    # 基准测试：python -m pomodoro.analytics [年数]
+    import random
+    years = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    today = date.today()
+    model = HistoryModel()
+    for i in range(years * 365):
+        day = today - timedelta(days=i)
+        model[day.strftime("%Y-%m-%d")] = {"work_time": random.randint(0, 8 * 3600)}
+
+    for use_numpy in ((True, False) if np is not None else (False,)):
+        start = time.perf_counter()
+        summary = analyze(model, today, use_numpy)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{summary.backend:>6}: {summary.days} 天, {elapsed:.2f} ms, "
+              f"下周预测 {summary.forecast_total / 3600:.1f} 小时")
@@ -0,0 +1,548 @@
+import os
+from typing import Optional, Dict, Any
+from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
+                            QPushButton, QLabel, QTabWidget, QGridLayout, QMessageBox,
+                            QFrame, QFileDialog)
+from PyQt5.QtCore import Qt, QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt5.QtGui import QFont
+
+from .engine import TimerEngine, MODE_COLORS, format_hms
+from . import dayclock
+
+# 报告、图表、导入导出等子系统在第一次使用时才导入（包括 numpy 等较重的依赖），
+# 保证启动时只加载计时器本身需要的模块，见 check_import_time.py
+
+# 历史图表的绘制方式："raster" 使用缓存位图的自绘控件，"scene" 使用原来的 QGraphicsScene
+CHART_BACKEND = os.environ.get("POMODORO_CHART_BACKEND", "raster")
+# 历史图表显示最近多少天有记录的数据
+HISTORY_CHART_DAYS = 7
+
+# 开始按钮在计时中（显示“暂停”）和未计时时的样式
+RUNNING_BUTTON_STYLE = """
+    QPushButton {
+        background-color: #3498db;
+        font-size: 16px;
+    }
+    QPushButton:hover {
+        background-color: #2980b9;
+    }
+"""
+STOPPED_BUTTON_STYLE = """
+    QPushButton {
+        background-color: #e74c3c;
+        font-size: 16px;
+    }
+    QPushButton:hover {
+        background-color: #c0392b;
+    }
+"""
+
+class _ImportSignals(QObject):
+    # 已处理的行数
+    progress = pyqtSignal(int)
+    # 导入完成：(统计信息, 错误信息，成功时为空)
+    finished = pyqtSignal(object, str)
+
+
+class _ImportTask(QRunnable):
+    """在工作线程中导入数据，只通过文件锁修改历史文件和会话日志，不接触界面线程中的数据"""
+
+    def __init__(self, paths, app_dir: str):
+        super().__init__()
+        self.paths = paths
+        self.app_dir = app_dir
+        self.signals = _ImportSignals()
+
+    def run(self):
+        from .importer import ImportStats, import_files
+        stats = ImportStats()
+        error = ""
+        try:
+            stats = import_files(self.paths, self.app_dir,
+                                 progress=lambda current: self.signals.progress.emit(current.rows))
+        except Exception as e:
+            error = str(e)
+        self.signals.finished.emit(stats, error)
+
+
+class PomodoroTimer(QMainWindow):
+    def __init__(self, engine: Optional[TimerEngine] = None, app_dir=None):
+        super().__init__()
+        self.setWindowTitle("番茄工作法计时器")
+        self.setGeometry(300, 300, 800, 600)
+        
+        # 计时状态和数据保存在 TimerEngine 中。没有传入时由窗口自己创建，关闭窗口即退出程序；
+        # 托盘模式下由 TrayController 创建，窗口可以随时销毁、重新创建
+        self.owns_engine = engine is None
+        self.engine = engine or TimerEngine(app_dir, self)
+        self.app_dir = self.engine.app_dir
+        
+        # 设置应用程序样式
+        self.setStyleSheet("""
+            QMainWindow {
+                background-color: #f5f5f5;
+            }
+            QTabWidget::pane {
+                border: 1px solid #cccccc;
+                background-color: #ffffff;
+                border-radius: 5px;
+            }
+            QTabBar::tab {
+                background-color: #e0e0e0;
+                color: #505050;
+                min-width: 80px;
+                padding: 8px 16px;
+                border-top-left-radius: 5px;
+                border-top-right-radius: 5px;
+                margin-right: 2px;
+            }
+            QTabBar::tab:selected {
+                background-color: #ffffff;
+                color: #e74c3c;
+                font-weight: bold;
+            }
+            QPushButton {
+                background-color: #3498db;
+                color: white;
+                border: none;
+                padding: 10px 20px;
+                border-radius: 5px;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background-color: #2980b9;
+            }
+            QPushButton:pressed {
+                background-color: #1c6ea4;
+            }
+            QPushButton:disabled {
+                background-color: #cccccc;
+                color: #888888;
+            }
+            QLabel {
+                color: #333333;
+            }
+            QGraphicsView {
+                background-color: #ffffff;
+                border: 1px solid #dddddd;
+                border-radius: 5px;
+            }
+            QDialog {
+                background-color: #ffffff;
+            }
+            QTextEdit {
+                background-color: #f8f9fa;
+                border: 1px solid #e0e0e0;
+                border-radius: 5px;
+                padding: 10px;
+                color: #333333;
+                font-size: 14px;
+            }
+        """)
+        
+        # 报告引擎、报告对话框和趋势分析在第一次查看报告时创建
+        self.report_engine = None
+        self.report_dialog = None
+        self.trend_analyzer = None
+        # 正在进行的导入任务
+        self.import_task = None
+        # 界面上当前显示的内容，刷新时只重新设置发生变化的部分
+        self.shown: Dict[str, Any] = {}
+        
+        # 创建UI
+        self.init_ui()
+        
+        # 计时状态变化时刷新界面
+        self.engine.changed.connect(self.refresh)
+        self.engine.history_changed.connect(self.update_history_display)
+        self.engine.notify.connect(self.show_information)
+        self.engine.warning.connect(self.show_warning)
+        self.refresh()
+        
+        # 恢复之前的状态（如果有）
+        if self.owns_engine:
+            self.engine.load_state()
+        
+    def init_ui(self):
+        # 创建主窗口部件
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+        
+        # 创建主布局
+        main_layout = QVBoxLayout(central_widget)
+        main_layout.setContentsMargins(20, 20, 20, 20)
+        main_layout.setSpacing(15)
+        
+        # 创建选项卡
+        self.tabs = QTabWidget()
+        main_layout.addWidget(self.tabs)
+        
+        # 计时器选项卡
+        timer_tab = QWidget()
+        timer_layout = QVBoxLayout(timer_tab)
+        timer_layout.setContentsMargins(20, 20, 20, 20)
+        timer_layout.setSpacing(20)
+        
+        # 添加计时器显示框
+        timer_frame = QFrame()
+        timer_frame.setFrameShape(QFrame.StyledPanel)
+        timer_frame.setStyleSheet("""
+            QFrame {
+                background-color: #ffffff;
+                border-radius: 10px;
+                border: 1px solid #e0e0e0;
+            }
+        """)
+        timer_frame_layout = QVBoxLayout(timer_frame)
+        
+        # 添加计时器显示
+        self.time_display = QLabel("25:00")
+        self.time_display.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.time_display.setFont(QFont("Arial", 72, QFont.Bold))
+        self.time_display.setStyleSheet("""
+            color: #e74c3c;
+            margin: 10px;
+        """)
+        timer_frame_layout.addWidget(self.time_display)
+        
+        # 添加状态显示
+        self.status_label = QLabel("准备开始工作")
+        self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.status_label.setFont(QFont("Arial", 16))
+        self.status_label.setStyleSheet("color: #7f8c8d; margin-bottom: 10px;")
+        timer_frame_layout.addWidget(self.status_label)
+        
+        timer_layout.addWidget(timer_frame)
+        
+        # 添加今日统计
+        stats_frame = QFrame()
+        stats_frame.setFrameShape(QFrame.StyledPanel)
+        stats_frame.setStyleSheet("""
+            QFrame {
+                background-color: #ffffff;
+                border-radius: 10px;
+                border: 1px solid #e0e0e0;
+                padding: 10px;
+            }
+            QLabel {
+                color: #333333;
+                font-size: 14px;
+            }
+        """)
+        stats_layout = QGridLayout(stats_frame)
+        stats_layout.setSpacing(10)
+        
+        stats_layout.addWidget(QLabel("今日工作时间:"), 0, 0)
+        self.work_time_label = QLabel("00:00:00")
+        self.work_time_label.setStyleSheet("color: #3498db; font-weight: bold;")
+        stats_layout.addWidget(self.work_time_label, 0, 1)
+        
+        stats_layout.addWidget(QLabel("今日休息时间:"), 1, 0)
+        self.break_time_label = QLabel("00:00:00")
+        self.break_time_label.setStyleSheet("color: #2ecc71; font-weight: bold;")
+        stats_layout.addWidget(self.break_time_label, 1, 1)
+        
+        stats_layout.addWidget(QLabel("今日空闲休息时间:"), 2, 0)
+        self.idle_time_label = QLabel("00:00:00")
+        self.idle_time_label.setStyleSheet("color: #f39c12; font-weight: bold;")
+        stats_layout.addWidget(self.idle_time_label, 2, 1)
+        
+        timer_layout.addWidget(stats_frame)
+        
+        # 添加按钮
+        button_layout = QHBoxLayout()
+        button_layout.setSpacing(15)
+        
+        self.start_button = QPushButton("开始")
+        self.start_button.setMinimumHeight(50)
+        self.start_button.setStyleSheet(STOPPED_BUTTON_STYLE)
+        self.start_button.clicked.connect(self.toggle_timer)
+        button_layout.addWidget(self.start_button)
+        
+        self.idle_break_button = QPushButton("空闲休息")
+        self.idle_break_button.setMinimumHeight(50)
+        self.idle_break_button.setStyleSheet("""
+            QPushButton {
+                background-color: #f39c12;
+                font-size: 16px;
+            }
+            QPushButton:hover {
+                background-color: #d35400;
+            }
+        """)
+        self.idle_break_button.clicked.connect(self.toggle_idle_break)
+        button_layout.addWidget(self.idle_break_button)
+        
+        self.reset_button = QPushButton("重置")
+        self.reset_button.setMinimumHeight(50)
+        self.reset_button.setStyleSheet("""
+            QPushButton {
+                background-color: #7f8c8d;
+                font-size: 16px;
+            }
+            QPushButton:hover {
+                background-color: #636e72;
+            }
+        """)
+        self.reset_button.clicked.connect(self.reset_timer)
+        button_layout.addWidget(self.reset_button)
+        
+        timer_layout.addLayout(button_layout)
+        
+        # 添加查看报告按钮
+        report_button = QPushButton("查看学习报告")
+        report_button.setMinimumHeight(40)
+        report_button.setStyleSheet("""
+            QPushButton {
+                background-color: #2ecc71;
+                font-size: 14px;
+                margin-top: 10px;
+            }
+            QPushButton:hover {
+                background-color: #27ae60;
+            }
+        """)
+        report_button.clicked.connect(self.show_report)
+        timer_layout.addWidget(report_button)
+        
+        # 历史记录选项卡
+        self.history_tab = QWidget()
+        history_layout = QVBoxLayout(self.history_tab)
+        history_layout.setContentsMargins(20, 20, 20, 20)
+        
+        history_title = QLabel("每日时间统计")
+        history_title.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        history_title.setFont(QFont("Arial", 16, QFont.Bold))
+        history_title.setStyleSheet("color: #2c3e50; margin-bottom: 15px;")
+        history_layout.addWidget(history_title)
+        
+        # 图表在第一次切换到历史记录选项卡时创建，这里只留出位置
+        self.chart_view = None
+        self.chart_widget = None
+        self.heatmap = None
+        self.chart_layout = QVBoxLayout()
+        history_layout.addLayout(self.chart_layout, 1)
+        
+        # 添加导出按钮
+        export_layout = QHBoxLayout()
+        export_layout.setSpacing(15)
+        
+        export_days_button = QPushButton("导出每日记录")
+        export_days_button.clicked.connect(lambda: self.export_records("days"))
+        export_layout.addWidget(export_days_button)
+        
+        export_sessions_button = QPushButton("导出会话记录")
+        export_sessions_button.clicked.connect(lambda: self.export_records("sessions"))
+        export_layout.addWidget(export_sessions_button)
+        
+        self.import_button = QPushButton("导入数据")
+        self.import_button.clicked.connect(self.import_records)
+        export_layout.addWidget(self.import_button)
+        
+        history_layout.addLayout(export_layout)
+        
+        # 添加选项卡到主选项卡窗口
+        self.tabs.addTab(timer_tab, "计时器")
+        self.tabs.addTab(self.history_tab, "历史记录")
+        self.tabs.currentChanged.connect(self.on_tab_changed)
+        
+    def on_tab_changed(self, index):
+        if self.tabs.widget(index) is self.history_tab and self.chart_widget is None:
+            self.create_chart()
+            self.update_history_display()
+        
+    def create_chart(self):
+        # 创建历史图表，POMODORO_CHART_BACKEND=scene 时使用原来的 QGraphicsScene 图表
+        if CHART_BACKEND == "raster":
+            from PyQt5.QtWidgets import QScrollArea
+            from .chart import HistoryChartWidget
+            self.chart_view = QScrollArea()
+            self.chart_view.setWidgetResizable(True)
+            self.chart_widget = HistoryChartWidget()
+            self.chart_view.setWidget(self.chart_widget)
+        else:
+            from .scene_chart import HistorySceneChart
+            self.chart_widget = self.chart_view = HistorySceneChart()
+        self.chart_view.setMinimumHeight(300)
+        self.chart_view.setStyleSheet("""
+            QGraphicsView, QScrollArea {
+                background-color: #ffffff;
+                border: 1px solid #e0e0e0;
+                border-radius: 10px;
+            }
+        """)
+        self.chart_layout.addWidget(self.chart_view)
+        
+        # 全年学习日历
+        from .heatmap import YearHeatmapPanel
+        self.heatmap = YearHeatmapPanel(self.engine.history_store)
+        self.chart_layout.addWidget(self.heatmap)
+        
+    def toggle_timer(self):
+        self.engine.toggle_timer()
+        
+    def toggle_idle_break(self):
+        self.engine.toggle_idle_break()
+        
+    def reset_timer(self):
+        self.engine.reset_timer()
+    
+    def refresh(self):
+        # 按计时器的状态刷新界面。计时时每秒调用一次，设置样式表的代价较高，只设置变化的部分
+        engine = self.engine
+        color = MODE_COLORS[engine.mode]
+        self.update_shown("time", engine.display_time(), self.time_display.setText)
+        self.update_shown("time_style", f"color: {color}; margin: 10px;", self.time_display.setStyleSheet)
+        self.update_shown("status", engine.status_text, self.status_label.setText)
+        if engine.status_active:
+            status_style = f"color: {color}; margin-bottom: 10px; font-weight: bold;"
+        else:
+            status_style = "color: #7f8c8d; margin-bottom: 10px;"
+        self.update_shown("status_style", status_style, self.status_label.setStyleSheet)
+        
+        self.update_shown("start", engine.start_label, self.start_button.setText)
+        self.update_shown("start_style", RUNNING_BUTTON_STYLE if engine.is_running else STOPPED_BUTTON_STYLE,
+                          self.start_button.setStyleSheet)
+        # 空闲休息时禁用开始按钮
+        self.update_shown("start_enabled", not engine.is_idle_break, self.start_button.setEnabled)
+        self.update_shown("idle", "结束空闲休息" if engine.is_idle_break else "空闲休息",
+                          self.idle_break_button.setText)
+        
+        # 更新今日统计显示
+        self.update_shown("work_time", format_hms(engine.today_work_time), self.work_time_label.setText)
+        self.update_shown("break_time", format_hms(engine.today_break_time), self.break_time_label.setText)
+        self.update_shown("idle_time", format_hms(engine.display_idle_time()), self.idle_time_label.setText)
+        
+    def update_shown(self, key, value, setter):
+        if self.shown.get(key) != value:
+            self.shown[key] = value
+            setter(value)
+    
+    def show_information(self, title, text):
+        QMessageBox.information(self, title, text)
+    
+    def show_warning(self, title, text):
+        QMessageBox.warning(self, title, text)
+    
+    def bring_to_front(self):
+        # 再次启动程序时显示已运行的窗口
+        self.showNormal()
+        self.raise_()
+        self.activateWindow()
+    
+    def update_history_display(self):
+        # 更新历史记录图表，图表还没有创建时等到切换到历史记录选项卡再绘制
+        if not self.engine.history_data or self.chart_widget is None:
+            return
+            
+        # 最近7天有记录的数据，图表只在数据变化时重新绘制
+        self.chart_widget.set_data(self.engine.history_store.range(limit=HISTORY_CHART_DAYS))
+        # 日历只重绘数据变化的月份
+        self.heatmap.refresh()
+    
+    def export_records(self, kind):
+        # 导出每日记录或会话记录
+        title = "导出每日记录" if kind == "days" else "导出会话记录"
+        default_name = "pomodoro_days.csv" if kind == "days" else "pomodoro_sessions.csv"
+        path, _ = QFileDialog.getSaveFileName(
+            self, title, os.path.join(self.app_dir, default_name),
+            "CSV (*.csv);;JSON Lines (*.jsonl);;Parquet (*.parquet)")
+        if not path:
+            return
+        
+        # 导出前先保存当前数据
+        self.engine.save_history_data()
+        
+        from .export import export_data
+        try:
+            count = export_data(kind, path, app_dir=self.app_dir, store=self.engine.history_store)
+        except Exception as e:
+            print(f"导出失败: {e}")
+            QMessageBox.warning(self, "导出失败", f"无法导出数据到 {path}。\n错误信息: {e}")
+            return
+        QMessageBox.information(self, "导出完成", f"已导出 {count} 条记录到 {path}")
+    
+    def import_records(self):
+        # 从其他时间记录工具导入数据，同一时间只进行一个导入
+        if self.import_task is not None:
+            return
+        paths, _ = QFileDialog.getOpenFileNames(
+            self, "导入数据", self.app_dir,
+            "数据文件 (*.csv *.json *.jsonl);;所有文件 (*)")
+        if not paths:
+            return
+        
+        # 导入前先保存当前数据，导入在工作线程中进行，计时和界面不受影响
+        self.engine.save_history_data()
+        self.import_task = _ImportTask(paths, self.app_dir)
+        # 先由计时器合并导入的数据；托盘模式下窗口在导入期间被关闭时也会执行
+        engine = self.engine
+        self.import_task.signals.finished.connect(lambda stats, error: engine.history_imported())
+        self.import_task.signals.progress.connect(self.on_import_progress)
+        self.import_task.signals.finished.connect(self.on_import_finished)
+        self.import_button.setEnabled(False)
+        self.import_button.setText("导入中...")
+        QThreadPool.globalInstance().start(self.import_task)
+    
+    def on_import_progress(self, rows):
+        self.import_button.setText(f"导入中（{rows} 行）")
+    
+    def on_import_finished(self, stats, error):
+        self.import_task = None
+        self.import_button.setEnabled(True)
+        self.import_button.setText("导入数据")
+        if error:
+            print(f"导入失败: {error}")
+            QMessageBox.warning(self, "导入失败", f"导入数据时出错。\n错误信息: {error}")
+        QMessageBox.information(self, "导入完成", str(stats))
+    
+    def generate_daily_report(self, report_type=None):
+        # 报告在后台线程中渲染，未变化的数据直接使用缓存
+        from .report import ReportEngine, ReportDialog, REPORT_DAILY
+        from .analytics import TrendAnalyzer
+        if report_type is None:
+            report_type = REPORT_DAILY
+        if self.report_engine is None:
+            self.report_engine = ReportEngine(self)
+            self.trend_analyzer = TrendAnalyzer()
+        if self.report_dialog is None:
+            self.report_dialog = ReportDialog(self)
+            self.report_dialog.report_type_changed.connect(self.generate_daily_report)
+            self.report_engine.report_ready.connect(self.report_dialog.on_report_ready)
+        
+        today = dayclock.now().date()
+        engine = self.engine
+        key = self.report_engine.make_key(engine.data_version, report_type, today)
+        analytics = self.trend_analyzer.get(engine.history_store, engine.data_version, today)
+        html = self.report_engine.request(engine.history_store, engine.data_version, report_type, today, analytics)
+        self.report_dialog.show_report(key, html)
+        
+        # 显示对话框
+        self.report_dialog.show()
+        self.report_dialog.raise_()
+        self.report_dialog.activateWindow()
+    
+    def show_report(self):
+        # 手动显示学习报告前先保存当前数据
+        self.engine.save_history_data()
+        self.generate_daily_report()
+    
+    def closeEvent(self, event):
+        if self.owns_engine:
+            # 关闭窗口即退出程序，停止计时器并保存状态和数据
+            self.engine.shutdown()
+        else:
+            # 托盘模式下只销毁窗口，计时继续
+            self.detach()
+        event.accept()
+    
+    def detach(self):
+        # 断开与计时器的连接，窗口销毁后不再接收刷新
+        for signal, slot in ((self.engine.changed, self.refresh),
+                             (self.engine.history_changed, self.update_history_display),
+                             (self.engine.notify, self.show_information),
+                             (self.engine.warning, self.show_warning)):
+            try:
+                signal.disconnect(slot)
+            except TypeError:
+                pass
@@ -0,0 +1,253 @@
+import os
+import sys
+import json
+import importlib
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Optional, Dict, Any, Iterator, List, Mapping
+
+from .storage import (get_app_dir, file_lock, load_json, write_bytes_atomic, write_json_atomic,
+                      file_signature, HISTORY_FILE_NAME)
+from .model import DURATION_FIELDS
+
+# 归档目录和索引文件名
+ARCHIVE_DIR_NAME = "pomodoro_archive"
+INDEX_FILE_NAME = "index.json"
+
+# 热数据窗口（天）：历史文件至少保留最近这么多天，更早的整月数据移入归档段。
+# 不小于报告和趋势分析用到的天数，它们只需要读取热数据
+HOT_DAYS = 92
+
+# 同时保留在内存中的解压后的归档段数量
+SEGMENT_CACHE_SIZE = 4
+
+# 归档段的压缩方式：{名称: (扩展名, 模块名)}，lzma 压缩率更高，个别Python发行版没有 lzma 模块
+CODECS = {
+    "lzma": ("xz", "lzma"),
+    "zlib": ("zz", "zlib"),
+}
+
+
+def default_codec() -> str:
+    try:
+        import lzma  # noqa: F401
+        return "lzma"
+    except ImportError:
+        return "zlib"
+
+
+def compress(codec: str, data: bytes) -> bytes:
+    return importlib.import_module(CODECS[codec][1]).compress(data)
+
+
+def decompress(codec: str, data: bytes) -> bytes:
+    return importlib.import_module(CODECS[codec][1]).decompress(data)
+
+
+def archive_cutoff(today: date, hot_days: int = HOT_DAYS) -> str:
+    """冷热数据的分界日期：早于该日期的数据可以归档
+
+    只归档完整的月份，分界为 today - hot_days 所在月份的第一天。
+    """
+    return (today - timedelta(days=hot_days)).replace(day=1).strftime("%Y-%m-%d")
+
+
+def _day_bit(date_key: str) -> int:
+    return 1 << (int(date_key[8:10]) - 1)
+
+
+class HistoryArchive:
+    """按月压缩保存的历史数据归档
+
+    每个月一个压缩的归档段文件，写入后不再修改：同一个月份再次归档时写入新一代的文件，
+    索引指向新文件后删除旧文件。索引保存每个月的合计、包含哪些日期（按位）和最后修改时间，
+    只需要月合计或判断某天是否存在时不需要解压归档段。
+    """
+
+    def __init__(self, app_dir: str):
+        self.archive_dir = os.path.join(app_dir, ARCHIVE_DIR_NAME)
+        self.index_file = os.path.join(self.archive_dir, INDEX_FILE_NAME)
+        self.months: Dict[str, Dict[str, Any]] = {}
+        self.index_signature = None
+        # 解压后的归档段，以文件名为键（文件不会被修改，缓存不会过期）
+        self.segments: "OrderedDict[str, Dict[str, Dict[str, Any]]]" = OrderedDict()
+        self.refresh()
+
+    def refresh(self):
+        """索引文件被其他进程修改过时重新读取"""
+        signature = file_signature(self.index_file)
+        if signature == self.index_signature:
+            return
+        index = load_json(self.index_file, {}) or {}
+        self.months = index.get("months", {})
+        self.index_signature = signature
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    def __bool__(self) -> bool:
+        return bool(self.months)
+
+    def month_keys(self) -> List[str]:
+        return sorted(self.months)
+
+    def month_totals(self, month: str) -> Optional[Dict[str, Any]]:
+        """某个月的合计，不需要解压归档段"""
+        entry = self.months.get(month)
+        if entry is None:
+            return None
+        totals = {field: entry[field] for field in DURATION_FIELDS}
+        totals["days"] = bin(entry["days"]).count("1")
+        totals["updated_at"] = entry["updated_at"]
+        return totals
+
+    def contains(self, date_key: str) -> bool:
+        entry = self.months.get(date_key[:7])
+        return entry is not None and bool(entry["days"] & _day_bit(date_key))
+
+    def iter_day_keys(self, month: str) -> Iterator[str]:
+        entry = self.months.get(month)
+        if entry is None:
+            return
+        mask = entry["days"]
+        day = 1
+        while mask:
+            if mask & 1:
+                yield f"{month}-{day:02d}"
+            mask >>= 1
+            day += 1
+
+    def load_month(self, month: str) -> Dict[str, Dict[str, Any]]:
+        """解压某个月的归档段，返回 {日期: 记录}（只读）"""
+        entry = self.months.get(month)
+        if entry is None:
+            return {}
+        name = entry["file"]
+        days = self.segments.get(name)
+        if days is not None:
+            self.segments.move_to_end(name)
+            return days
+
+        try:
+            with open(os.path.join(self.archive_dir, name), "rb") as f:
+                raw = f.read()
+        except FileNotFoundError:
+            # 其他进程重新归档了这个月份，旧的归档段已被删除，读取新的索引后重试
+            self.refresh()
+            if self.months.get(month, {}).get("file", name) == name:
+                raise
+            return self.load_month(month)
+        days = json.loads(decompress(entry["codec"], raw).decode("utf-8"))
+        self.segments[name] = days
+        while len(self.segments) > SEGMENT_CACHE_SIZE:
+            self.segments.popitem(last=False)
+        return days
+
+    def get(self, date_key: str, default: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        if not self.contains(date_key):
+            return default
+        return self.load_month(date_key[:7]).get(date_key, default)
+
+    # ------------------------------------------------------------------
+    # 写入
+    # ------------------------------------------------------------------
+
+    def add_days(self, days: Mapping[str, Mapping[str, Any]], codec: Optional[str] = None):
+        """把每日记录写入归档，同一天已归档时以新记录为准"""
+        by_month: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for date_key, record in days.items():
+            by_month.setdefault(date_key[:7], {})[date_key] = dict(record)
+        if not by_month:
+            return
+        codec = codec or default_codec()
+
+        os.makedirs(self.archive_dir, exist_ok=True)
+        with file_lock(self.index_file):
+            self.refresh()
+            months = dict(self.months)
+            obsolete = []
+            for month, new_days in sorted(by_month.items()):
+                entry = months.get(month)
+                merged = dict(self.load_month(month)) if entry is not None else {}
+                merged.update(new_days)
+
+                generation = entry["generation"] + 1 if entry is not None else 1
+                name = f"{month}.{generation}.json.{CODECS[codec][0]}"
+                data = json.dumps(merged, sort_keys=True).encode("utf-8")
+                write_bytes_atomic(os.path.join(self.archive_dir, name), compress(codec, data))
+
+                entry_new = {"file": name, "codec": codec, "generation": generation, "days": 0,
+                             "updated_at": 0}
+                for field in DURATION_FIELDS:
+                    entry_new[field] = 0
+                for date_key, record in merged.items():
+                    entry_new["days"] |= _day_bit(date_key)
+                    for field in DURATION_FIELDS:
+                        entry_new[field] += record.get(field, 0)
+                    entry_new["updated_at"] = max(entry_new["updated_at"], record.get("updated_at", 0) or 0)
+                months[month] = entry_new
+                if entry is not None:
+                    obsolete.append(entry["file"])
+
+            # 先写好新的归档段和索引，再删除旧的归档段，中途退出不会丢失数据
+            write_json_atomic(self.index_file, {"version": 1, "months": months})
+            self.months = months
+            self.index_signature = file_signature(self.index_file)
+        for name in obsolete:
+            self.segments.pop(name, None)
+            try:
+                os.remove(os.path.join(self.archive_dir, name))
+            except OSError as e:
+                print(f"删除旧归档段 {name} 失败: {e}")
+
+
+def archive_old_days(history, archive: HistoryArchive, today: date, hot_days: int = HOT_DAYS) -> List[str]:
+    """把 history 中早于冷热分界的整月数据移入归档并从 history 删除，返回移出的日期
+
+    history 可以是字典或 HistoryModel，调用方需要持有历史文件的锁。
+    """
+    cutoff = archive_cutoff(today, hot_days)
+    old = [key for key in history if key < cutoff]
+    if not old:
+        return []
+    archive.add_days({key: history[key] for key in old})
+    for key in old:
+        del history[key]
+    return old
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description="查看或整理历史数据归档")
+    parser.add_argument("--data-dir", help="数据文件所在目录，默认为程序目录")
+    parser.add_argument("--compact", action="store_true", help="把热数据窗口之外的整月数据移入归档")
+    parser.add_argument("--hot-days", type=int, default=HOT_DAYS, help="历史文件中保留的天数")
+    args = parser.parse_args(argv)
+
+    app_dir = args.data_dir or get_app_dir()
+    archive = HistoryArchive(app_dir)
+
+    if args.compact:
+        history_file = os.path.join(app_dir, HISTORY_FILE_NAME)
+        try:
+            with file_lock(history_file):
+                history = load_json(history_file, {}) or {}
+                moved = archive_old_days(history, archive, date.today(), args.hot_days)
+                if moved:
+                    write_json_atomic(history_file, history)
+        except Exception as e:
+            print(f"整理归档失败: {e}")
+            return 1
+        print(f"已归档 {len(moved)} 天的数据，历史文件中保留 {len(history)} 天")
+
+    for month in archive.month_keys():
+        totals = archive.month_totals(month)
+        print(f"{month}: {totals['days']:2d} 天  工作 {totals['work_time'] / 3600:7.1f} 小时  "
+              f"休息 {totals['break_time'] / 3600:6.1f} 小时  空闲 {totals['idle_time'] / 3600:6.1f} 小时  "
+              f"({archive.months[month]['file']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+from typing import List, Optional, Sequence, Tuple
+
+from PyQt5.QtWidgets import QWidget, QToolTip, QSizePolicy
+from PyQt5.QtCore import Qt, QRectF, QRect, QSize
+from PyQt5.QtGui import QPainter, QPixmap, QColor, QFont, QFontMetrics, QLinearGradient, QBrush, QPen
+
+# (日期, 工作秒数, 休息秒数, 空闲秒数)
+ChartRow = Tuple[str, int, int, int]
+
+# 各类时间的渐变颜色，与原来的 QGraphicsScene 图表保持一致
+WORK_COLORS = (QColor(52, 152, 219), QColor(41, 128, 185))
+BREAK_COLORS = (QColor(46, 204, 113), QColor(39, 174, 96))
+IDLE_COLORS = (QColor(243, 156, 18), QColor(211, 84, 0))
+
+BAR_HEIGHT = 30
+BAR_SPACING = 15
+MARGIN_LEFT = 100
+MARGIN_RIGHT = 200
+MARGIN_TOP = 50
+LEGEND_HEIGHT = 60
+
+
+def format_time_short(seconds: int) -> str:
+    """将秒数格式化为小时和分钟"""
+    h = seconds // 3600
+    m = (seconds % 3600) // 60
+    if h > 0:
+        return f"{h}h {m}m"
+    return f"{m}m"
+
+
+class HistoryChartWidget(QWidget):
+    """用 QPainter 绘制的每日时间分布图
+
+    整张图只在数据或尺寸（包括设备像素比）变化时重新绘制到缓存的 QPixmap 中，
+    其余的重绘（滚动、遮挡、悬停）只需把缓存贴到屏幕上。
+    鼠标悬停时通过命中测试表显示每段时间的提示。
+    """
+
+    def __init__(self, parent: Optional[QWidget] = None):
+        super().__init__(parent)
+        self.rows: List[ChartRow] = []
+        self.cache: Optional[QPixmap] = None
+        self.cache_key = None
+        # 命中测试表：每行一个列表，元素为 (区域, 提示文字)
+        self.hit_table: List[List[Tuple[QRectF, str]]] = []
+
+        self.title_font = QFont("Arial", 14, QFont.Bold)
+        self.text_font = QFont("Arial", 9)
+
+        self.setMouseTracking(True)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        self.setMinimumWidth(MARGIN_LEFT + MARGIN_RIGHT + 200)
+
+    def set_data(self, rows: Sequence[ChartRow]):
+        rows = list(rows)
+        if rows == self.rows:
+            return
+        self.rows = rows
+        self.cache = None
+        self.setMinimumHeight(self.chart_height())
+        self.updateGeometry()
+        self.update()
+
+    def chart_height(self) -> int:
+        return MARGIN_TOP + len(self.rows) * (BAR_HEIGHT + BAR_SPACING) + LEGEND_HEIGHT
+
+    def sizeHint(self) -> QSize:
+        return QSize(700, max(400, self.chart_height()))
+
+    # ------------------------------------------------------------------
+    # 绘制
+    # ------------------------------------------------------------------
+
+    def paintEvent(self, event):
+        dpr = self.devicePixelRatioF()
+        key = (self.width(), self.height(), dpr)
+        if self.cache is None or self.cache_key != key:
+            self.rasterize(dpr)
+            self.cache_key = key
+
+        # 只贴出需要重绘的区域
+        painter = QPainter(self)
+        rect = event.rect()
+        source = QRectF(rect.x() * dpr, rect.y() * dpr, rect.width() * dpr, rect.height() * dpr)
+        painter.drawPixmap(QRectF(rect), self.cache, source)
+        painter.end()
+
+    def rasterize(self, dpr: float):
+        """把整张图表绘制到缓存的 QPixmap 中"""
+        width = self.width()
+        height = self.height()
+        pixmap = QPixmap(int(width * dpr), int(height * dpr))
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(QColor("#ffffff"))
+
+        hit_table: List[List[Tuple[QRectF, str]]] = []
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setRenderHint(QPainter.TextAntialiasing)
+
+        # 添加标题
+        painter.setFont(self.title_font)
+        painter.setPen(QColor("#2c3e50"))
+        painter.drawText(QRectF(0, 10, width, 30), Qt.AlignHCenter | Qt.AlignVCenter, "每日时间分布")
+
+        painter.setFont(self.text_font)
+        metrics = QFontMetrics(self.text_font)
+        usable_width = max(50, width - MARGIN_LEFT - MARGIN_RIGHT)
+
+        for i, (date, work, rest, idle) in enumerate(self.rows):
+            y_pos = MARGIN_TOP + i * (BAR_HEIGHT + BAR_SPACING)
+            total = work + rest + idle
+            row_hits: List[Tuple[QRectF, str]] = []
+            hit_table.append(row_hits)
+
+            # 添加日期标签
+            painter.setPen(QColor("#2c3e50"))
+            painter.drawText(QRectF(10, y_pos, MARGIN_LEFT - 15, BAR_HEIGHT), Qt.AlignVCenter, date)
+
+            # 如果总时间为0，显示空条
+            if total == 0:
+                bar = QRectF(MARGIN_LEFT, y_pos, usable_width, BAR_HEIGHT)
+                painter.setBrush(QColor("#f0f0f0"))
+                painter.setPen(QPen(QColor("#e0e0e0")))
+                painter.drawRect(bar)
+                painter.setPen(QColor("#7f8c8d"))
+                painter.drawText(bar.adjusted(10, 0, 0, 0), Qt.AlignVCenter, "无数据")
+                row_hits.append((bar, f"{date}\n无数据"))
+                continue
+
+            # 依次绘制工作、休息、空闲休息时间条
+            x = float(MARGIN_LEFT)
+            painter.setPen(Qt.NoPen)
+            for seconds, colors, name in ((work, WORK_COLORS, "工作"),
+                                          (rest, BREAK_COLORS, "休息"),
+                                          (idle, IDLE_COLORS, "空闲")):
+                bar_width = seconds / total * usable_width
+                if bar_width <= 0:
+                    continue
+                bar = QRectF(x, y_pos, bar_width, BAR_HEIGHT)
+                gradient = QLinearGradient(x, 0, x + bar_width, 0)
+                gradient.setColorAt(0, colors[0])
+                gradient.setColorAt(1, colors[1])
+                painter.fillRect(bar, QBrush(gradient))
+                row_hits.append((bar, f"{date}\n{name}: {format_time_short(seconds)} "
+                                       f"({seconds / total * 100:.0f}%)"))
+                x += bar_width
+
+            # 添加时间数据标签
+            painter.setPen(QColor("#2c3e50"))
+            data_text = (f"工作: {format_time_short(work)} | 休息: {format_time_short(rest)} "
+                         f"| 空闲: {format_time_short(idle)}")
+            data_text = metrics.elidedText(data_text, Qt.ElideRight, MARGIN_RIGHT - 10)
+            painter.drawText(QRectF(MARGIN_LEFT + usable_width + 10, y_pos, MARGIN_RIGHT - 10, BAR_HEIGHT),
+                             Qt.AlignVCenter, data_text)
+
+        # 添加图例
+        legend_x = MARGIN_LEFT
+        legend_y = MARGIN_TOP + len(self.rows) * (BAR_HEIGHT + BAR_SPACING) + 20
+        painter.setBrush(QColor(255, 255, 255, 200))
+        painter.setPen(QPen(QColor("#e0e0e0")))
+        painter.drawRect(QRectF(legend_x - 10, legend_y - 10, 350, 40))
+        for offset, colors, name in ((0, WORK_COLORS, "工作时间"),
+                                     (120, BREAK_COLORS, "休息时间"),
+                                     (240, IDLE_COLORS, "空闲休息时间")):
+            gradient = QLinearGradient(legend_x + offset, 0, legend_x + offset + 15, 0)
+            gradient.setColorAt(0, colors[0])
+            gradient.setColorAt(1, colors[1])
+            painter.fillRect(QRectF(legend_x + offset, legend_y, 15, 15), QBrush(gradient))
+            painter.setPen(QColor("#2c3e50"))
+            painter.drawText(QRectF(legend_x + offset + 20, legend_y - 2, 100, 20), Qt.AlignVCenter, name)
+
+        painter.end()
+        self.cache = pixmap
+        self.hit_table = hit_table
+
+    # ------------------------------------------------------------------
+    # 悬停提示
+    # ------------------------------------------------------------------
+
+    def hit_test(self, x: float, y: float) -> Optional[str]:
+        # 所有条形按行排列，先按纵坐标算出所在行，再在该行内查找
+        row = int((y - MARGIN_TOP) // (BAR_HEIGHT + BAR_SPACING))
+        if row < 0 or row >= len(self.hit_table):
+            return None
+        for rect, text in self.hit_table[row]:
+            if rect.contains(x, y):
+                return text
+        return None
+
+    def mouseMoveEvent(self, event):
+        text = self.hit_test(event.x(), event.y())
+        if text:
+            QToolTip.showText(event.globalPos(), text, self, QRect(event.pos(), QSize(1, 1)))
+        else:
+            QToolTip.hideText()
+        super().mouseMoveEvent(event)
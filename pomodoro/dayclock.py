@@ -0,0 +1,56 @@
+import time
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+# 重新计算午夜时间点的最长间隔（毫秒）。
+# 系统休眠或时区变化都可能让预先计算的截止时间失效，因此最多每小时重新检查一次。
+MAX_ROLLOVER_INTERVAL_MS = 60 * 60 * 1000
+
+
+def now() -> datetime:
+    """当前本地时间"""
+    return datetime.now()
+
+
+def day_key(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%d")
+
+
+def refresh_timezone():
+    # 让 time/datetime 重新读取系统时区（只有类Unix系统支持）
+    if hasattr(time, "tzset"):
+        time.tzset()
+
+
+def day_bounds(moment: datetime) -> Tuple[float, float]:
+    """返回 moment 所在本地日期的 [开始, 结束) 时间戳
+
+    通过本地午夜换算时间戳，夏令时切换当天的长度会是23或25小时。
+    """
+    midnight = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    next_midnight = midnight + timedelta(days=1)
+    return midnight.timestamp(), next_midnight.timestamp()
+
+
+def split_by_day(start: datetime, end: datetime) -> List[Tuple[str, int]]:
+    """把 [start, end) 时间段在本地午夜处切开，返回每一天分到的秒数"""
+    parts: List[Tuple[str, int]] = []
+    cursor = start.timestamp()
+    end_ts = end.timestamp()
+    while cursor < end_ts:
+        moment = datetime.fromtimestamp(cursor)
+        _, day_end = day_bounds(moment)
+        segment_end = min(day_end, end_ts)
+        # 按取整后的边界计算，保证各段之和等于整段时长
+        seconds = int(round(segment_end)) - int(round(cursor))
+        if seconds > 0:
+            parts.append((day_key(moment), seconds))
+        cursor = segment_end
+    return parts
+
+
+def ms_until_rollover(moment: datetime) -> int:
+    """距离下一个本地午夜的毫秒数（不超过 MAX_ROLLOVER_INTERVAL_MS）"""
+    _, day_end = day_bounds(moment)
+    remaining = int((day_end - moment.timestamp()) * 1000)
+    return max(0, min(remaining, MAX_ROLLOVER_INTERVAL_MS))
@@ -0,0 +1,634 @@
+import os
+import json
+from datetime import datetime
+from typing import Optional, Dict, Any
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from .storage import (get_app_dir, HISTORY_FILE_NAME, STATE_FILE_NAME, SESSIONS_FILE_NAME, STATE_VERSION,
+                      file_lock, load_json, write_json_atomic, file_signature)
+from .model import HistoryModel, DURATION_FIELDS
+from .sessions import SessionLog
+from .archive import HistoryArchive, archive_old_days
+from .store import HistoryStore
+from . import dayclock
+
+# 工作、休息、空闲休息时的显示颜色，主窗口和托盘图标共用
+MODE_COLORS = {"work": "#e74c3c", "break": "#2ecc71", "idle": "#f39c12"}
+
+
+def format_countdown(seconds: int) -> str:
+    """格式化为 分:秒"""
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+
+def format_hms(seconds: int) -> str:
+    """格式化为 时:分:秒"""
+    hours = seconds // 3600
+    minutes = (seconds % 3600) // 60
+    seconds = seconds % 60
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+class TimerEngine(QObject):
+    """计时器的状态和逻辑，不包含界面
+
+    计时、空闲休息、跨天切换、历史数据和状态的保存都在这里完成。主窗口和托盘图标只是它的视图，
+    通过信号刷新显示；最小化到托盘时主窗口可以整个销毁，计时不受影响。
+    """
+
+    # 计时状态或今日统计发生变化（计时时每秒一次）
+    changed = pyqtSignal()
+    # 历史数据已保存或被导入的数据修改
+    history_changed = pyqtSignal()
+    # 需要提示用户的消息：(标题, 内容)
+    notify = pyqtSignal(str, str)
+    # 保存失败等错误：(标题, 内容)
+    warning = pyqtSignal(str, str)
+
+    def __init__(self, app_dir: Optional[str] = None, parent: Optional[QObject] = None):
+        super().__init__(parent)
+
+        # 设置程序目录和数据文件路径
+        self.app_dir = app_dir or get_app_dir()
+        self.history_file = os.path.join(self.app_dir, HISTORY_FILE_NAME)
+        self.state_file = os.path.join(self.app_dir, STATE_FILE_NAME)
+        self.session_log = SessionLog(os.path.join(self.app_dir, SESSIONS_FILE_NAME))
+        # 历史文件只保存最近的热数据，更早的整月数据压缩保存在归档中
+        self.archive = HistoryArchive(self.app_dir)
+
+        # 初始化变量
+        self.work_time = 25 * 60  # 25分钟工作时间（秒）
+        self.break_time = 10 * 60  # 10分钟休息时间（秒）
+        self.time_left = self.work_time
+        self.is_working = True
+        self.is_running = False
+        self.is_idle_break = False
+        # 当前时间段被暂停过（开始按钮显示“继续”）
+        self.is_paused = False
+        # 状态文字，以及是否处于工作/休息/空闲休息中（决定显示颜色）
+        self.status_text = "准备开始工作"
+        self.status_active = False
+
+        self.today_work_time = 0
+        self.today_break_time = 0
+        self.today_idle_time = 0
+        # 今日统计所属的日期，跨过本地午夜时切换
+        self.current_day = dayclock.day_key(dayclock.now())
+        self.day_start_ts = 0.0
+        self.day_end_ts = 0.0
+
+        # 本程序修改过、尚未写入文件的日期 -> 修改前的时长，以及上次写入后历史文件的签名，
+        # 用于在其他程序同时修改历史文件时合并数据
+        self.dirty_days: Dict[str, Dict[str, int]] = {}
+        self.history_signature = None
+
+        self.start_time: Optional[datetime] = None
+        self.current_session_start: Optional[datetime] = None
+        self.idle_break_start: Optional[datetime] = None
+        # 当前正在计时的工作/休息时间段的开始时间，用于记录会话
+        self.segment_start: Optional[datetime] = None
+
+        # 历史数据版本号，数据变化时递增，用于报告缓存
+        self.data_version = 0
+        # 已经执行过 shutdown，退出菜单和 aboutToQuit 都会调用它，只保存一次
+        self.is_shut_down = False
+
+        # 初始化计时器
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.update_timer)
+
+        # 空闲休息计时器只创建一次，开始和结束空闲休息时启动、停止
+        self.idle_timer = QTimer(self)
+        self.idle_timer.timeout.connect(self.update_idle_time)
+
+        # 加载历史数据
+        self.history_data = self.load_history_data()
+        # 图表、报告和导出都通过 history_store 查询历史数据
+        self.history_store = HistoryStore(self.history_data, self.archive)
+
+        # 添加自动保存计时器，每60秒保存一次数据
+        self.autosave_timer = QTimer(self)
+        self.autosave_timer.timeout.connect(self.save_history_data)
+        self.autosave_timer.start(60000)  # 每60秒保存一次
+
+        # 在本地午夜准时切换到新的一天
+        self.rollover_timer = QTimer(self)
+        self.rollover_timer.setSingleShot(True)
+        self.rollover_timer.timeout.connect(self.on_rollover_deadline)
+        self.schedule_rollover()
+
+    # ------------------------------------------------------------------
+    # 显示用的状态
+    # ------------------------------------------------------------------
+
+    @property
+    def mode(self) -> str:
+        """当前模式："work"、"break" 或 "idle"（空闲休息）"""
+        if self.is_idle_break:
+            return "idle"
+        return "work" if self.is_working else "break"
+
+    @property
+    def start_label(self) -> str:
+        if self.is_running:
+            return "暂停"
+        return "继续" if self.is_paused else "开始"
+
+    def idle_elapsed(self) -> int:
+        """本次空闲休息已经持续的秒数"""
+        if not self.is_idle_break or self.idle_break_start is None:
+            return 0
+        return max(0, int((dayclock.now() - self.idle_break_start).total_seconds()))
+
+    def display_time(self) -> str:
+        """计时器显示的时间：空闲休息时为已休息时间，否则为剩余时间"""
+        if self.is_idle_break:
+            return format_countdown(self.idle_elapsed())
+        return format_countdown(self.time_left)
+
+    def display_idle_time(self) -> int:
+        """今日空闲时间，空闲休息中时包括本次休息在今天之内的部分（仅用于实时预览）"""
+        if not self.is_idle_break or self.idle_break_start is None:
+            return self.today_idle_time
+        today_duration = dayclock.now().timestamp() - max(self.idle_break_start.timestamp(), self.day_start_ts)
+        return self.today_idle_time + max(0, int(today_duration))
+
+    def set_status(self, text: str, active: bool = False):
+        self.status_text = text
+        self.status_active = active
+
+    # ------------------------------------------------------------------
+    # 计时
+    # ------------------------------------------------------------------
+
+    def toggle_timer(self):
+        if not self.is_running:
+            # 开始计时
+            self.is_running = True
+
+            if self.current_session_start is None:
+                self.current_session_start = dayclock.now()
+
+            if self.start_time is None:
+                # 如果是第一次启动，记录开始时间
+                self.start_time = dayclock.now()
+
+            self.segment_start = dayclock.now()
+            self.timer.start(1000)  # 每秒更新一次
+            self.changed.emit()
+        else:
+            # 暂停计时
+            self.is_running = False
+            self.is_paused = True
+            self.timer.stop()
+            self.end_segment()
+            self.changed.emit()
+
+            # 暂停时保存数据
+            self.save_history_data()
+
+    def toggle_idle_break(self):
+        if not self.is_idle_break:
+            # 开始空闲休息
+            self.is_idle_break = True
+
+            # 如果计时器正在运行，先暂停
+            if self.is_running:
+                # 暂停计时器但不调用toggle_timer以避免状态混淆
+                self.is_running = False
+                self.is_paused = True
+                self.timer.stop()
+                self.end_segment()
+
+            # 记录当前时间作为空闲休息开始时间
+            self.idle_break_start = dayclock.now()
+            self.set_status("空闲休息中...", True)
+
+            # 启动空闲休息计时器，实时更新空闲休息时间
+            self.idle_timer.start(1000)  # 每秒更新一次
+            self.changed.emit()
+        else:
+            # 结束空闲休息
+            self.is_idle_break = False
+
+            # 停止空闲计时器
+            self.idle_timer.stop()
+
+            # 计算空闲休息时间
+            if self.idle_break_start is not None:
+                idle_end = dayclock.now()
+                self.add_idle_time(self.idle_break_start, idle_end)
+                self.session_log.append("idle", self.idle_break_start, idle_end)
+
+            # 空闲休息结束后，始终回到工作状态
+            self.is_working = True
+            self.time_left = self.work_time
+            self.set_status("准备工作")
+            self.changed.emit()
+
+            # 空闲休息结束时保存数据
+            self.save_history_data()
+
+    def update_idle_time(self):
+        # 空闲休息中每秒刷新一次显示
+        if self.idle_break_start is not None:
+            if dayclock.now().timestamp() >= self.day_end_ts:
+                self.on_rollover_deadline()
+            self.changed.emit()
+
+    def update_timer(self):
+        if self.time_left > 0:
+            # 确保不在空闲休息模式下
+            if not self.is_idle_break:
+                # 跨过午夜时先切换到新的一天，再累加这一秒
+                if dayclock.now().timestamp() >= self.day_end_ts:
+                    self.on_rollover_deadline()
+
+                self.time_left -= 1
+
+                # 更新当前会话时间
+                if self.is_working:
+                    self.today_work_time += 1
+                else:
+                    self.today_break_time += 1
+
+                # 更新显示
+                self.changed.emit()
+        else:
+            # 时间到，切换模式
+            self.timer.stop()
+            self.end_segment(completed=True)
+
+            if self.is_working:
+                # 工作时间结束，切换到休息时间
+                self.is_working = False
+                self.time_left = self.break_time
+                self.set_status("休息时间", True)
+                message = "工作时间结束，请休息一下！"
+            else:
+                # 休息时间结束，切换到工作时间
+                self.is_working = True
+                self.time_left = self.work_time
+                self.set_status("工作时间", True)
+                message = "休息时间结束，继续工作！"
+
+            # 等待用户重新开始
+            self.is_running = False
+            self.is_paused = False
+            self.changed.emit()
+
+            # 保存历史数据
+            self.save_history_data()
+            self.notify.emit("提示", message)
+
+    def reset_timer(self):
+        # 停止计时器
+        self.timer.stop()
+        self.end_segment()
+
+        # 重置变量
+        self.is_working = True
+        self.is_running = False
+        self.is_paused = False
+        self.time_left = self.work_time
+        self.set_status("准备工作")
+        self.changed.emit()
+
+        # 重置时保存数据
+        self.save_history_data()
+
+    def end_segment(self, completed=False):
+        # 结束当前的工作/休息时间段并写入会话记录
+        if self.segment_start is None:
+            return
+        kind = "work" if self.is_working else "break"
+        self.session_log.append(kind, self.segment_start, dayclock.now(), completed)
+        self.segment_start = None
+
+    # ------------------------------------------------------------------
+    # 日期切换
+    # ------------------------------------------------------------------
+
+    def schedule_rollover(self):
+        # 计算下一个本地午夜，并安排在那一刻切换日期
+        now = dayclock.now()
+        self.day_start_ts, self.day_end_ts = dayclock.day_bounds(now)
+        self.rollover_timer.start(dayclock.ms_until_rollover(now))
+
+    def on_rollover_deadline(self):
+        if self.check_day_rollover():
+            self.save_history_data()
+        self.schedule_rollover()
+
+    def check_day_rollover(self):
+        # 检查日期是否变化（包括时区变化），变化时把今日统计切换到新的一天
+        dayclock.refresh_timezone()
+        new_day = dayclock.day_key(dayclock.now())
+        if new_day == self.current_day:
+            return False
+
+        # 先把旧的一天的最终数据写入历史记录
+        self.update_today_record()
+
+        # 切换到新的一天，如果新的一天已经有记录（例如时区回拨），继续累加
+        self.current_day = new_day
+        self.load_today()
+        return True
+
+    def load_today(self):
+        # 从历史数据中读取今日统计
+        day_data = self.history_data.get(self.current_day, {})
+        self.today_work_time = day_data.get("work_time", 0)
+        self.today_break_time = day_data.get("break_time", 0)
+        self.today_idle_time = day_data.get("idle_time", 0)
+        self.changed.emit()
+
+    def add_idle_time(self, start, end):
+        # 空闲休息可能跨过午夜，按本地日期切分后分别计入对应的日期
+        self.check_day_rollover()
+        for day, seconds in dayclock.split_by_day(start, end):
+            if day == self.current_day:
+                self.today_idle_time += seconds
+            else:
+                day_data = self.history_data.setdefault(
+                    day, {"work_time": 0, "break_time": 0, "idle_time": 0})
+                self.mark_dirty(day, day_data)
+                day_data["idle_time"] = day_data.get("idle_time", 0) + seconds
+                day_data["updated_at"] = dayclock.now().timestamp()
+                self.data_version += 1
+
+    # ------------------------------------------------------------------
+    # 历史数据
+    # ------------------------------------------------------------------
+
+    def load_history_data(self):
+        # 尝试从文件加载历史数据
+        if os.path.exists(self.history_file):
+            try:
+                with file_lock(self.history_file):
+                    with open(self.history_file, "r") as f:
+                        data = json.load(f)
+                    # 旧数据移入归档，内存中只保留热数据
+                    if archive_old_days(data, self.archive, dayclock.now().date()):
+                        write_json_atomic(self.history_file, data)
+                    self.history_signature = file_signature(self.history_file)
+
+                # 内存中使用紧凑的列式模型保存历史数据
+                model = HistoryModel.from_dict(data)
+            except Exception as e:
+                print(f"加载历史数据失败: {e}")
+                model = self.salvage_history_data()
+        else:
+            model = HistoryModel()
+
+        # 检查今天的数据是否存在
+        today = self.current_day
+        if today in model:
+            # 加载今天的数据
+            self.today_work_time = model[today]["work_time"]
+            self.today_break_time = model[today]["break_time"]
+            self.today_idle_time = model[today]["idle_time"]
+        return model
+
+    def salvage_history_data(self):
+        # 历史文件损坏时不直接丢弃：原文件另存一份，再找回其中完好的记录。
+        # 下次保存时会用找回的数据重写历史文件
+        from .migrate import salvage_history_file
+        try:
+            with file_lock(self.history_file):
+                data, _ = salvage_history_file(self.history_file)
+            return HistoryModel.from_dict(data)
+        except Exception as e:
+            print(f"恢复历史数据失败: {e}")
+            return HistoryModel()
+
+    def update_today_record(self):
+        # 更新或创建今天的数据
+        today = self.current_day
+        day_data = {
+            "work_time": self.today_work_time,
+            "break_time": self.today_break_time,
+            "idle_time": self.today_idle_time
+        }
+
+        # 只有数据发生变化时才更新修改时间，供增量导出使用
+        old_data = self.history_data.get(today)
+        if old_data is not None and all(old_data.get(k) == v for k, v in day_data.items()):
+            day_data["updated_at"] = old_data.get("updated_at", 0)
+        else:
+            day_data["updated_at"] = dayclock.now().timestamp()
+            self.data_version += 1
+            self.mark_dirty(today, old_data)
+        self.history_data[today] = day_data
+
+    def mark_dirty(self, day, old_data):
+        # 记下这一天在上次保存时的时长，合并时只把之后的增量加到文件中的记录上
+        if day not in self.dirty_days:
+            self.dirty_days[day] = {field: (old_data or {}).get(field, 0) for field in DURATION_FIELDS}
+
+    def save_history_data(self):
+        # 保存历史数据到文件
+        self.check_day_rollover()
+        self.update_today_record()
+
+        try:
+            with file_lock(self.history_file):
+                if file_signature(self.history_file) != self.history_signature:
+                    self.merge_history_file()
+                if archive_old_days(self.history_data, self.archive, dayclock.now().date()):
+                    self.data_version += 1
+                write_json_atomic(self.history_file, self.history_data.to_dict())
+                self.history_signature = file_signature(self.history_file)
+            self.dirty_days.clear()
+
+            # 更新历史记录显示
+            self.history_changed.emit()
+        except Exception as e:
+            print(f"保存历史数据失败: {e}")
+            self.warning.emit("保存失败", f"无法保存数据到 {self.history_file}。\n错误信息: {e}")
+
+    def merge_history_file(self):
+        # 历史文件被其他程序（例如导入工具）修改过，逐天合并后以合并结果为准：
+        # 本程序修改过的日期在文件中的记录上加上本程序上次保存之后增加的时间，两边同时累加的时间都不会丢失；
+        # 其他日期保留最后修改时间较新的一边，文件中没有、也没有被归档的日期保留内存中的记录。
+        # 调用方需要持有文件锁。
+        disk = load_json(self.history_file)
+        if not isinstance(disk, dict):
+            return
+        self.archive.refresh()
+        for day in list(self.history_data.keys()):
+            # history_data[day] 只是模型中这一行的视图，清空模型之前先复制出来
+            ours = dict(self.history_data[day])
+            theirs = disk.get(day)
+            if theirs is None:
+                if not self.archive.contains(day):
+                    disk[day] = ours
+                continue
+            base = self.dirty_days.get(day)
+            if base is None:
+                # 手工编辑等没有修改时间的记录以文件为准
+                stamp = theirs.get("updated_at")
+                if stamp is not None and (ours.get("updated_at", 0) or 0) > stamp:
+                    disk[day] = ours
+                continue
+            merged = {field: max(0, theirs.get(field, 0) + ours.get(field, 0) - base[field])
+                      for field in DURATION_FIELDS}
+            merged["updated_at"] = max(theirs.get("updated_at", 0) or 0, ours.get("updated_at", 0) or 0)
+            disk[day] = merged
+        self.history_data.clear()
+        self.history_data.update(disk)
+        self.data_version += 1
+        # 今日统计以合并后的记录为准，包括其他程序写入的今天的时间
+        self.load_today()
+
+    def history_imported(self):
+        # 导入在工作线程中写入了历史文件：保存时合并文件内容，导入的会话可能属于今天，同步今日统计
+        self.data_version += 1
+        self.save_history_data()
+
+    # ------------------------------------------------------------------
+    # 状态保存和恢复
+    # ------------------------------------------------------------------
+
+    def save_state(self):
+        # 保存当前状态，以便下次启动时恢复
+        state: Dict[str, Any] = {
+            "version": STATE_VERSION,
+            "is_working": self.is_working,
+            "is_running": self.is_running,
+            "is_idle_break": self.is_idle_break,
+            "time_left": self.time_left,
+            "timestamp": dayclock.now().timestamp(),
+            "idle_break_timestamp": None
+        }
+
+        # 如果在空闲休息状态且有开始时间，则保存时间戳
+        if self.is_idle_break and self.idle_break_start is not None:
+            state["idle_break_timestamp"] = self.idle_break_start.timestamp()
+
+        try:
+            with file_lock(self.state_file):
+                write_json_atomic(self.state_file, state)
+        except Exception as e:
+            print(f"保存状态失败: {e}")
+            self.warning.emit("保存失败", f"无法保存状态到 {self.state_file}。\n错误信息: {e}")
+
+    def load_state(self):
+        # 加载上次保存的状态，需要在界面连接好信号之后调用
+        if not os.path.exists(self.state_file):
+            return
+
+        try:
+            with file_lock(self.state_file):
+                with open(self.state_file, "r") as f:
+                    state = json.load(f)
+
+            # 获取最后保存状态的时间戳
+            last_timestamp = state.get("timestamp")
+            if not last_timestamp:
+                return
+
+            # 计算距离上次保存经过的时间（秒）
+            elapsed_seconds = int(dayclock.now().timestamp() - last_timestamp)
+
+            # 恢复工作/休息模式
+            self.is_working = state.get("is_working", True)
+
+            # 创建状态恢复信息
+            status_info = ""
+
+            # 恢复空闲休息状态
+            if state.get("is_idle_break", False):
+                # 恢复空闲休息状态
+                idle_break_timestamp = state.get("idle_break_timestamp")
+                if idle_break_timestamp:
+                    self.idle_break_start = datetime.fromtimestamp(idle_break_timestamp)
+
+                    # 计算已经空闲的时间（分钟）
+                    idle_minutes = int((dayclock.now() - self.idle_break_start).total_seconds() // 60)
+
+                    # 如果空闲休息时间超过30分钟，假设用户已经完成休息，直接回到工作状态
+                    if idle_minutes > 30:
+                        # 累加空闲时间到今日统计
+                        idle_end = dayclock.now()
+                        self.add_idle_time(self.idle_break_start, idle_end)
+                        self.session_log.append("idle", self.idle_break_start, idle_end)
+
+                        # 设置为工作状态
+                        self.is_working = True
+                        self.time_left = self.work_time
+                        self.set_status("准备工作")
+
+                        status_info = f"检测到上次空闲休息已经{idle_minutes}分钟，已重置为工作状态。"
+                    else:
+                        status_info = f"已恢复空闲休息状态，已经休息了{idle_minutes}分钟。"
+                        # 立即启动空闲休息模式
+                        self.toggle_idle_break()  # 启动空闲休息
+
+            elif state.get("is_running", False):
+                # 恢复计时器状态
+                original_time_left = state.get("time_left", self.work_time)
+                self.time_left = max(0, original_time_left - elapsed_seconds)
+
+                # 如果还有剩余时间，则自动启动计时器
+                if self.time_left > 0:
+                    minutes_passed = (original_time_left - self.time_left) // 60
+                    if self.is_working:
+                        status_info = f"已恢复工作计时，已经工作了{minutes_passed}分钟。"
+                    else:
+                        status_info = f"已恢复休息计时，已经休息了{minutes_passed}分钟。"
+
+                    self.toggle_timer()  # 启动计时器
+                else:
+                    # 如果时间已经用完，则切换模式并重置
+                    if self.is_working:
+                        self.is_working = False
+                        self.time_left = self.break_time
+                        self.set_status("休息时间", True)
+                        status_info = "工作时间已结束，已切换到休息时间。"
+                    else:
+                        self.is_working = True
+                        self.time_left = self.work_time
+                        self.set_status("工作时间", True)
+                        status_info = "休息时间已结束，已切换到工作时间。"
+            else:
+                # 没有在运行，但更新显示以匹配正确的模式
+                if self.is_working:
+                    self.time_left = state.get("time_left", self.work_time)
+                    self.set_status("准备工作")
+                else:
+                    self.time_left = state.get("time_left", self.break_time)
+                    self.set_status("准备休息")
+
+            self.changed.emit()
+
+            # 在加载状态后显示一个通知
+            if status_info:
+                self.notify.emit("状态恢复", status_info)
+
+        except Exception as e:
+            print(f"加载状态失败: {e}")
+            # 加载失败时删除可能损坏的状态文件
+            try:
+                os.remove(self.state_file)
+            except:
+                pass
+
+    def shutdown(self):
+        # 退出程序前停止计时器并保存状态和数据
+        if self.is_shut_down:
+            return
+        self.is_shut_down = True
+        self.idle_timer.stop()
+        self.autosave_timer.stop()
+
+        # 结束当前时间段的会话记录
+        if self.is_running:
+            self.end_segment()
+
+        # 保存当前状态
+        self.save_state()
+
+        # 应用关闭时保存数据
+        self.save_history_data()
@@ -0,0 +1,262 @@
+import os
+import sys
+import csv
+import json
+import argparse
+from datetime import datetime, date
+from typing import Optional, Dict, Any, Iterator, Iterable, List
+
+from .storage import (get_app_dir, load_json, read_json_locked, write_json_atomic,
+                      HISTORY_FILE_NAME, SESSIONS_FILE_NAME)
+from .sessions import SessionLog
+from .model import HistoryModel
+from .archive import HistoryArchive
+from .store import HistoryStore
+
+# 导出水位文件名，记录每个增量导出任务上一次导出到的位置
+EXPORT_STATE_FILE_NAME = "pomodoro_export_state.json"
+
+EXPORT_FORMATS = ("csv", "jsonl", "parquet")
+EXPORT_KINDS = ("days", "sessions")
+
+DAY_FIELDS = ["date", "work_time", "break_time", "idle_time", "total_time", "updated_at"]
+SESSION_FIELDS = ["id", "date", "kind", "start", "end", "duration", "completed", "recorded_at"]
+
+# Parquet按批写入，每批的行数
+PARQUET_BATCH_SIZE = 10000
+
+
+def parse_date(value: Optional[str]) -> Optional[date]:
+    if not value:
+        return None
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def guess_format(path: str) -> str:
+    """根据文件扩展名推断导出格式"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".parquet":
+        return "parquet"
+    if ext in (".jsonl", ".ndjson"):
+        return "jsonl"
+    return "csv"
+
+
+# ---------------------------------------------------------------------------
+# 数据源
+# ---------------------------------------------------------------------------
+
+def iter_day_records(store: HistoryStore,
+                     start: Optional[date] = None,
+                     end: Optional[date] = None,
+                     changed_after: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+    """按日期顺序逐条产出每日记录
+
+    数据来自 HistoryStore，只解压范围内的归档段，额外内存占用与范围大小无关。
+    changed_after 不为空时跳过没有修改的整月归档。
+    """
+    for key, data in store.days(start, end, changed_after):
+        work_time = data.get("work_time", 0)
+        break_time = data.get("break_time", 0)
+        idle_time = data.get("idle_time", 0)
+        yield {
+            "date": key,
+            "work_time": work_time,
+            "break_time": break_time,
+            "idle_time": idle_time,
+            "total_time": work_time + break_time + idle_time,
+            "updated_at": data.get("updated_at", 0)
+        }
+
+
+def iter_session_records(session_log: SessionLog,
+                         start: Optional[date] = None,
+                         end: Optional[date] = None) -> Iterator[Dict[str, Any]]:
+    """逐条产出会话记录，时间戳转换为ISO格式"""
+    for event in session_log.iter_events(start, end):
+        yield {
+            "id": event.get("id"),
+            "date": event.get("date"),
+            "kind": event.get("kind"),
+            "start": datetime.fromtimestamp(event["start"]).isoformat(timespec="seconds"),
+            "end": datetime.fromtimestamp(event["end"]).isoformat(timespec="seconds"),
+            "duration": event.get("duration", 0),
+            "completed": bool(event.get("completed", False)),
+            "recorded_at": event.get("recorded_at", 0)
+        }
+
+
+def changed_since(records: Iterable[Dict[str, Any]], watermark: float,
+                  field: str, tracker: Dict[str, float]) -> Iterator[Dict[str, Any]]:
+    """只产出 field 大于水位的记录，同时在 tracker 中记录新的最大水位"""
+    for record in records:
+        stamp = record.get(field) or 0
+        if stamp <= watermark:
+            continue
+        if stamp > tracker["watermark"]:
+            tracker["watermark"] = stamp
+        yield record
+
+
+# ---------------------------------------------------------------------------
+# 写入器
+# ---------------------------------------------------------------------------
+
+def write_csv(records: Iterable[Dict[str, Any]], path: str, fields: List[str]) -> int:
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        for record in records:
+            writer.writerow(record)
+            count += 1
+    return count
+
+
+def write_jsonl(records: Iterable[Dict[str, Any]], path: str, fields: List[str]) -> int:
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps({k: record.get(k) for k in fields}, ensure_ascii=False))
+            f.write("\n")
+            count += 1
+    return count
+
+
+def write_parquet(records: Iterable[Dict[str, Any]], path: str, fields: List[str]) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("导出Parquet需要安装 pyarrow：pip install pyarrow")
+
+    count = 0
+    writer = None
+    batch: Dict[str, list] = {k: [] for k in fields}
+
+    def flush():
+        nonlocal writer
+        table = pa.table(batch)
+        if writer is None:
+            writer = pq.ParquetWriter(path, table.schema)
+        writer.write_table(table)
+        for column in batch.values():
+            column.clear()
+
+    try:
+        for record in records:
+            for k in fields:
+                batch[k].append(record.get(k))
+            count += 1
+            # 按批写入行组，内存占用与导出范围无关
+            if count % PARQUET_BATCH_SIZE == 0:
+                flush()
+        if count % PARQUET_BATCH_SIZE or writer is None:
+            flush()
+    finally:
+        if writer is not None:
+            writer.close()
+    return count
+
+
+WRITERS = {
+    "csv": write_csv,
+    "jsonl": write_jsonl,
+    "parquet": write_parquet,
+}
+
+
+# ---------------------------------------------------------------------------
+# 导出入口
+# ---------------------------------------------------------------------------
+
+def load_export_state(app_dir: str) -> Dict[str, float]:
+    return load_json(os.path.join(app_dir, EXPORT_STATE_FILE_NAME), {}) or {}
+
+
+def save_export_state(app_dir: str, state: Dict[str, float]):
+    write_json_atomic(os.path.join(app_dir, EXPORT_STATE_FILE_NAME), state)
+
+
+def export_data(kind: str, output: str, fmt: Optional[str] = None,
+                start: Optional[date] = None, end: Optional[date] = None,
+                incremental: bool = False, app_dir: Optional[str] = None,
+                store: Optional[HistoryStore] = None,
+                watermark_name: Optional[str] = None) -> int:
+    """导出每日记录或会话记录，返回写入的记录数
+
+    incremental 为 True 时只导出上一次导出之后发生变化的记录。
+    水位按 watermark_name 分别保存（默认为数据类型），
+    因此每次增量导出可以写到不同的输出文件。增量导出不能指定日期范围，
+    否则范围外变化的记录会被水位跳过，以后再也不会导出。
+    """
+    if kind not in EXPORT_KINDS:
+        raise ValueError(f"未知的导出类型: {kind}")
+    if incremental and (start is not None or end is not None):
+        raise ValueError("增量导出不能与日期范围（--start/--end）同时使用")
+    fmt = fmt or guess_format(output)
+    if fmt not in WRITERS:
+        raise ValueError(f"未知的导出格式: {fmt}")
+
+    app_dir = app_dir or get_app_dir()
+
+    state_key = watermark_name or kind
+    if incremental:
+        export_state = load_export_state(app_dir)
+        # 第一次增量导出时没有水位，导出全部记录（包括没有修改时间的旧记录）
+        watermark = export_state.get(state_key, -1)
+
+    if kind == "days":
+        if store is None:
+            history = read_json_locked(os.path.join(app_dir, HISTORY_FILE_NAME), {}) or {}
+            store = HistoryStore(HistoryModel.from_dict(history), HistoryArchive(app_dir))
+        records = iter_day_records(store, start, end, watermark if incremental else None)
+        fields = DAY_FIELDS
+        stamp_field = "updated_at"
+    else:
+        session_log = SessionLog(os.path.join(app_dir, SESSIONS_FILE_NAME))
+        records = iter_session_records(session_log, start, end)
+        fields = SESSION_FIELDS
+        stamp_field = "recorded_at"
+
+    tracker = None
+    if incremental:
+        tracker = {"watermark": watermark}
+        records = changed_since(records, watermark, stamp_field, tracker)
+
+    count = WRITERS[fmt](records, output, fields)
+
+    if tracker is not None:
+        export_state[state_key] = tracker["watermark"]
+        save_export_state(app_dir, export_state)
+
+    return count
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="导出番茄计时器的每日记录和会话记录")
+    parser.add_argument("kind", choices=EXPORT_KINDS, help="导出每日记录(days)或会话记录(sessions)")
+    parser.add_argument("output", help="输出文件路径")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, help="导出格式，默认根据扩展名推断")
+    parser.add_argument("--start", help="开始日期 YYYY-MM-DD")
+    parser.add_argument("--end", help="结束日期 YYYY-MM-DD")
+    parser.add_argument("--incremental", action="store_true", help="只导出上次导出后发生变化的记录")
+    parser.add_argument("--watermark-name", help="增量导出的水位名称，默认为导出类型")
+    parser.add_argument("--data-dir", help="数据文件所在目录，默认为程序目录")
+    args = parser.parse_args(argv)
+
+    try:
+        count = export_data(args.kind, args.output, args.format,
+                            parse_date(args.start), parse_date(args.end),
+                            args.incremental, args.data_dir,
+                            watermark_name=args.watermark_name)
+    except Exception as e:
+        print(f"导出失败: {e}")
+        return 1
+
+    print(f"已导出 {count} 条记录到 {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
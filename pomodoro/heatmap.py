@@ -0,0 +1,288 @@
+import calendar
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from PyQt5.QtWidgets import (QWidget, QToolTip, QSizePolicy, QVBoxLayout, QHBoxLayout, QLabel,
+                            QComboBox, QScrollArea)
+from PyQt5.QtCore import Qt, QRect, QRectF, QSize
+from PyQt5.QtGui import QPainter, QPixmap, QColor, QFont, QPen
+
+from .chart import format_time_short
+from .store import HistoryStore
+from . import dayclock
+
+# 每天一个格子：格子边长、格子间距、月份之间的间距
+CELL_SIZE = 11
+CELL_GAP = 2
+CELL_STEP = CELL_SIZE + CELL_GAP
+MONTH_GAP = 8
+MARGIN_LEFT = 28
+MARGIN_TOP = 20
+LEGEND_HEIGHT = 26
+
+# 按工作时间分级着色。使用固定的分级而不是按全年最大值缩放，
+# 某一天的数据变化时只影响它所在月份的图块
+LEVEL_THRESHOLDS = (1 * 3600, 2 * 3600, 4 * 3600, 6 * 3600)
+LEVEL_COLORS = ("#ebedf0", "#c6dbef", "#9ecae1", "#6baed6", "#3182bd", "#08519c")
+TODAY_COLOR = "#e74c3c"
+
+# 缓存的月份图块数量（十年多一点）
+TILE_CACHE_SIZE = 12 * 12
+
+WEEKDAY_LABELS = {0: "一", 2: "三", 4: "五"}
+
+
+def work_level(seconds: int) -> int:
+    """工作时间对应的颜色等级，0 表示没有学习"""
+    if seconds <= 0:
+        return 0
+    for level, threshold in enumerate(LEVEL_THRESHOLDS, 1):
+        if seconds < threshold:
+            return level
+    return len(LEVEL_THRESHOLDS) + 1
+
+
+def month_columns(year: int, month: int) -> int:
+    """某个月按周排列（周一在最上面）时占用的列数"""
+    first_weekday, days = calendar.monthrange(year, month)
+    return (first_weekday + days + 6) // 7
+
+
+def cell_position(year: int, month: int, day: int) -> Tuple[int, int]:
+    """某一天在月份图块中的 (列, 行)"""
+    index = calendar.monthrange(year, month)[0] + day - 1
+    return index // 7, index % 7
+
+
+class YearHeatmapWidget(QWidget):
+    """全年学习日历：每天一个格子，颜色深浅表示当天的工作时间
+
+    每个月预先绘制成一个图块并缓存，图块记录绘制时的数据；刷新时重新查询各月的每日数据
+    （HistoryStore 会缓存查询结果），只有数据变化的月份重新绘制并只重绘该图块的区域。
+    切换年份时直接使用缓存的图块。
+    """
+
+    def __init__(self, store: HistoryStore, parent: Optional[QWidget] = None):
+        super().__init__(parent)
+        self.store = store
+        self.year = dayclock.now().year
+        # (年, 月) -> (绘制时的数据, 图块, {日期: 工作秒数})
+        self.tiles: "OrderedDict[Tuple[int, int], Tuple[tuple, QPixmap, Dict[str, int]]]" = OrderedDict()
+        # 当前年份各月图块的位置
+        self.tile_rects: Dict[int, QRect] = {}
+        self.text_font = QFont("Arial", 8)
+
+        self.setMouseTracking(True)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
+        self.layout_year()
+
+    def sizeHint(self) -> QSize:
+        return self.minimumSize()
+
+    def layout_year(self):
+        # 计算当前年份各月图块的位置，只与年份有关
+        self.tile_rects = {}
+        x = MARGIN_LEFT
+        for month in range(1, 13):
+            width = month_columns(self.year, month) * CELL_STEP - CELL_GAP
+            self.tile_rects[month] = QRect(x, MARGIN_TOP, width, 7 * CELL_STEP - CELL_GAP)
+            x += width + MONTH_GAP
+        self.setFixedSize(x - MONTH_GAP + 10, MARGIN_TOP + 7 * CELL_STEP + LEGEND_HEIGHT)
+
+    def set_year(self, year: int):
+        if year == self.year:
+            return
+        self.year = year
+        self.layout_year()
+        self.refresh(repaint_all=True)
+
+    # ------------------------------------------------------------------
+    # 图块
+    # ------------------------------------------------------------------
+
+    def refresh(self, repaint_all: bool = False):
+        """重新查询当前年份的数据，只重绘数据变化的月份"""
+        for month in range(1, 13):
+            if self.ensure_tile(month) and not repaint_all:
+                self.update(self.tile_rects[month])
+        if repaint_all:
+            self.update()
+
+    def ensure_tile(self, month: int) -> bool:
+        """月份图块不存在或数据变化时重新绘制，返回是否重新绘制"""
+        year = self.year
+        last_day = calendar.monthrange(year, month)[1]
+        rows = self.store.range(date(year, month, 1), date(year, month, last_day), "day")
+        today = dayclock.now().date()
+        today_key = today.strftime("%Y-%m-%d") if (today.year, today.month) == (year, month) else None
+        signature = (tuple(rows), today_key, self.devicePixelRatioF())
+
+        key = (year, month)
+        cached = self.tiles.get(key)
+        if cached is not None and cached[0] == signature:
+            self.tiles.move_to_end(key)
+            return False
+        work_by_day = {row[0]: row[1] for row in rows}
+        self.tiles[key] = (signature, self.render_tile(year, month, work_by_day, today_key), work_by_day)
+        self.tiles.move_to_end(key)
+        while len(self.tiles) > TILE_CACHE_SIZE:
+            self.tiles.popitem(last=False)
+        return True
+
+    def render_tile(self, year: int, month: int, work_by_day: Dict[str, int],
+                    today_key: Optional[str]) -> QPixmap:
+        """把一个月的格子绘制到图块中"""
+        dpr = self.devicePixelRatioF()
+        rect = self.tile_rects[month]
+        pixmap = QPixmap(int(rect.width() * dpr), int(rect.height() * dpr))
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(QColor("#ffffff"))
+
+        painter = QPainter(pixmap)
+        painter.setPen(Qt.NoPen)
+        colors = [QColor(color) for color in LEVEL_COLORS]
+        for day in range(1, calendar.monthrange(year, month)[1] + 1):
+            date_key = f"{year:04d}-{month:02d}-{day:02d}"
+            column, row = cell_position(year, month, day)
+            cell = QRectF(column * CELL_STEP, row * CELL_STEP, CELL_SIZE, CELL_SIZE)
+            painter.fillRect(cell, colors[work_level(work_by_day.get(date_key, 0))])
+            if date_key == today_key:
+                painter.setPen(QPen(QColor(TODAY_COLOR), 1.5))
+                painter.setBrush(Qt.NoBrush)
+                painter.drawRect(cell.adjusted(0.75, 0.75, -0.75, -0.75))
+                painter.setPen(Qt.NoPen)
+        painter.end()
+        return pixmap
+
+    # ------------------------------------------------------------------
+    # 绘制
+    # ------------------------------------------------------------------
+
+    def paintEvent(self, event):
+        if self.tiles.get((self.year, 1)) is None or self.tiles[(self.year, 1)][0][2] != self.devicePixelRatioF():
+            # 第一次显示或设备像素比变化时绘制全部图块
+            for month in range(1, 13):
+                self.ensure_tile(month)
+
+        painter = QPainter(self)
+        clip = event.rect()
+        painter.fillRect(clip, QColor("#ffffff"))
+        painter.setFont(self.text_font)
+        painter.setPen(QColor("#7f8c8d"))
+
+        # 星期标签
+        if clip.left() < MARGIN_LEFT:
+            for row, label in WEEKDAY_LABELS.items():
+                painter.drawText(QRectF(0, MARGIN_TOP + row * CELL_STEP - 2, MARGIN_LEFT - 6, CELL_STEP),
+                                 Qt.AlignRight | Qt.AlignVCenter, label)
+
+        for month, rect in self.tile_rects.items():
+            if not rect.adjusted(0, -MARGIN_TOP, 0, 0).intersects(clip):
+                continue
+            painter.setPen(QColor("#7f8c8d"))
+            painter.drawText(QRectF(rect.x(), 0, rect.width() + MONTH_GAP, MARGIN_TOP - 4),
+                             Qt.AlignLeft | Qt.AlignBottom, f"{month}月")
+            cached = self.tiles.get((self.year, month))
+            if cached is not None:
+                painter.drawPixmap(rect.topLeft(), cached[1])
+
+        # 图例
+        legend_y = MARGIN_TOP + 7 * CELL_STEP + 8
+        legend_right = self.width() - 10
+        legend_x = legend_right - len(LEVEL_COLORS) * CELL_STEP - 30
+        if clip.bottom() >= legend_y:
+            painter.setPen(QColor("#7f8c8d"))
+            painter.drawText(QRectF(legend_x - 40, legend_y - 2, 36, CELL_STEP + 2),
+                             Qt.AlignRight | Qt.AlignVCenter, "少")
+            for i, color in enumerate(LEVEL_COLORS):
+                painter.fillRect(QRectF(legend_x + i * CELL_STEP, legend_y, CELL_SIZE, CELL_SIZE), QColor(color))
+            painter.drawText(QRectF(legend_x + len(LEVEL_COLORS) * CELL_STEP + 4, legend_y - 2, 30, CELL_STEP + 2),
+                             Qt.AlignLeft | Qt.AlignVCenter, "多")
+        painter.end()
+
+    # ------------------------------------------------------------------
+    # 悬停提示
+    # ------------------------------------------------------------------
+
+    def hit_test(self, x: int, y: int) -> Optional[str]:
+        for month, rect in self.tile_rects.items():
+            if not rect.contains(x, y):
+                continue
+            column = (x - rect.x()) // CELL_STEP
+            row = (y - rect.y()) // CELL_STEP
+            day = column * 7 + row - calendar.monthrange(self.year, month)[0] + 1
+            if not 1 <= day <= calendar.monthrange(self.year, month)[1]:
+                return None
+            date_key = f"{self.year:04d}-{month:02d}-{day:02d}"
+            cached = self.tiles.get((self.year, month))
+            work = cached[2].get(date_key, 0) if cached is not None else 0
+            return f"{date_key}\n工作: {format_time_short(work)}" if work else f"{date_key}\n无学习记录"
+        return None
+
+    def mouseMoveEvent(self, event):
+        text = self.hit_test(event.x(), event.y())
+        if text:
+            QToolTip.showText(event.globalPos(), text, self, QRect(event.pos(), QSize(1, 1)))
+        else:
+            QToolTip.hideText()
+        super().mouseMoveEvent(event)
+
+
+class YearHeatmapPanel(QWidget):
+    """历史记录选项卡中的全年学习日历和年份选择"""
+
+    def __init__(self, store: HistoryStore, parent: Optional[QWidget] = None):
+        super().__init__(parent)
+        self.store = store
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 10, 0, 0)
+
+        header = QHBoxLayout()
+        title = QLabel("年度学习日历")
+        title.setFont(QFont("Arial", 12, QFont.Bold))
+        title.setStyleSheet("color: #2c3e50;")
+        header.addWidget(title)
+        header.addStretch(1)
+        self.year_selector = QComboBox()
+        self.year_selector.currentIndexChanged.connect(self.on_year_changed)
+        header.addWidget(self.year_selector)
+        layout.addLayout(header)
+
+        self.heatmap = YearHeatmapWidget(store)
+        scroll = QScrollArea()
+        scroll.setWidget(self.heatmap)
+        scroll.setAlignment(Qt.AlignHCenter)
+        scroll.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        scroll.setFixedHeight(self.heatmap.height() + scroll.horizontalScrollBar().sizeHint().height() + 4)
+        scroll.setStyleSheet("QScrollArea { background-color: #ffffff; border: 1px solid #e0e0e0; border-radius: 10px; }")
+        layout.addWidget(scroll)
+        self.years: List[int] = []
+        self.update_years()
+
+    def available_years(self) -> List[int]:
+        # 按月汇总时整月归档的数据直接使用索引中的合计，不需要解压
+        years = {int(row[0][:4]) for row in self.store.range(granularity="month")}
+        years.add(dayclock.now().year)
+        return sorted(years, reverse=True)
+
+    def update_years(self):
+        years = self.available_years()
+        if years == self.years:
+            return
+        self.years = years
+        self.year_selector.blockSignals(True)
+        self.year_selector.clear()
+        self.year_selector.addItems([f"{year}年" for year in years])
+        self.year_selector.setCurrentIndex(years.index(self.heatmap.year) if self.heatmap.year in years else 0)
+        self.year_selector.blockSignals(False)
+
+    def on_year_changed(self, index: int):
+        if 0 <= index < len(self.years):
+            self.heatmap.set_year(self.years[index])
+
+    def refresh(self):
+        """历史数据变化后调用，只重绘数据变化的月份"""
+        self.update_years()
+        self.heatmap.refresh()
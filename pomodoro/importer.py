@@ -0,0 +1,471 @@
+import os
+import sys
+import csv
+import json
+import argparse
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, Iterator, List, Callable, MutableMapping, Set, Tuple
+
+from .storage import (get_app_dir, read_json_locked, update_json,
+                      HISTORY_FILE_NAME, SESSIONS_FILE_NAME)
+from .sessions import SessionLog, make_session_id, format_event_line
+from .archive import HistoryArchive
+from .model import MAX_SECONDS
+
+# 每批提交的记录数
+DEFAULT_BATCH_SIZE = 50000
+
+# 外部工具常见的列名
+DATE_COLUMNS = ("date", "day", "日期")
+START_COLUMNS = ("start", "start_time", "started_at", "begin", "开始时间")
+END_COLUMNS = ("end", "end_time", "ended_at", "finish", "结束时间")
+DURATION_COLUMNS = ("duration", "seconds", "length", "时长")
+KIND_COLUMNS = ("kind", "type", "category", "类型")
+WORK_COLUMNS = ("work_time", "work", "focus", "focus_time", "工作时间")
+BREAK_COLUMNS = ("break_time", "break", "rest", "休息时间")
+IDLE_COLUMNS = ("idle_time", "idle", "空闲休息时间")
+
+# 会话类型别名
+KIND_ALIASES = {
+    "work": "work", "focus": "work", "pomodoro": "work", "工作": "work",
+    "break": "break", "rest": "break", "short_break": "break", "long_break": "break", "休息": "break",
+    "idle": "idle", "空闲": "idle", "空闲休息": "idle",
+}
+
+DAY_FIELD_BY_KIND = {"work": "work_time", "break": "break_time", "idle": "idle_time"}
+
+
+class ImportStats:
+    """导入过程的统计信息"""
+
+    __slots__ = ("rows", "days", "sessions", "duplicates", "errors")
+
+    def __init__(self):
+        self.rows = 0
+        self.days = 0
+        self.sessions = 0
+        self.duplicates = 0
+        self.errors = 0
+
+    def __str__(self):
+        return (f"读取 {self.rows} 行，导入每日记录 {self.days} 条，会话记录 {self.sessions} 条，"
+                f"重复 {self.duplicates} 条，无法解析 {self.errors} 条")
+
+
+# ---------------------------------------------------------------------------
+# 流式读取
+# ---------------------------------------------------------------------------
+
+def iter_csv_rows(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, "r", newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = [name.strip().lower() for name in next(reader, [])]
+        for row in reader:
+            yield dict(zip(header, row))
+
+
+def iter_json_array(f, chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """流式解析顶层JSON数组，逐个产出数组元素"""
+    decoder = json.JSONDecoder()
+    buffer = f.read(chunk_size).lstrip()
+    if not buffer.startswith("["):
+        raise ValueError("不是JSON数组")
+    buffer = buffer[1:]
+    eof = False
+
+    while True:
+        buffer = buffer.lstrip().lstrip(",").lstrip()
+        if buffer.startswith("]"):
+            return
+        try:
+            item, end = decoder.raw_decode(buffer)
+        except ValueError:
+            # 当前缓冲区里的元素不完整，继续读取
+            if eof:
+                raise
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+            buffer += chunk
+            continue
+        yield item
+        buffer = buffer[end:]
+        if len(buffer) < chunk_size and not eof:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+            buffer += chunk
+
+
+def iter_json_lines(f) -> Iterator[Any]:
+    for line in f:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            # 损坏的行按无法解析的记录统计
+            yield {}
+
+
+def is_day_map(data: Any) -> bool:
+    return isinstance(data, dict) and bool(data) and all(isinstance(v, dict) for v in data.values())
+
+
+def iter_json_rows(path: str) -> Iterator[Dict[str, Any]]:
+    """读取JSON数组、JSON Lines或按日期为键的历史文件"""
+    with open(path, "r", encoding="utf-8-sig") as f:
+        head = f.read(1)
+        while head and head.isspace():
+            head = f.read(1)
+        f.seek(0)
+
+        if head == "[":
+            rows = iter_json_array(f)
+        elif head == "{":
+            try:
+                first = json.loads(f.readline())
+            except ValueError:
+                first = None
+            f.seek(0)
+            if first is not None and not is_day_map(first):
+                rows = iter_json_lines(f)
+            else:
+                # 与 pomodoro_history.json 相同的按日期为键的格式
+                data = json.load(f)
+                if is_day_map(data):
+                    rows = ({"date": k, **v} for k, v in data.items())
+                else:
+                    rows = iter([data])
+        else:
+            return
+
+        for row in rows:
+            if isinstance(row, dict):
+                yield {str(k).strip().lower(): v for k, v in row.items()}
+
+
+def iter_rows(path: str) -> Iterator[Dict[str, Any]]:
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".json", ".jsonl", ".ndjson"):
+        return iter_json_rows(path)
+    return iter_csv_rows(path)
+
+
+# ---------------------------------------------------------------------------
+# 字段解析
+# ---------------------------------------------------------------------------
+
+def parse_seconds(value: Any) -> int:
+    """解析时长，支持秒数和 HH:MM:SS / MM:SS 格式，负数或超出范围时抛出 ValueError"""
+    if value in (None, ""):
+        return 0
+    if isinstance(value, (int, float)):
+        seconds = int(value)
+    else:
+        value = str(value).strip()
+        if ":" in value:
+            seconds = 0
+            for part in value.split(":"):
+                part_seconds = int(float(part))
+                if part_seconds < 0:
+                    raise ValueError(f"时长不能为负数: {value}")
+                seconds = seconds * 60 + part_seconds
+        else:
+            seconds = int(float(value))
+    if not 0 <= seconds <= MAX_SECONDS:
+        raise ValueError(f"时长超出范围: {value}")
+    return seconds
+
+
+def parse_timestamp(value: Any) -> float:
+    """解析时间点，支持Unix时间戳和ISO格式"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    return datetime.fromisoformat(value.replace("/", "-")).timestamp()
+
+
+def parse_date_key(value: Any) -> str:
+    value = str(value).strip().replace("/", "-")
+    return datetime.strptime(value[:10], "%Y-%m-%d").strftime("%Y-%m-%d")
+
+
+def find_column(keys, names) -> Optional[str]:
+    for name in names:
+        if name in keys:
+            return name
+    return None
+
+
+class RowMapper:
+    """根据列名一次性确定各字段所在的列，避免逐行查找别名"""
+
+    def __init__(self, keys):
+        keys = set(keys)
+        self.start = find_column(keys, START_COLUMNS)
+        self.end = find_column(keys, END_COLUMNS)
+        self.duration = find_column(keys, DURATION_COLUMNS)
+        self.kind = find_column(keys, KIND_COLUMNS)
+        self.date = find_column(keys, DATE_COLUMNS)
+        self.work = find_column(keys, WORK_COLUMNS)
+        self.break_ = find_column(keys, BREAK_COLUMNS)
+        self.idle = find_column(keys, IDLE_COLUMNS)
+
+    def parse(self, row: Dict[str, Any]) -> Tuple[str, Any]:
+        """把一行外部数据映射为会话记录 (kind, start_ts, end_ts, completed) 或每日记录"""
+        start = row.get(self.start) if self.start else None
+        if start not in (None, ""):
+            start_ts = parse_timestamp(start)
+            end = row.get(self.end) if self.end else None
+            if end not in (None, ""):
+                end_ts = parse_timestamp(end)
+            else:
+                end_ts = start_ts + parse_seconds(row.get(self.duration) if self.duration else None)
+            if end_ts <= start_ts:
+                raise ValueError("会话结束时间早于开始时间")
+            if end_ts - start_ts > MAX_SECONDS:
+                raise ValueError("会话时长超出范围")
+
+            kind_value = (row.get(self.kind) if self.kind else None) or "work"
+            kind = KIND_ALIASES.get(kind_value) or KIND_ALIASES.get(str(kind_value).strip().lower())
+            if kind is None:
+                raise ValueError(f"未知的会话类型: {kind_value}")
+
+            completed = str(row.get("completed", "")).strip().lower() in ("1", "true", "yes")
+            return "session", (kind, start_ts, end_ts, completed)
+
+        date_value = row.get(self.date) if self.date else None
+        if date_value in (None, ""):
+            raise ValueError("缺少日期或开始时间")
+        return "day", (parse_date_key(date_value), {
+            "work_time": parse_seconds(row.get(self.work) if self.work else None),
+            "break_time": parse_seconds(row.get(self.break_) if self.break_ else None),
+            "idle_time": parse_seconds(row.get(self.idle) if self.idle else None),
+        })
+
+
+class DayKeyCache:
+    """把时间戳转换为本地日期字符串，缓存最近一次命中的日期区间
+
+    导入的会话通常按时间排序，同一天内的会话只需计算一次日期。
+    """
+
+    def __init__(self):
+        self.day_start = 0.0
+        self.day_end = -1.0
+        self.key = ""
+
+    def __call__(self, ts: float) -> str:
+        if self.day_start <= ts < self.day_end:
+            return self.key
+        moment = datetime.fromtimestamp(ts)
+        midnight = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+        self.day_start = midnight.timestamp()
+        self.day_end = (midnight + timedelta(days=1)).timestamp()
+        self.key = midnight.strftime("%Y-%m-%d")
+        return self.key
+
+
+# ---------------------------------------------------------------------------
+# 导入
+# ---------------------------------------------------------------------------
+
+class Importer:
+    """把外部数据批量导入到每日记录和会话日志
+
+    每日记录以日期为键去重，会话以 make_session_id 生成的ID去重。
+    会话按批追加到会话日志，历史文件每批只在文件锁保护下合并、重写一次，
+    因此导入时计时器程序可以继续运行。
+    已归档的日期同样视为已存在；会话属于已归档的日期时，
+    先把归档中的记录取回历史文件再累加，之后由计时器程序重新归档。
+    """
+
+    def __init__(self, history: MutableMapping[str, Dict[str, Any]], session_log: SessionLog,
+                 history_file: Optional[str] = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                 dry_run: bool = False,
+                 progress: Optional[Callable[[ImportStats], None]] = None,
+                 archive: Optional[HistoryArchive] = None):
+        self.history = history
+        self.archive = archive
+        self.session_log = session_log
+        self.history_file = history_file
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.progress = progress
+        self.stats = ImportStats()
+
+        self.known_days: Set[str] = set(history.keys())
+        self.known_sessions: Set[str] = session_log.existing_ids()
+        # 本批次的会话，提交时才带上记录时间编码为会话日志的行
+        self.pending_sessions: List[Tuple[str, str, str, float, float, int, bool]] = []
+        # 本批次新增的每日记录和会话带来的时长增量，提交时合并到历史文件
+        self.new_days: Dict[str, Dict[str, int]] = {}
+        self.day_deltas: Dict[str, Dict[str, int]] = {}
+        self.day_key = DayKeyCache()
+        # 本批次的记录时间（会话的 recorded_at、每日记录的 updated_at），每次提交时重新取得
+        self.recorded_at = datetime.now().timestamp()
+
+    def import_file(self, path: str) -> ImportStats:
+        mapper = None
+        mapper_keys = None
+        for row in iter_rows(path):
+            self.stats.rows += 1
+            # CSV的列固定，JSON记录的字段可能不同，字段变化时重新建立映射
+            if mapper is None or row.keys() != mapper_keys:
+                mapper_keys = row.keys()
+                mapper = RowMapper(mapper_keys)
+            # 写入模型也可能失败（例如累加后超出范围），同样只跳过这一行
+            try:
+                record_type, record = mapper.parse(row)
+                if record_type == "session":
+                    self.add_session(*record)
+                else:
+                    self.add_day(*record)
+            except (ValueError, TypeError, OverflowError):
+                self.stats.errors += 1
+                continue
+
+            if self.stats.rows % self.batch_size == 0:
+                self.commit()
+        self.commit()
+        return self.stats
+
+    def add_session(self, kind: str, start_ts: float, end_ts: float, completed: bool):
+        session_id = make_session_id(kind, start_ts)
+        if session_id in self.known_sessions:
+            self.stats.duplicates += 1
+            return
+
+        # 先把时长累加到对应日期的统计中，超出范围时在记录会话之前抛出异常，这一行整行跳过
+        date_key = self.day_key(start_ts)
+        duration = int(end_ts - start_ts)
+        field = DAY_FIELD_BY_KIND[kind]
+        day = self.history.get(date_key)
+        base = day if day is not None else self.archived_day(date_key)
+        total = base.get(field, 0) + duration
+        if total > MAX_SECONDS:
+            raise OverflowError(f"{date_key} 的时长超出范围")
+        if day is None:
+            # 重新取出记录，history 可能是 HistoryModel，赋值时保存的是副本
+            self.history[date_key] = base
+            day = self.history[date_key]
+            self.known_days.add(date_key)
+        day[field] = total
+        day["updated_at"] = self.recorded_at
+
+        self.known_sessions.add(session_id)
+        self.pending_sessions.append((session_id, kind, date_key, start_ts, end_ts, duration, completed))
+        self.stats.sessions += 1
+
+        delta = self.day_deltas.get(date_key)
+        if delta is None:
+            delta = self.day_deltas[date_key] = {}
+        delta[field] = delta.get(field, 0) + duration
+
+    def archived_day(self, date_key: str) -> Dict[str, Any]:
+        # 已归档日期的记录副本，没有归档时返回空记录
+        archived = self.archive.get(date_key) if self.archive is not None else None
+        if archived is not None:
+            return dict(archived)
+        return {"work_time": 0, "break_time": 0, "idle_time": 0}
+
+    def add_day(self, date_key: str, totals: Dict[str, int]):
+        if date_key in self.known_days or (self.archive is not None and self.archive.contains(date_key)):
+            self.stats.duplicates += 1
+            return
+        totals["updated_at"] = self.recorded_at
+        self.history[date_key] = totals
+        self.known_days.add(date_key)
+        # 保存副本：同一批次中这一天的会话会直接累加到 history 中的记录，同时计入 day_deltas
+        self.new_days[date_key] = dict(totals)
+        self.stats.days += 1
+
+    def merge_with_stamp(self, disk: Dict[str, Dict[str, Any]]):
+        # 在文件锁内取得记录时间，晚于之前任何一次写入历史文件的修改时间
+        self.next_stamp()
+        self.merge_into(disk)
+
+    def merge_into(self, disk: Dict[str, Dict[str, Any]]):
+        # 以文件中的最新内容为基础合并本批次的修改，不覆盖其他程序同时写入的数据
+        for date_key, totals in self.new_days.items():
+            if date_key not in disk:
+                disk[date_key] = dict(totals, updated_at=self.recorded_at)
+        for date_key, delta in self.day_deltas.items():
+            day = disk.get(date_key)
+            if day is None:
+                day = disk[date_key] = self.archived_day(date_key)
+            for field, seconds in delta.items():
+                day[field] = day.get(field, 0) + seconds
+            day["updated_at"] = self.recorded_at
+
+    def next_stamp(self) -> float:
+        # 每批提交时使用新的、严格递增的记录时间：增量导出的水位停在两批之间时，
+        # 之后提交的批次的时间一定晚于水位，不会被跳过
+        self.recorded_at = max(datetime.now().timestamp(), self.recorded_at + 0.001)
+        return self.recorded_at
+
+    def commit(self):
+        """提交一批：追加会话记录并重写一次历史文件"""
+        if not self.dry_run:
+            if self.pending_sessions:
+                recorded_at = self.next_stamp()
+                self.session_log.append_lines([format_event_line(*session, recorded_at)
+                                               for session in self.pending_sessions])
+            if (self.new_days or self.day_deltas) and self.history_file:
+                update_json(self.history_file, self.merge_with_stamp, {})
+        self.pending_sessions = []
+        self.new_days = {}
+        self.day_deltas = {}
+
+        if self.progress is not None:
+            self.progress(self.stats)
+
+
+def import_files(paths: List[str], app_dir: Optional[str] = None,
+                 batch_size: int = DEFAULT_BATCH_SIZE, dry_run: bool = False,
+                 progress: Optional[Callable[[ImportStats], None]] = None) -> ImportStats:
+    app_dir = app_dir or get_app_dir()
+    history_file = os.path.join(app_dir, HISTORY_FILE_NAME)
+    history = read_json_locked(history_file, {}) or {}
+    # 预演模式下不修改历史数据
+    if dry_run:
+        history = {k: dict(v) for k, v in history.items()}
+
+    importer = Importer(history, SessionLog(os.path.join(app_dir, SESSIONS_FILE_NAME)),
+                        history_file, batch_size, dry_run, progress, HistoryArchive(app_dir))
+    for path in paths:
+        importer.import_file(path)
+    return importer.stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="从其他时间记录工具批量导入数据")
+    parser.add_argument("inputs", nargs="+", help="CSV、JSON 或 JSON Lines 文件")
+    parser.add_argument("--data-dir", help="数据文件所在目录，默认为程序目录")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="每批提交的行数")
+    parser.add_argument("--dry-run", action="store_true", help="只统计将要导入的数据，不写入文件")
+    args = parser.parse_args(argv)
+
+    def report_progress(stats: ImportStats):
+        print(f"\r已处理 {stats.rows} 行...", end="", flush=True)
+
+    try:
+        stats = import_files(args.inputs, args.data_dir, args.batch_size, args.dry_run, report_progress)
+    except Exception as e:
+        print(f"\n导入失败: {e}")
+        return 1
+
+    print()
+    print(("[预演] " if args.dry_run else "") + str(stats))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+import os
+import getpass
+import hashlib
+from typing import Optional
+
+from PyQt5.QtCore import QObject, QLockFile, pyqtSignal
+from PyQt5.QtNetwork import QLocalServer, QLocalSocket
+
+# 通知已运行实例显示窗口的消息
+ACTIVATE_MESSAGE = b"activate\n"
+
+# 第二个实例连接已运行实例的超时时间（毫秒）
+CONNECT_TIMEOUT_MS = 200
+# 已运行实例可能还在启动中，连接失败时的重试次数
+CONNECT_RETRIES = 5
+
+LOCK_FILE_NAME = "pomodoro_instance.lock"
+
+
+def instance_key(app_dir: str) -> str:
+    """同一个数据目录、同一个用户只允许一个实例，据此生成本地套接字名称"""
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = ""
+    digest = hashlib.sha1(f"{user}:{os.path.abspath(app_dir)}".encode("utf-8")).hexdigest()
+    return f"pomodoro-timer-{digest[:16]}"
+
+
+class SingleInstance(QObject):
+    """单实例控制
+
+    用 QLockFile 判断是否已有实例在使用同一数据目录（进程崩溃后残留的锁会被自动识别），
+    用 QLocalServer 接收后启动实例的激活请求。
+    """
+
+    # 另一个实例请求显示窗口
+    activation_requested = pyqtSignal()
+
+    def __init__(self, app_dir: str, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.name = instance_key(app_dir)
+        self.lock = QLockFile(os.path.join(app_dir, LOCK_FILE_NAME))
+        self.lock.setStaleLockTime(0)
+        self.server: Optional[QLocalServer] = None
+
+    def try_lock(self) -> bool:
+        """尝试成为唯一的实例，成功返回 True"""
+        return self.lock.tryLock(0)
+
+    def notify_running_instance(self) -> bool:
+        """通知已运行的实例显示窗口，不需要 QApplication"""
+        for _ in range(CONNECT_RETRIES):
+            socket = QLocalSocket()
+            socket.connectToServer(self.name)
+            if socket.waitForConnected(CONNECT_TIMEOUT_MS):
+                socket.write(ACTIVATE_MESSAGE)
+                socket.waitForBytesWritten(CONNECT_TIMEOUT_MS)
+                socket.disconnectFromServer()
+                return True
+        return False
+
+    def listen(self) -> bool:
+        """开始监听激活请求，需要在创建 QApplication 之后调用"""
+        # 上一次异常退出可能残留了套接字文件（类Unix系统）
+        QLocalServer.removeServer(self.name)
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.UserAccessOption)
+        self.server.newConnection.connect(self._on_new_connection)
+        if not self.server.listen(self.name):
+            print(f"无法监听单实例套接字: {self.server.errorString()}")
+            return False
+        return True
+
+    def _on_new_connection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            socket.readyRead.connect(lambda s=socket: self._on_ready_read(s))
+            socket.disconnected.connect(socket.deleteLater)
+            if socket.bytesAvailable():
+                self._on_ready_read(socket)
+
+    def _on_ready_read(self, socket: QLocalSocket):
+        if bytes(socket.readAll()).startswith(ACTIVATE_MESSAGE.strip()):
+            self.activation_requested.emit()
+
+    def release(self):
+        if self.server is not None:
+            self.server.close()
+        self.lock.unlock()
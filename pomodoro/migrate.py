@@ -0,0 +1,418 @@
+import os
+import re
+import sys
+import json
+import math
+import shutil
+import time
+from datetime import date, datetime
+from typing import Optional, Dict, Any, Iterator, List, Tuple
+
+from .storage import (get_app_dir, file_lock, load_json, write_json_atomic, file_signature,
+                      HISTORY_FILE_NAME, STATE_FILE_NAME, STATE_VERSION)
+from .model import DURATION_FIELDS, MAX_SECONDS
+from .archive import HistoryArchive, HOT_DAYS, archive_cutoff, archive_old_days
+
+# 迁移进度文件，中断后再次运行时从这里继续
+CHECKPOINT_FILE_NAME = "pomodoro_migrate.json"
+
+# 每次读取的字节数，内存占用与它（而不是文件大小）成正比
+CHUNK_SIZE = 1 << 20
+# 单条每日记录的最大长度，超过时当作损坏的数据跳过
+MAX_RECORD_BYTES = 64 * 1024
+# 攒够这么多天的旧数据后写入一次归档并保存进度
+BATCH_DAYS = 2000
+
+_KEY_RE = re.compile(rb'"(\d{4}-\d{2}-\d{2})"\s*:\s*')
+_BRACE_RE = re.compile(rb'[{}]')
+# 块末尾可能是半个日期键，保留这么多字节到下一块
+_KEY_TAIL = 64
+
+
+def normalize_record(date_key: str, value: Any) -> Optional[Dict[str, Any]]:
+    """检查一条每日记录，返回规范化后的记录，无效时返回 None"""
+    try:
+        datetime.strptime(date_key, "%Y-%m-%d")
+    except ValueError:
+        return None
+    if not isinstance(value, dict):
+        return None
+    record: Dict[str, Any] = {}
+    for field in DURATION_FIELDS:
+        seconds = value.get(field, 0)
+        if (isinstance(seconds, bool) or not isinstance(seconds, (int, float))
+                or not math.isfinite(seconds) or not 0 <= seconds <= MAX_SECONDS):
+            return None
+        record[field] = int(seconds)
+    updated_at = value.get("updated_at", 0)
+    if (isinstance(updated_at, (int, float)) and not isinstance(updated_at, bool)
+            and math.isfinite(updated_at) and updated_at > 0):
+        record["updated_at"] = updated_at
+    return record
+
+
+def iter_history_records(path: str, offset: int = 0, stats: Optional[Dict[str, int]] = None,
+                         chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, Dict[str, Any], int]]:
+    """逐块读取按日期组织的历史文件，产出 (日期, 记录, 该记录之后的字节位置)
+
+    不解析整个文件，而是逐条查找 "YYYY-MM-DD": {...} 形式的记录，内存占用只与块大小有关。
+    损坏的记录（JSON错误、字段无效、被截断）计入 stats["damaged"] 并跳过，从下一个日期继续。
+    同一天出现多次时按文件中的顺序全部产出，以最后一次为准由调用方决定。
+    """
+    if stats is None:
+        stats = {}
+    stats.setdefault("records", 0)
+    stats.setdefault("damaged", 0)
+
+    with open(path, "rb") as f:
+        f.seek(offset)
+        buffer = b""
+        base = offset  # buffer[0] 在文件中的位置
+        eof = False
+        while True:
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer += chunk
+
+            pos = 0
+            pending = None  # 不完整的记录的开始位置，需要读取更多数据
+            while True:
+                key = _KEY_RE.search(buffer, pos)
+                if key is None:
+                    break
+                value_start = key.end()
+                if value_start >= len(buffer) and not eof:
+                    pending = key.start()
+                    break
+                if buffer[value_start:value_start + 1] != b"{":
+                    stats["damaged"] += 1
+                    pos = value_start
+                    continue
+                brace = _BRACE_RE.search(buffer, value_start + 1)
+                if brace is None or brace.end() - value_start > MAX_RECORD_BYTES:
+                    if brace is None and not eof and len(buffer) - value_start <= MAX_RECORD_BYTES:
+                        pending = key.start()
+                        break
+                    # 被截断或过长的记录
+                    stats["damaged"] += 1
+                    pos = value_start + 1
+                    continue
+                if brace.group() == b"{":
+                    # 记录中不应该有嵌套的对象，可能是两条记录被截断后拼在了一起
+                    stats["damaged"] += 1
+                    pos = brace.start()
+                    continue
+
+                end = brace.end()
+                try:
+                    value = json.loads(buffer[value_start:end])
+                except ValueError:
+                    value = None
+                date_key = key.group(1).decode("ascii")
+                record = normalize_record(date_key, value)
+                if record is None:
+                    stats["damaged"] += 1
+                    pos = value_start + 1
+                    continue
+                stats["records"] += 1
+                pos = end
+                yield date_key, record, base + end
+
+            if eof:
+                return
+            # 丢弃已经处理过的数据，保留不完整的记录或可能被截断的日期键
+            keep = pending if pending is not None else max(pos, len(buffer) - _KEY_TAIL)
+            base += keep
+            buffer = buffer[keep:]
+
+
+def salvage_history_file(path: str) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, int]]:
+    """从损坏的历史文件中找回完好的记录，原文件另存为 <path>.corrupt-<时间>
+
+    返回 ({日期: 记录}, 统计)。用于程序启动时历史文件无法解析的情况，历史文件只保存热数据，不会很大。
+    """
+    backup = f"{path}.corrupt-{time.strftime('%Y%m%d-%H%M%S')}"
+    shutil.copyfile(path, backup)
+    stats: Dict[str, int] = {}
+    data: Dict[str, Dict[str, Any]] = {}
+    for date_key, record, _ in iter_history_records(path, stats=stats):
+        data[date_key] = record
+    stats["days"] = len(data)
+    print(f"历史文件已备份到 {backup}，找回 {len(data)} 天的记录，跳过 {stats['damaged']} 条损坏的记录")
+    return data, stats
+
+
+# ---------------------------------------------------------------------------
+# 历史数据迁移
+# ---------------------------------------------------------------------------
+
+class MigrationError(Exception):
+    pass
+
+
+class HistoryMigration:
+    """把旧的（可能很大或部分损坏的）历史文件转换为当前的存储格式
+
+    当前格式为：历史文件只保存最近 hot_days 天的热数据，更早的整月数据压缩保存在归档中。
+    转换时只顺序读取一遍源文件，旧数据每攒够 batch_days 天写入一次归档并保存进度；
+    中断后再次运行会从上次保存的位置继续（重复写入同一天的记录不影响结果）。
+    转换完成后再读一遍源文件，逐天核对新格式中的数据和合计，核对通过才替换历史文件。
+    """
+
+    def __init__(self, app_dir: str, source: Optional[str] = None, today: Optional[date] = None,
+                 hot_days: int = HOT_DAYS, batch_days: int = BATCH_DAYS):
+        self.app_dir = app_dir
+        self.history_file = os.path.join(app_dir, HISTORY_FILE_NAME)
+        self.source = os.path.abspath(source or self.history_file)
+        self.in_place = self.source == os.path.abspath(self.history_file)
+        self.checkpoint_file = os.path.join(app_dir, CHECKPOINT_FILE_NAME)
+        self.today = today or date.today()
+        self.hot_days = hot_days
+        self.cutoff = archive_cutoff(self.today, hot_days)
+        self.batch_days = batch_days
+        self.archive = HistoryArchive(app_dir)
+        self.checkpoint: Dict[str, Any] = {}
+
+    # ------------------------------------------------------------------
+    # 进度
+    # ------------------------------------------------------------------
+
+    def load_checkpoint(self, restart: bool = False) -> bool:
+        """读取上次的进度，返回是否继续上次的迁移"""
+        signature = file_signature(self.source)
+        if signature is None:
+            raise MigrationError(f"找不到源文件: {self.source}")
+        checkpoint = None if restart else load_json(self.checkpoint_file)
+        if (isinstance(checkpoint, dict) and checkpoint.get("source") == self.source
+                and checkpoint.get("signature") == list(signature)
+                and checkpoint.get("cutoff") == self.cutoff):
+            self.checkpoint = checkpoint
+            return True
+        self.checkpoint = {
+            "version": 1,
+            "source": self.source,
+            "signature": list(signature),
+            "cutoff": self.cutoff,
+            "phase": "convert",
+            "offset": 0,
+            "hot": {},
+            "stats": {"records": 0, "damaged": 0},
+        }
+        return False
+
+    def save_checkpoint(self):
+        write_json_atomic(self.checkpoint_file, self.checkpoint)
+
+    # ------------------------------------------------------------------
+    # 迁移
+    # ------------------------------------------------------------------
+
+    def run(self, restart: bool = False, progress=None) -> Dict[str, Any]:
+        """执行迁移，返回统计信息；核对失败时抛出 MigrationError，源文件保持不变"""
+        resumed = self.load_checkpoint(restart)
+        if resumed:
+            print(f"从上次中断的位置继续迁移（{self.checkpoint['phase']}，"
+                  f"已读取 {self.checkpoint['offset']} 字节）")
+        elif self.in_place:
+            # 原地迁移前先备份源文件
+            backup = self.source + ".pre-migrate"
+            if not os.path.exists(backup):
+                shutil.copyfile(self.source, backup)
+            self.checkpoint["backup"] = backup
+        self.save_checkpoint()
+
+        if self.checkpoint["phase"] == "convert":
+            self.convert(progress)
+        result = self.verify()
+        self.replace()
+        try:
+            os.remove(self.checkpoint_file)
+        except OSError:
+            pass
+        return result
+
+    def convert(self, progress=None):
+        checkpoint = self.checkpoint
+        hot: Dict[str, Dict[str, Any]] = checkpoint["hot"]
+        stats: Dict[str, int] = checkpoint["stats"]
+        batch: Dict[str, Dict[str, Any]] = {}
+        offset = checkpoint["offset"]
+
+        def flush():
+            # 先写归档，再保存进度：中断后重新处理的记录只会覆盖成相同的内容
+            self.archive.add_days(batch)
+            batch.clear()
+            checkpoint["offset"] = offset
+            self.save_checkpoint()
+            if progress is not None:
+                progress(offset, stats)
+
+        for date_key, record, offset in iter_history_records(self.source, checkpoint["offset"], stats):
+            if date_key < self.cutoff:
+                batch[date_key] = record
+                if len(batch) >= self.batch_days:
+                    flush()
+            else:
+                hot[date_key] = record
+        flush()
+        checkpoint["phase"] = "verify"
+        self.save_checkpoint()
+
+    def verify(self) -> Dict[str, Any]:
+        """重新读取源文件，逐天核对迁移后的数据，返回统计信息"""
+        # 只保存每天的三个时长用于核对，同一天出现多次时以最后一次为准
+        expected: Dict[str, Tuple[int, int, int]] = {}
+        for date_key, record, _ in iter_history_records(self.source):
+            expected[date_key] = tuple(record[field] for field in DURATION_FIELDS)
+
+        hot = self.checkpoint["hot"]
+        source_totals = [0, 0, 0]
+        target_totals = [0, 0, 0]
+        mismatched: List[str] = []
+        for date_key in sorted(expected):
+            values = expected[date_key]
+            if date_key < self.cutoff:
+                record = self.archive.get(date_key)
+            else:
+                record = hot.get(date_key)
+            actual = tuple(record.get(field, 0) for field in DURATION_FIELDS) if record else None
+            for i in range(3):
+                source_totals[i] += values[i]
+                target_totals[i] += actual[i] if actual else 0
+            if actual != values:
+                mismatched.append(date_key)
+
+        result = {
+            "days": len(expected),
+            "archived_days": sum(1 for key in expected if key < self.cutoff),
+            "hot_days": sum(1 for key in expected if key >= self.cutoff),
+            "records": self.checkpoint["stats"]["records"],
+            "damaged": self.checkpoint["stats"]["damaged"],
+            "totals": dict(zip(DURATION_FIELDS, source_totals)),
+        }
+        if mismatched or source_totals != target_totals:
+            raise MigrationError(
+                f"核对失败：{len(mismatched)} 天的数据不一致（例如 {', '.join(mismatched[:5])}），"
+                f"源文件合计 {source_totals}，迁移后合计 {target_totals}。源文件没有被修改")
+        return result
+
+    def replace(self):
+        # 写入新的历史文件（只包含热数据）
+        with file_lock(self.history_file):
+            if self.in_place:
+                if list(file_signature(self.source) or ()) != self.checkpoint["signature"]:
+                    raise MigrationError("迁移期间历史文件被修改过（计时器可能正在运行），"
+                                         "请关闭计时器后使用 --restart 重新迁移")
+                history: Dict[str, Any] = {}
+            else:
+                # 从其他位置迁移时与现有的历史文件合并，同一天以源文件为准
+                history = load_json(self.history_file, {}) or {}
+            history.update(self.checkpoint["hot"])
+            archive_old_days(history, self.archive, self.today, self.hot_days)
+            write_json_atomic(self.history_file, dict(sorted(history.items())))
+
+
+# ---------------------------------------------------------------------------
+# 状态文件迁移
+# ---------------------------------------------------------------------------
+
+_STATE_FIELD_RE = re.compile(rb'"(\w+)"\s*:\s*(true|false|null|-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)')
+
+
+def normalize_state(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """把状态字典整理为当前格式，无效的字段使用默认值"""
+    def flag(name, default):
+        value = raw.get(name, default)
+        return value if isinstance(value, bool) else default
+
+    def timestamp(name):
+        value = raw.get(name)
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value) and value > 0:
+            return value
+        return None
+
+    time_left = raw.get("time_left")
+    if isinstance(time_left, bool) or not isinstance(time_left, (int, float)) or not math.isfinite(time_left):
+        time_left = None
+    return {
+        "version": STATE_VERSION,
+        "is_working": flag("is_working", True),
+        "is_running": flag("is_running", False),
+        "is_idle_break": flag("is_idle_break", False),
+        "time_left": int(max(0, min(time_left, MAX_SECONDS))) if time_left is not None else 25 * 60,
+        "timestamp": timestamp("timestamp"),
+        "idle_break_timestamp": timestamp("idle_break_timestamp"),
+    }
+
+
+def migrate_state(app_dir: str, source: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """转换状态文件，文件损坏时找回能识别的字段；返回新的状态，没有可用的状态时返回 None"""
+    state_file = os.path.join(app_dir, STATE_FILE_NAME)
+    source = source or state_file
+    if not os.path.exists(source):
+        return None
+    with open(source, "rb") as f:
+        raw_bytes = f.read(MAX_RECORD_BYTES)
+    try:
+        raw = json.loads(raw_bytes)
+    except ValueError:
+        raw = None
+    if not isinstance(raw, dict):
+        # 损坏的状态文件：逐个找回 "字段": 值
+        raw = {}
+        for match in _STATE_FIELD_RE.finditer(raw_bytes):
+            try:
+                raw[match.group(1).decode("ascii")] = json.loads(match.group(2))
+            except ValueError:
+                continue
+        if not raw:
+            return None
+    state = normalize_state(raw)
+    with file_lock(state_file):
+        write_json_atomic(state_file, state)
+    return state
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description="把历史数据和状态文件转换为当前的存储格式")
+    parser.add_argument("--data-dir", help="数据文件所在目录，默认为程序目录")
+    parser.add_argument("--source", help="要转换的历史文件，默认为数据目录中的历史文件")
+    parser.add_argument("--state-source", help="要转换的状态文件，默认为数据目录中的状态文件")
+    parser.add_argument("--hot-days", type=int, default=HOT_DAYS, help="历史文件中保留的天数")
+    parser.add_argument("--batch-days", type=int, default=BATCH_DAYS, help="每写入多少天的归档保存一次进度")
+    parser.add_argument("--restart", action="store_true", help="忽略上次中断的进度，从头开始")
+    args = parser.parse_args(argv)
+
+    app_dir = args.data_dir or get_app_dir()
+    migration = HistoryMigration(app_dir, args.source, hot_days=args.hot_days, batch_days=args.batch_days)
+    size = os.path.getsize(migration.source) if os.path.exists(migration.source) else 0
+
+    def progress(offset, stats):
+        percent = offset * 100 // size if size else 100
+        print(f"\r已读取 {percent}%，{stats['records']} 条记录，{stats['damaged']} 条损坏", end="", flush=True)
+
+    try:
+        result = migration.run(args.restart, progress)
+    except (MigrationError, OSError) as e:
+        print(f"\n迁移历史数据失败: {e}")
+        return 1
+    print()
+    totals = result["totals"]
+    print(f"历史数据迁移完成：{result['days']} 天（归档 {result['archived_days']} 天，"
+          f"历史文件 {result['hot_days']} 天），跳过 {result['damaged']} 条损坏的记录")
+    print(f"核对通过：工作 {totals['work_time'] / 3600:.1f} 小时，休息 {totals['break_time'] / 3600:.1f} 小时，"
+          f"空闲 {totals['idle_time'] / 3600:.1f} 小时")
+
+    try:
+        state = migrate_state(app_dir, args.state_source)
+    except OSError as e:
+        print(f"迁移状态文件失败: {e}")
+        return 1
+    if state is not None:
+        print("状态文件已转换")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
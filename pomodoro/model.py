@@ -0,0 +1,227 @@
+import sys
+from array import array
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+
+# 每日记录的字段。时长字段为非负整数秒，updated_at 为最后修改时间戳（0 表示未知）
+DURATION_FIELDS = ("work_time", "break_time", "idle_time")
+DAY_FIELDS = DURATION_FIELDS + ("updated_at",)
+# 时长字段保存在 array('I') 中，不能超过它的范围
+MAX_SECONDS = 2 ** 32 - 1
+
+
+class DayRecord(MutableMapping):
+    """某一天的记录视图，数据保存在 HistoryModel 的列数组中
+
+    同时支持 record["work_time"] 和 record.work_time 两种访问方式，
+    修改会直接写回模型。视图按日期定位所在行，删除其他日期后依然有效。
+    """
+
+    __slots__ = ("_model", "_date")
+
+    def __init__(self, model: "HistoryModel", date: str):
+        self._model = model
+        self._date = date
+
+    def __getitem__(self, key: str):
+        return self._model._columns[key][self._model._index[self._date]]
+
+    def __setitem__(self, key: str, value):
+        self._model._columns[key][self._model._index[self._date]] = value
+        self._model._notify(self._date)
+
+    def __delitem__(self, key: str):
+        raise TypeError("每日记录的字段不能删除")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(DAY_FIELDS)
+
+    def __len__(self) -> int:
+        return len(DAY_FIELDS)
+
+    def __repr__(self):
+        return f"DayRecord({self._date!r}, {dict(self)!r})"
+
+    @property
+    def date(self) -> str:
+        return self._date
+
+    @property
+    def work_time(self) -> int:
+        return self["work_time"]
+
+    @property
+    def break_time(self) -> int:
+        return self["break_time"]
+
+    @property
+    def idle_time(self) -> int:
+        return self["idle_time"]
+
+    @property
+    def updated_at(self) -> float:
+        return self["updated_at"]
+
+
+class HistoryModel(MutableMapping):
+    """紧凑的历史数据模型
+
+    每个字段一列 array（时长为 array('I')，修改时间为 array('d')），
+    另有一个 日期 -> 行号 的索引。对外表现为 {日期: {字段: 值}} 的映射，
+    原来按字典访问 history_data 的代码不需要修改。
+    任何一天的数据变化都会通知监听者（参数为日期，清空时为 None），供查询缓存失效使用。
+    """
+
+    def __init__(self, data: Optional[Mapping[str, Mapping[str, Any]]] = None):
+        self._listeners: List[Callable[[Optional[str]], None]] = []
+        self._index: Dict[str, int] = {}
+        self._dates: List[str] = []
+        self._columns: Dict[str, array] = {
+            "work_time": array("I"),
+            "break_time": array("I"),
+            "idle_time": array("I"),
+            "updated_at": array("d"),
+        }
+        if data:
+            self.update(data)
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Mapping[str, Any]]) -> "HistoryModel":
+        return cls(data)
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """转换为保存到文件的 {日期: {字段: 值}} 格式"""
+        work = self._columns["work_time"]
+        rest = self._columns["break_time"]
+        idle = self._columns["idle_time"]
+        updated = self._columns["updated_at"]
+        result = {}
+        for i, date in enumerate(self._dates):
+            day = {"work_time": work[i], "break_time": rest[i], "idle_time": idle[i]}
+            # 没有修改时间的旧记录保持原来的格式
+            if updated[i]:
+                day["updated_at"] = updated[i]
+            result[date] = day
+        return result
+
+    def add_listener(self, callback: Callable[[Optional[str]], None]):
+        self._listeners.append(callback)
+
+    def _notify(self, date: Optional[str]):
+        for callback in self._listeners:
+            callback(date)
+
+    # ------------------------------------------------------------------
+    # 映射接口
+    # ------------------------------------------------------------------
+
+    def __getitem__(self, date: str) -> DayRecord:
+        if date not in self._index:
+            raise KeyError(date)
+        return DayRecord(self, date)
+
+    def __setitem__(self, date: str, value: Mapping[str, Any]):
+        # 先转换全部字段，超出范围（负数或超过 2**32-1）时抛出 OverflowError，不会留下只写了一半的行
+        row = array("I", [int(value.get(field, 0)) for field in DURATION_FIELDS])
+        updated_at = float(value.get("updated_at", 0) or 0)
+        index = self._index.get(date)
+        if index is None:
+            index = len(self._dates)
+            self._index[date] = index
+            self._dates.append(date)
+            for column in self._columns.values():
+                column.append(0)
+        for field, seconds in zip(DURATION_FIELDS, row):
+            self._columns[field][index] = seconds
+        self._columns["updated_at"][index] = updated_at
+        self._notify(date)
+
+    def __delitem__(self, date: str):
+        # 用最后一行填补被删除的行，保持数组紧凑
+        index = self._index.pop(date)
+        last = len(self._dates) - 1
+        if index != last:
+            last_date = self._dates[last]
+            self._dates[index] = last_date
+            self._index[last_date] = index
+            for column in self._columns.values():
+                column[index] = column[last]
+        self._dates.pop()
+        for column in self._columns.values():
+            column.pop()
+        self._notify(date)
+
+    def __contains__(self, date) -> bool:
+        return date in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._dates)
+
+    def __repr__(self):
+        return f"HistoryModel({len(self)} days)"
+
+    def keys(self):
+        return self._index.keys()
+
+    def column(self, field: str) -> Tuple[List[str], array]:
+        """返回 (日期列表, 该字段的列)，两者按行一一对应，不按日期排序
+
+        返回的是模型内部的列表和数组，调用方不应修改；用于整列统计，避免逐条创建记录视图。
+        """
+        return self._dates, self._columns[field]
+
+    def setdefault(self, date: str, default: Optional[Mapping[str, Any]] = None) -> DayRecord:
+        # 返回写回模型的视图，而不是传入的默认字典
+        if date not in self._index:
+            self[date] = default or {}
+        return DayRecord(self, date)
+
+    def clear(self):
+        self._index.clear()
+        self._dates.clear()
+        for field, column in self._columns.items():
+            self._columns[field] = array(column.typecode)
+        self._notify(None)
+
+
+# ---------------------------------------------------------------------------
+# 内存测量
+# ---------------------------------------------------------------------------
+
+def measure_bytes_per_day(days: int = 3650) -> Dict[str, float]:
+    """分别用字典和 HistoryModel 保存 days 天的数据，返回每天占用的字节数"""
+    import tracemalloc
+    from datetime import date, timedelta
+
+    start = date(2015, 1, 1)
+    keys = [(start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days)]
+
+    def build_dicts():
+        return {
+            key: {"work_time": 3600 + i, "break_time": 600 + i, "idle_time": 300 + i,
+                  "updated_at": 1.7e9 + i}
+            for i, key in enumerate(keys)
+        }
+
+    results = {}
+    for name, build in (("dict", build_dicts),
+                        ("model", lambda: HistoryModel(build_dicts()))):
+        tracemalloc.start()
+        data = build()
+        before = tracemalloc.get_traced_memory()[0]
+        # HistoryModel 构建时的临时字典在这里已经释放，只统计常驻的部分
+        results[name] = before / days
+        tracemalloc.stop()
+        del data
+    return results
+
+
+if __name__ == "__main__":
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 3650
+    results = measure_bytes_per_day(days)
+    print(f"{days} 天的历史数据：")
+    print(f"  字典:         {results['dict']:.1f} 字节/天")
+    print(f"  HistoryModel: {results['model']:.1f} 字节/天")
@@ -0,0 +1,301 @@
+import os
+import sys
+import csv
+import time
+import argparse
+from datetime import date, timedelta
+from itertools import product
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy 是可选依赖，没有时使用纯Python实现
+    np = None
+
+from .storage import get_app_dir, SESSIONS_FILE_NAME
+from .sessions import SessionLog
+from . import dayclock
+
+# (工作秒数, 短休息秒数, 长休息秒数, 每几个番茄长休息一次)；长休息秒数或间隔为 0 表示没有长休息
+Cadence = Tuple[int, int, int, int]
+
+# 计时器当前的设置：25分钟工作，10分钟休息，没有长休息
+CURRENT_CADENCE: Cadence = (25 * 60, 10 * 60, 0, 0)
+
+# 相邻两段工作或休息之间的间隔不超过这个秒数时视为一直在学习（例如短暂暂停）
+GAP_TOLERANCE = 120
+
+# 默认的参数网格（分钟）
+DEFAULT_WORK_MINUTES = (15, 20, 25, 30, 35, 40, 45, 50, 55, 60)
+DEFAULT_BREAK_MINUTES = (3, 5, 10, 15)
+DEFAULT_LONG_BREAK_MINUTES = (0, 15, 20, 30)
+DEFAULT_LONG_EVERY = (2, 3, 4, 5)
+
+RESULT_FIELDS = ["work", "short_break", "long_break", "long_every", "work_time", "break_time",
+                 "idle_time", "completed", "interrupted", "work_share",
+                 "day_work_mean", "day_work_p50", "day_work_p90"]
+
+
+class SessionSpans:
+    """从会话记录中整理出的连续学习时间段
+
+    相邻的工作和休息记录（间隔不超过 GAP_TOLERANCE）合并为一段，空闲休息和较长的间隔把时间段分开。
+    回放时假设用户在每一段时间内都在计时器前，按另一种节奏重新安排工作和休息。
+    """
+
+    def __init__(self):
+        # 每段的长度（秒），按开始时间排序
+        self.lengths: List[int] = []
+        # 每段所在日期在 day_keys 中的下标，非递减
+        self.day_index: List[int] = []
+        self.day_keys: List[str] = []
+        # 实际记录的合计
+        self.recorded = {"work_time": 0, "break_time": 0, "idle_time": 0}
+
+
+def collect_spans(events: Iterable[Dict[str, Any]]) -> SessionSpans:
+    spans = SessionSpans()
+    segments = []
+    for event in events:
+        try:
+            start = float(event["start"])
+            end = float(event["end"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if end <= start:
+            continue
+        kind = event.get("kind")
+        if kind == "idle":
+            spans.recorded["idle_time"] += int(end - start)
+        elif kind in ("work", "break"):
+            spans.recorded[f"{kind}_time"] += int(end - start)
+            segments.append((start, end, str(event.get("date", ""))))
+    segments.sort()
+
+    span_start = span_end = None
+    span_day = ""
+    for start, end, day in segments:
+        if span_end is not None and start - span_end <= GAP_TOLERANCE:
+            span_end = max(span_end, end)
+            continue
+        if span_end is not None:
+            _add_span(spans, span_day, int(span_end - span_start))
+        span_start, span_end, span_day = start, end, day
+    if span_end is not None:
+        _add_span(spans, span_day, int(span_end - span_start))
+    return spans
+
+
+def _add_span(spans: SessionSpans, day: str, length: int):
+    if length <= 0:
+        return
+    if not spans.day_keys or spans.day_keys[-1] != day:
+        spans.day_keys.append(day)
+    spans.lengths.append(length)
+    spans.day_index.append(len(spans.day_keys) - 1)
+
+
+def make_grid(work: Sequence[int], short_break: Sequence[int], long_break: Sequence[int],
+              long_every: Sequence[int]) -> List[Cadence]:
+    """由各参数的取值（分钟）生成全部组合，没有长休息的组合只保留一个"""
+    cadences = []
+    seen = set()
+    for w, b, lb, n in product(work, short_break, long_break, long_every):
+        if w <= 0 or b < 0 or lb < 0 or n < 0:
+            raise ValueError("工作时间必须大于0，休息时间和间隔不能为负数")
+        cadence = (w * 60, b * 60, lb * 60, n) if lb > 0 and n > 0 else (w * 60, b * 60, 0, 0)
+        if cadence not in seen:
+            seen.add(cadence)
+            cadences.append(cadence)
+    return cadences
+
+
+# ---------------------------------------------------------------------------
+# 回放
+#
+# 一段长度为 T 的时间按 工作-短休息-...-工作-长休息 循环安排，一个循环包含 N 个番茄：
+#   周期 P = N*W + (N-1)*B + L，完整循环 k = T // P，剩余 r = T - k*P。
+# 剩余时间里最多还能完成 j = min(r // (W+B), N-1) 组工作和短休息，
+# 之后的 r2 = r - j*(W+B) 先用于工作，超出 W 的部分是休息（短休息或长休息都适用）。
+# 因此每段时间的结果都有闭式解，不需要逐分钟模拟，可以对所有时间段和参数组合一起计算。
+# ---------------------------------------------------------------------------
+
+def _normalize(cadence: Cadence) -> Tuple[int, int, int, int]:
+    work, short_break, long_break, long_every = cadence
+    if long_break <= 0 or long_every <= 0:
+        # 没有长休息：每个番茄之后都是短休息
+        return work, short_break, short_break, 1
+    return work, short_break, long_break, long_every
+
+
+def _simulate_numpy(spans: SessionSpans, cadences: Sequence[Cadence]):
+    params = np.array([_normalize(c) for c in cadences], dtype=np.int64)
+    W, B, L, N = (params[:, i:i + 1] for i in range(4))
+    T = np.asarray(spans.lengths, dtype=np.int64)[None, :]
+
+    period = N * W + (N - 1) * B + L
+    k = T // period
+    r = T - k * period
+    j = np.minimum(r // (W + B), N - 1)
+    r2 = r - j * (W + B)
+    work = k * N * W + j * W + np.minimum(r2, W)
+    completed = (k * N + j + (r2 >= W)).sum(axis=1)
+    interrupted = ((r2 > 0) & (r2 < W)).sum(axis=1)
+
+    # 时间段按日期排序，按天求和
+    day_index = np.asarray(spans.day_index)
+    day_starts = np.flatnonzero(np.r_[True, day_index[1:] != day_index[:-1]])
+    day_work = np.add.reduceat(work, day_starts, axis=1)
+    p50, p90 = np.percentile(day_work, [50, 90], axis=1)
+    return (work.sum(axis=1).tolist(), completed.tolist(), interrupted.tolist(),
+            day_work.mean(axis=1).tolist(), p50.tolist(), p90.tolist())
+
+
+def _percentile(values: List[int], q: float) -> float:
+    # 与 numpy.percentile 默认的线性插值一致
+    values = sorted(values)
+    position = (len(values) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+def _simulate_python(spans: SessionSpans, cadences: Sequence[Cadence]):
+    totals, completed_list, interrupted_list, means, p50s, p90s = [], [], [], [], [], []
+    n_days = len(spans.day_keys)
+    for cadence in cadences:
+        W, B, L, N = _normalize(cadence)
+        period = N * W + (N - 1) * B + L
+        day_work = [0] * n_days
+        completed = interrupted = 0
+        for length, day in zip(spans.lengths, spans.day_index):
+            k, r = divmod(length, period)
+            j = min(r // (W + B), N - 1)
+            r2 = r - j * (W + B)
+            work = k * N * W + j * W + min(r2, W)
+            day_work[day] += work
+            completed += k * N + j + (r2 >= W)
+            interrupted += 0 < r2 < W
+        totals.append(sum(day_work))
+        completed_list.append(completed)
+        interrupted_list.append(interrupted)
+        means.append(sum(day_work) / n_days)
+        p50s.append(_percentile(day_work, 50))
+        p90s.append(_percentile(day_work, 90))
+    return totals, completed_list, interrupted_list, means, p50s, p90s
+
+
+def simulate(spans: SessionSpans, cadences: Sequence[Cadence],
+             use_numpy: Optional[bool] = None) -> List[Dict[str, Any]]:
+    """按每种节奏重新安排全部时间段，返回每种节奏的工作、休息、空闲分布"""
+    if not spans.lengths or not cadences:
+        return []
+    if use_numpy is None:
+        use_numpy = np is not None
+    simulate_backend = _simulate_numpy if use_numpy else _simulate_python
+    totals, completed, interrupted, means, p50s, p90s = simulate_backend(spans, cadences)
+
+    available = sum(spans.lengths)
+    idle = spans.recorded["idle_time"]
+    results = []
+    for i, (work, short_break, long_break, long_every) in enumerate(cadences):
+        work_time = int(totals[i])
+        break_time = available - work_time
+        results.append({
+            "work": work, "short_break": short_break, "long_break": long_break, "long_every": long_every,
+            "work_time": work_time, "break_time": break_time, "idle_time": idle,
+            "completed": int(completed[i]), "interrupted": int(interrupted[i]),
+            "work_share": work_time / (available + idle) if available + idle else 0.0,
+            "day_work_mean": float(means[i]), "day_work_p50": float(p50s[i]), "day_work_p90": float(p90s[i]),
+        })
+    return results
+
+
+# ---------------------------------------------------------------------------
+# 命令行
+# ---------------------------------------------------------------------------
+
+def format_minutes(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+
+
+def describe_cadence(result: Dict[str, Any]) -> str:
+    text = f"{result['work'] // 60}/{result['short_break'] // 60}"
+    if result["long_every"]:
+        text += f" 每{result['long_every']}个长休息{result['long_break'] // 60}"
+    return text
+
+
+def write_results(results: List[Dict[str, Any]], path: str):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="按不同的工作/休息节奏回放历史会话记录")
+    parser.add_argument("--work", type=int, nargs="+", default=DEFAULT_WORK_MINUTES, help="工作时长（分钟）")
+    parser.add_argument("--break", dest="short_break", type=int, nargs="+", default=DEFAULT_BREAK_MINUTES,
+                        help="短休息时长（分钟）")
+    parser.add_argument("--long-break", type=int, nargs="+", default=DEFAULT_LONG_BREAK_MINUTES,
+                        help="长休息时长（分钟），0 表示没有长休息")
+    parser.add_argument("--long-every", type=int, nargs="+", default=DEFAULT_LONG_EVERY,
+                        help="每完成几个番茄长休息一次")
+    parser.add_argument("--start", help="开始日期 YYYY-MM-DD，默认为一年前")
+    parser.add_argument("--end", help="结束日期 YYYY-MM-DD，默认为今天")
+    parser.add_argument("--sort", choices=("work_time", "completed", "interrupted", "day_work_p90"),
+                        default="work_time", help="排序依据，默认为工作时间")
+    parser.add_argument("--top", type=int, default=20, help="显示前几种节奏")
+    parser.add_argument("--output", help="把全部结果写入 CSV 文件")
+    parser.add_argument("--no-numpy", action="store_true", help="不使用 numpy")
+    parser.add_argument("--data-dir", help="数据文件所在目录，默认为程序目录")
+    args = parser.parse_args(argv)
+
+    try:
+        end = date.fromisoformat(args.end) if args.end else dayclock.now().date()
+        start = date.fromisoformat(args.start) if args.start else end - timedelta(days=365)
+        cadences = make_grid(args.work, args.short_break, args.long_break, args.long_every)
+    except ValueError as e:
+        print(f"参数错误: {e}")
+        return 1
+
+    session_log = SessionLog(os.path.join(args.data_dir or get_app_dir(), SESSIONS_FILE_NAME))
+    spans = collect_spans(session_log.iter_events(start, end))
+    if not spans.lengths:
+        print("这段时间没有工作或休息记录")
+        return 0
+
+    begin = time.perf_counter()
+    results = simulate(spans, cadences, False if args.no_numpy else None)
+    elapsed = (time.perf_counter() - begin) * 1000
+    current = simulate(spans, [CURRENT_CADENCE], False if args.no_numpy else None)[0]
+
+    recorded = spans.recorded
+    print(f"{start} ~ {end}: {len(spans.day_keys)} 天, {len(spans.lengths)} 段学习时间, "
+          f"回放 {len(cadences)} 种节奏用时 {elapsed:.1f} ms")
+    print(f"实际记录: 工作 {format_minutes(recorded['work_time'])}, 休息 {format_minutes(recorded['break_time'])}, "
+          f"空闲 {format_minutes(recorded['idle_time'])}")
+    print(f"当前设置 {describe_cadence(current)}: 工作 {format_minutes(current['work_time'])}, "
+          f"休息 {format_minutes(current['break_time'])}, 完成 {current['completed']} 个番茄")
+    print()
+    print(f"{'节奏':<20}{'工作':>10}{'休息':>10}{'完成':>8}{'中断':>8}{'日均工作':>10}{'P90':>10}")
+    ranked = sorted(results, key=lambda result: result[args.sort], reverse=args.sort != "interrupted")
+    for result in ranked[:args.top]:
+        print(f"{describe_cadence(result):<20}{format_minutes(result['work_time']):>10}"
+              f"{format_minutes(result['break_time']):>10}{result['completed']:>8}{result['interrupted']:>8}"
+              f"{format_minutes(result['day_work_mean']):>10}{format_minutes(result['day_work_p90']):>10}")
+
+    if args.output:
+        try:
+            write_results(results, args.output)
+        except OSError as e:
+            print(f"保存结果失败: {e}")
+            return 1
+        print(f"已保存 {len(results)} 种节奏的结果到 {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,402 @@
+from collections import OrderedDict
+from datetime import date, timedelta
+from string import Template
+from typing import Optional, Dict, Any, List, Mapping, Tuple
+
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QTextEdit, QComboBox,
+                             QPushButton, QLabel, QFileDialog, QMessageBox)
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from .analytics import TrendSummary, TREND_DAYS, EWMA_SPANS, WEEKDAY_NAMES
+from .store import HistoryStore
+
+# 报告类型
+REPORT_DAILY = "daily"
+REPORT_WEEKLY = "weekly"
+REPORT_TYPES = {
+    REPORT_DAILY: "今日学习报告",
+    REPORT_WEEKLY: "近四周学习报告",
+}
+
+# 渲染缓存最多保留的报告数量
+CACHE_SIZE = 16
+
+MOTIVATIONAL_QUOTES = [
+    "坚持不一定会成功，但放弃一定会失败。",
+    "每一个成功者都有一个开始。勇于开始，才能找到成功的路。",
+    "学习是一种习惯，也是一种享受。",
+    "努力的意义，不是一定会成功，而是你可以问心无愧。",
+    "成功不是将来才有的，而是从决定去做的那一刻起，持续累积而成。"
+]
+
+# ---------------------------------------------------------------------------
+# 报告模板
+# ---------------------------------------------------------------------------
+
+TITLE = Template("<h2 style='color: #3498db; text-align: center;'>📊 $title</h2><hr>")
+PARAGRAPH = Template("<p>$text</p>")
+WORK_TIME = Template("<b style='color: #3498db;'>$time</b>")
+COMPARE = Template("<p><b>今天工作时间:</b> <span style='color: #3498db;'>$today</span></p>"
+                   "<p><b>昨天工作时间:</b> <span style='color: #7f8c8d;'>$yesterday</span></p>")
+BETTER = Template("<p style='background-color: #e8f8f5; padding: 10px; border-radius: 5px;'>🎉 <b>做得好！</b> "
+                  "今天比昨天多学习了 <b style='color: #27ae60;'>$diff</b> ($percent%)。</p>")
+WORSE = Template("<p style='background-color: #fef5e7; padding: 10px; border-radius: 5px;'>⚠️ <b>提醒：</b> "
+                 "今天比昨天少学习了 <b style='color: #e74c3c;'>$diff</b> ($percent%)。</p>")
+ADVICE = ("<p>没关系，每个人都有状态起伏的时候。明天试着：</p>"
+          "<ul>"
+          "<li>设定一个明确的学习目标</li>"
+          "<li>避免学习过程中的干扰</li>"
+          "<li>适当休息，保持精力充沛</li>"
+          "</ul>"
+          "<p>相信明天的你会做得更好！加油！🔥</p>")
+QUOTE = Template("<p style='text-align: center; color: #3498db; margin-top: 20px;'><i>\"$quote\"</i></p>")
+TABLE_START = Template("<table width='100%' cellspacing='0' cellpadding='6' style='border-collapse: collapse;'>"
+                       "<tr style='background-color: #ecf0f1;'><th align='left'>$label</th><th align='right'>工作</th>"
+                       "<th align='right'>休息</th><th align='right'>空闲</th><th align='right'>日均工作</th></tr>")
+TABLE_ROW = Template("<tr><td>$label</td><td align='right' style='color: #3498db;'>$work</td>"
+                     "<td align='right' style='color: #2ecc71;'>$break_</td>"
+                     "<td align='right' style='color: #f39c12;'>$idle</td>"
+                     "<td align='right'>$average</td></tr>")
+TABLE_END = "</table>"
+TREND = Template("<h3 style='color: #2c3e50;'>📈 趋势分析</h3>"
+                 "<p><b>近$trend_days天趋势:</b> <span style='color: $trend_color;'>$trend</span></p>"
+                 "<p><b>加权日均工作:</b> 近$short_span天 $ewma_short，近$long_span天 $ewma_long</p>"
+                 "<p><b>学习最多的日子:</b> $best_weekday</p>"
+                 "<p><b>下周预计学习:</b> $forecast（上周 $last_week）</p>")
+
+
+def format_time(seconds: int) -> str:
+    hours = seconds // 3600
+    minutes = (seconds % 3600) // 60
+    seconds = seconds % 60
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+def pick_quote(day: date) -> str:
+    # 同一天内始终显示同一句，缓存的报告与重新生成的报告保持一致
+    return MOTIVATIONAL_QUOTES[day.toordinal() % len(MOTIVATIONAL_QUOTES)]
+
+
+def render_trend(analytics: Optional[TrendSummary]) -> str:
+    """趋势分析段落，历史不足一周时不显示"""
+    if analytics is None or analytics.days < 7:
+        return ""
+    slope = int(analytics.slope)
+    if slope > 0:
+        trend, trend_color = f"每天多学习 {format_time(slope)}", "#27ae60"
+    elif slope < 0:
+        trend, trend_color = f"每天少学习 {format_time(-slope)}", "#e74c3c"
+    else:
+        trend, trend_color = "保持稳定", "#7f8c8d"
+    best = analytics.best_weekday()
+    return TREND.substitute(
+        trend_days=TREND_DAYS, trend=trend, trend_color=trend_color,
+        short_span=EWMA_SPANS[0], ewma_short=format_time(int(analytics.ewma[EWMA_SPANS[0]])),
+        long_span=EWMA_SPANS[-1], ewma_long=format_time(int(analytics.ewma[EWMA_SPANS[-1]])),
+        best_weekday=WEEKDAY_NAMES[best] if best is not None else "--",
+        forecast=WORK_TIME.substitute(time=format_time(int(analytics.forecast_total))),
+        last_week=format_time(int(analytics.last_week_total)))
+
+
+# ---------------------------------------------------------------------------
+# 报告渲染（纯Python，可以在工作线程中执行）
+# ---------------------------------------------------------------------------
+
+def render_daily(history: Mapping[str, Dict[str, Any]], today: date,
+                 analytics: Optional[TrendSummary] = None) -> str:
+    yesterday = today - timedelta(days=1)
+    today_str = today.strftime("%Y-%m-%d")
+    yesterday_str = yesterday.strftime("%Y-%m-%d")
+
+    parts: List[str] = [TITLE.substitute(title=f"{today_str} 学习报告")]
+
+    # 检查昨天的数据是否存在
+    if yesterday_str in history and today_str in history:
+        today_data = history[today_str]
+        yesterday_data = history[yesterday_str]
+
+        # 如果昨天数据为null或0，说明可能有其他事情，不进行比较
+        if yesterday_data["work_time"] == 0:
+            parts.append(PARAGRAPH.substitute(text="昨天没有记录到学习数据，可能有其他事情。"))
+            parts.append(PARAGRAPH.substitute(
+                text=f"今天已经学习了 {WORK_TIME.substitute(time=format_time(today_data['work_time']))}。"))
+            parts.append(PARAGRAPH.substitute(text="继续保持！💪"))
+        else:
+            today_work_hours = today_data["work_time"] / 3600
+            yesterday_work_hours = yesterday_data["work_time"] / 3600
+            diff_hours = today_work_hours - yesterday_work_hours
+            diff_percentage = (diff_hours / yesterday_work_hours) * 100
+
+            parts.append(COMPARE.substitute(today=format_time(today_data["work_time"]),
+                                            yesterday=format_time(yesterday_data["work_time"])))
+
+            # 根据对比结果给出鼓励或提醒
+            if diff_hours >= 0:
+                parts.append(BETTER.substitute(diff=format_time(int(diff_hours * 3600)),
+                                               percent=f"{diff_percentage:.1f}"))
+                # 根据工作时间的长短给出不同的鼓励
+                if today_work_hours > 6:
+                    text = "你今天的学习时间非常充实！继续保持这样的热情，相信你一定能够达成你的目标！💪"
+                elif today_work_hours > 3:
+                    text = "你的学习状态很好，请继续保持！坚持就是胜利！😊"
+                else:
+                    text = "虽然时间不多，但每一分钟的进步都很重要！明天继续加油！🌟"
+                parts.append(PARAGRAPH.substitute(text=text))
+            else:
+                parts.append(WORSE.substitute(diff=format_time(int(abs(diff_hours) * 3600)),
+                                              percent=f"{abs(diff_percentage):.1f}"))
+                parts.append(ADVICE)
+    else:
+        # 如果昨天或今天的数据不存在
+        if today_str in history:
+            parts.append(PARAGRAPH.substitute(
+                text=f"今天已经学习了 {WORK_TIME.substitute(time=format_time(history[today_str]['work_time']))}。"))
+            parts.append(PARAGRAPH.substitute(text="继续保持！💪"))
+        else:
+            parts.append(PARAGRAPH.substitute(text="今天还没有开始学习记录。现在开始专注一会儿吧！⏰"))
+
+        if yesterday_str not in history:
+            parts.append(PARAGRAPH.substitute(text="昨天没有学习记录，所以无法进行对比。"))
+
+    parts.append(render_trend(analytics))
+    parts.append(QUOTE.substitute(quote=pick_quote(today)))
+    return "".join(parts)
+
+
+def render_weekly(history: Mapping[str, Dict[str, Any]], today: date,
+                  analytics: Optional[TrendSummary] = None, weeks: int = 4) -> str:
+    # 以周一为一周的开始，最后一周为本周
+    this_monday = today - timedelta(days=today.weekday())
+    parts: List[str] = [TITLE.substitute(title=f"近{weeks}周学习报告")]
+
+    parts.append(TABLE_START.substitute(label="周"))
+    best_week: Optional[Tuple[int, str]] = None
+    total_work = 0
+    for i in range(weeks - 1, -1, -1):
+        monday = this_monday - timedelta(weeks=i)
+        work = rest = idle = active_days = 0
+        for offset in range(7):
+            day = monday + timedelta(days=offset)
+            if day > today:
+                break
+            data = history.get(day.strftime("%Y-%m-%d"))
+            if not data:
+                continue
+            work += data["work_time"]
+            rest += data["break_time"]
+            idle += data["idle_time"]
+            if data["work_time"] > 0:
+                active_days += 1
+
+        label = f"{monday.strftime('%m-%d')} ~ {(monday + timedelta(days=6)).strftime('%m-%d')}"
+        average = format_time(work // active_days) if active_days else "--"
+        parts.append(TABLE_ROW.substitute(label=label, work=format_time(work), break_=format_time(rest),
+                                          idle=format_time(idle), average=average))
+        total_work += work
+        if work > 0 and (best_week is None or work > best_week[0]):
+            best_week = (work, label)
+    parts.append(TABLE_END)
+
+    if best_week is None:
+        parts.append(PARAGRAPH.substitute(text="最近几周还没有学习记录。现在开始专注一会儿吧！⏰"))
+    else:
+        parts.append(PARAGRAPH.substitute(
+            text=f"近{weeks}周共学习 {WORK_TIME.substitute(time=format_time(total_work))}，"
+                 f"学习最多的一周是 <b>{best_week[1]}</b>（{format_time(best_week[0])}）。"))
+
+    parts.append(render_trend(analytics))
+    parts.append(QUOTE.substitute(quote=pick_quote(today)))
+    return "".join(parts)
+
+
+RENDERERS = {
+    REPORT_DAILY: render_daily,
+    REPORT_WEEKLY: render_weekly,
+}
+
+# 每种报告需要的历史天数（从今天往前）
+REPORT_DAYS = {
+    REPORT_DAILY: 2,
+    REPORT_WEEKLY: 7 * 5,
+}
+
+
+def snapshot_history(store: HistoryStore, report_type: str,
+                     today: date) -> Dict[str, Dict[str, Any]]:
+    """复制报告需要的那几天数据，交给工作线程使用，避免与界面线程共享可变数据"""
+    start = today - timedelta(days=REPORT_DAYS[report_type] - 1)
+    return {key: {"work_time": work, "break_time": rest, "idle_time": idle}
+            for key, work, rest, idle in store.range(start, today, "day")}
+
+
+# ---------------------------------------------------------------------------
+# 后台渲染与缓存
+# ---------------------------------------------------------------------------
+
+class _RenderSignals(QObject):
+    finished = pyqtSignal(object, str)
+
+
+class _RenderTask(QRunnable):
+    def __init__(self, key, report_type: str, history: Dict[str, Dict[str, Any]], today: date,
+                 analytics: Optional[TrendSummary] = None):
+        super().__init__()
+        self.key = key
+        self.report_type = report_type
+        self.history = history
+        self.today = today
+        self.analytics = analytics
+        self.signals = _RenderSignals()
+
+    def run(self):
+        try:
+            html = RENDERERS[self.report_type](self.history, self.today, self.analytics)
+        except Exception as e:
+            print(f"生成报告失败: {e}")
+            html = PARAGRAPH.substitute(text=f"生成报告失败: {e}")
+        self.signals.finished.emit(self.key, html)
+
+
+class ReportEngine(QObject):
+    """在工作线程中渲染报告，并按 (数据版本, 报告类型, 日期) 缓存渲染结果"""
+
+    # 报告渲染完成：(缓存键, HTML)
+    report_ready = pyqtSignal(object, str)
+
+    def __init__(self, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.cache: "OrderedDict[Tuple[int, str, str], str]" = OrderedDict()
+        self.pending = set()
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+
+    @staticmethod
+    def make_key(data_version: int, report_type: str, today: date) -> Tuple[int, str, str]:
+        return (data_version, report_type, today.strftime("%Y-%m-%d"))
+
+    def cached(self, data_version: int, report_type: str, today: date) -> Optional[str]:
+        key = self.make_key(data_version, report_type, today)
+        html = self.cache.get(key)
+        if html is not None:
+            self.cache.move_to_end(key)
+        return html
+
+    def request(self, store: HistoryStore, data_version: int,
+                report_type: str, today: date,
+                analytics: Optional[TrendSummary] = None) -> Optional[str]:
+        """请求一份报告：命中缓存时直接返回HTML，否则在后台渲染并通过 report_ready 通知
+
+        analytics 是同一数据版本的趋势分析结果，创建后不再修改，可以直接交给工作线程。
+        """
+        html = self.cached(data_version, report_type, today)
+        if html is not None:
+            return html
+
+        key = self.make_key(data_version, report_type, today)
+        if key not in self.pending:
+            self.pending.add(key)
+            task = _RenderTask(key, report_type, snapshot_history(store, report_type, today), today,
+                               analytics)
+            task.signals.finished.connect(self._on_finished)
+            self.pool.start(task)
+        return None
+
+    def _on_finished(self, key, html: str):
+        self.pending.discard(key)
+        self.cache[key] = html
+        self.cache.move_to_end(key)
+        while len(self.cache) > CACHE_SIZE:
+            self.cache.popitem(last=False)
+        self.report_ready.emit(key, html)
+
+
+HTML_PAGE = Template("<!DOCTYPE html><html><head><meta charset='utf-8'><title>$title</title></head>"
+                     "<body style='font-family: sans-serif; max-width: 720px; margin: auto;'>$body</body></html>")
+
+
+class ReportDialog(QDialog):
+    """学习报告对话框，只创建一次，重复打开时复用"""
+
+    # 用户切换了报告类型
+    report_type_changed = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("学习报告")
+        self.setMinimumSize(500, 400)
+        self.expected_key = None
+        self.html = ""
+
+        layout = QVBoxLayout(self)
+
+        type_layout = QHBoxLayout()
+        type_layout.addWidget(QLabel("报告类型:"))
+        self.type_combo = QComboBox()
+        for report_type, name in REPORT_TYPES.items():
+            self.type_combo.addItem(name, report_type)
+        self.type_combo.currentIndexChanged.connect(
+            lambda index: self.report_type_changed.emit(self.type_combo.itemData(index)))
+        type_layout.addWidget(self.type_combo)
+        type_layout.addStretch()
+        layout.addLayout(type_layout)
+
+        # 创建报告内容
+        self.report_text = QTextEdit()
+        self.report_text.setReadOnly(True)
+        layout.addWidget(self.report_text)
+
+        # 创建对话框按钮
+        button_layout = QHBoxLayout()
+        self.save_button = QPushButton("保存为HTML")
+        self.save_button.clicked.connect(self.save_html)
+        button_layout.addWidget(self.save_button)
+        button_layout.addStretch()
+        ok_button = QPushButton("确定")
+        ok_button.clicked.connect(self.accept)
+        button_layout.addWidget(ok_button)
+        layout.addLayout(button_layout)
+
+    def report_type(self) -> str:
+        return self.type_combo.currentData()
+
+    def show_report(self, key, html: Optional[str]):
+        """显示报告；html 为 None 时表示正在后台生成"""
+        self.expected_key = key
+        # 切换下拉框时不再重复发出信号
+        index = self.type_combo.findData(key[1])
+        if index != self.type_combo.currentIndex():
+            self.type_combo.blockSignals(True)
+            self.type_combo.setCurrentIndex(index)
+            self.type_combo.blockSignals(False)
+
+        if html is None:
+            self.html = ""
+            self.report_text.setHtml(PARAGRAPH.substitute(text="正在生成报告..."))
+            self.save_button.setEnabled(False)
+        else:
+            self.set_html(html)
+
+    def on_report_ready(self, key, html: str):
+        # 只显示最近一次请求的报告，忽略过时的结果
+        if key == self.expected_key:
+            self.set_html(html)
+
+    def set_html(self, html: str):
+        self.html = html
+        self.report_text.setHtml(html)
+        self.save_button.setEnabled(True)
+
+    def save_html(self):
+        if not self.html:
+            return
+        title = f"{REPORT_TYPES[self.expected_key[1]]} {self.expected_key[2]}"
+        path, _ = QFileDialog.getSaveFileName(self, "保存报告", f"pomodoro_report_{self.expected_key[2]}.html",
+                                              "HTML (*.html *.htm)")
+        if not path:
+            return
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(HTML_PAGE.substitute(title=title, body=self.html))
+        except Exception as e:
+            print(f"保存报告失败: {e}")
+            QMessageBox.warning(self, "保存失败", f"无法保存报告到 {path}。\n错误信息: {e}")
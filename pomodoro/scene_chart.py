@@ -0,0 +1,177 @@
+from typing import List, Optional, Sequence
+
+from PyQt5.QtWidgets import QGraphicsScene, QGraphicsView, QGraphicsRectItem, QGraphicsTextItem, QWidget
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QFont, QBrush, QColor, QPen, QLinearGradient
+
+from .chart import ChartRow, WORK_COLORS, BREAK_COLORS, IDLE_COLORS
+
+
+def format_time_short(hours: float) -> str:
+    """将小时数格式化为小时和分钟"""
+    h = int(hours)
+    m = int((hours - h) * 60)
+    if h > 0:
+        return f"{h}h {m}m"
+    else:
+        return f"{m}m"
+
+
+class HistorySceneChart(QGraphicsView):
+    """原来基于 QGraphicsScene 的每日时间分布图
+
+    与 HistoryChartWidget 使用相同的 set_data 接口，通过 POMODORO_CHART_BACKEND=scene 启用。
+    场景中的图形项放在对象池中重复使用：重绘时只修改位置、颜色和文字，
+    多余的图形项隐藏起来，不会在每次刷新时创建和销毁 Qt 对象。
+    """
+
+    def __init__(self, parent: Optional[QWidget] = None):
+        super().__init__(parent)
+        self.rows: List[ChartRow] = []
+        self.chart_scene = QGraphicsScene(self)
+        self.setScene(self.chart_scene)
+        self.rect_items: List[QGraphicsRectItem] = []
+        self.text_items: List[QGraphicsTextItem] = []
+        self.rects_used = 0
+        self.texts_used = 0
+        # 按绘制顺序设置Z值，重复使用的图形项保持原来的遮挡关系
+        self.z_order = 0
+        self.default_font = QFont()
+        self.title_font = QFont("Arial", 14, QFont.Bold)
+        self.no_pen = QPen(Qt.PenStyle.NoPen)
+
+    def set_data(self, rows: Sequence[ChartRow]):
+        rows = list(rows)
+        if rows == self.rows:
+            return
+        self.rows = rows
+        self.redraw()
+
+    def item_count(self) -> int:
+        return len(self.chart_scene.items())
+
+    def add_rect(self, x: float, y: float, width: float, height: float,
+                 brush: QBrush, pen: QPen) -> QGraphicsRectItem:
+        if self.rects_used < len(self.rect_items):
+            item = self.rect_items[self.rects_used]
+        else:
+            item = QGraphicsRectItem()
+            self.chart_scene.addItem(item)
+            self.rect_items.append(item)
+        self.rects_used += 1
+        item.setRect(x, y, width, height)
+        item.setBrush(brush)
+        item.setPen(pen)
+        item.setZValue(self.z_order)
+        item.setVisible(True)
+        self.z_order += 1
+        return item
+
+    def add_text(self, text: str, color: QColor, font: Optional[QFont] = None) -> QGraphicsTextItem:
+        if self.texts_used < len(self.text_items):
+            item = self.text_items[self.texts_used]
+        else:
+            item = QGraphicsTextItem()
+            self.chart_scene.addItem(item)
+            self.text_items.append(item)
+        self.texts_used += 1
+        item.setPlainText(text)
+        item.setDefaultTextColor(color)
+        item.setFont(font or self.default_font)
+        item.setZValue(self.z_order)
+        item.setVisible(True)
+        self.z_order += 1
+        return item
+
+    def redraw(self):
+        # 从头开始使用对象池
+        self.rects_used = 0
+        self.texts_used = 0
+        self.z_order = 0
+
+        # 设置图表尺寸
+        chart_width = 700
+        chart_height = 400
+        self.chart_scene.setSceneRect(0, 0, chart_width, chart_height)
+
+        # 设置背景
+        self.add_rect(0, 0, chart_width, chart_height, QBrush(QColor("#ffffff")), QPen())
+
+        # 设置横向条形图参数
+        bar_height = 30
+        bar_spacing = 15
+        margin_left = 100
+        margin_right = 200
+        margin_top = 50
+        usable_width = chart_width - margin_left - margin_right
+        text_color = QColor("#2c3e50")
+
+        # 添加标题
+        title = self.add_text("每日时间分布", text_color, self.title_font)
+        title.setPos((chart_width - title.boundingRect().width()) / 2, 10)
+
+        # 绘制横向条形图
+        for i, (date, work, rest, idle) in enumerate(self.rows):
+            y_pos = margin_top + i * (bar_height + bar_spacing)
+            work_time = work / 3600  # 转换为小时
+            break_time = rest / 3600
+            idle_time = idle / 3600
+            total_time = work_time + break_time + idle_time
+
+            # 添加日期标签
+            date_label = self.add_text(date, text_color)
+            date_label.setPos(10, y_pos + (bar_height - date_label.boundingRect().height()) / 2)
+
+            # 如果总时间为0，显示空条
+            if total_time == 0:
+                self.add_rect(margin_left, y_pos, usable_width, bar_height,
+                              QBrush(QColor("#f0f0f0")), QPen(QColor("#e0e0e0")))
+
+                # 添加"无数据"文本
+                no_data = self.add_text("无数据", QColor("#7f8c8d"))
+                no_data.setPos(margin_left + 10, y_pos + (bar_height - no_data.boundingRect().height()) / 2)
+                continue
+
+            # 依次绘制工作、休息、空闲休息时间条
+            x = margin_left
+            for hours, colors in ((work_time, WORK_COLORS),
+                                  (break_time, BREAK_COLORS),
+                                  (idle_time, IDLE_COLORS)):
+                width = (hours / total_time) * usable_width
+                if width > 0:
+                    gradient = QLinearGradient(x, 0, x + width, 0)
+                    gradient.setColorAt(0, colors[0])
+                    gradient.setColorAt(1, colors[1])
+                    self.add_rect(x, y_pos, width, bar_height, QBrush(gradient), self.no_pen)
+                x += width
+
+            # 添加时间数据标签
+            data_text = (f"工作: {format_time_short(work_time)} | 休息: {format_time_short(break_time)} "
+                         f"| 空闲: {format_time_short(idle_time)}")
+            data_label = self.add_text(data_text, text_color)
+            data_label.setPos(margin_left + usable_width + 10,
+                              y_pos + (bar_height - data_label.boundingRect().height()) / 2)
+
+        # 添加图例
+        legend_x = margin_left
+        legend_y = margin_top + len(self.rows) * (bar_height + bar_spacing) + 20
+
+        # 绘制图例背景
+        self.add_rect(legend_x - 10, legend_y - 10, 350, 40,
+                      QBrush(QColor(255, 255, 255, 200)), QPen(QColor("#e0e0e0")))
+
+        for offset, colors, name in ((0, WORK_COLORS, "工作时间"),
+                                     (120, BREAK_COLORS, "休息时间"),
+                                     (240, IDLE_COLORS, "空闲休息时间")):
+            gradient = QLinearGradient(0, legend_y, 15, legend_y)
+            gradient.setColorAt(0, colors[0])
+            gradient.setColorAt(1, colors[1])
+            self.add_rect(legend_x + offset, legend_y, 15, 15, QBrush(gradient), self.no_pen)
+            text = self.add_text(name, text_color)
+            text.setPos(legend_x + offset + 20, legend_y - 5)
+
+        # 隐藏本次没有用到的图形项
+        for item in self.rect_items[self.rects_used:]:
+            item.setVisible(False)
+        for item in self.text_items[self.texts_used:]:
+            item.setVisible(False)
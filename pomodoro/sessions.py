@@ -0,0 +1,133 @@
+import os
+import json
+from datetime import datetime, date
+from typing import Optional, Dict, Any, Iterator, Iterable, List, Set
+
+from .storage import file_lock
+
+# 会话类型
+SESSION_KINDS = ("work", "break", "idle")
+
+# 会话记录的编码器，批量写入时复用
+_encode_event = json.JSONEncoder(ensure_ascii=False).encode
+
+
+def format_event_line(session_id: str, kind: str, date_key: str, start_ts: float,
+                      end_ts: float, duration: int, completed: bool, recorded_at: float) -> str:
+    """直接拼出一条会话记录的JSON行，输出与 _encode_event 相同
+
+    批量导入时比通用JSON编码器快得多。ID、类型和日期只包含ASCII字母、数字和连字符，无需转义。
+    """
+    return (f'{{"id": "{session_id}", "kind": "{kind}", "date": "{date_key}", '
+            f'"start": {start_ts!r}, "end": {end_ts!r}, "duration": {duration}, '
+            f'"completed": {"true" if completed else "false"}, "recorded_at": {recorded_at!r}}}\n')
+
+
+def make_session_id(kind: str, start_ts: float) -> str:
+    """根据会话类型和开始时间生成稳定的会话ID"""
+    return f"{kind}-{int(round(start_ts * 1000))}"
+
+
+def make_event(kind: str, start_ts: float, end_ts: float,
+               completed: bool = False) -> Dict[str, Any]:
+    """构造一条会话记录"""
+    return {
+        "id": make_session_id(kind, start_ts),
+        "kind": kind,
+        "date": datetime.fromtimestamp(start_ts).strftime("%Y-%m-%d"),
+        "start": start_ts,
+        "end": end_ts,
+        "duration": int(end_ts - start_ts),
+        "completed": completed,
+        "recorded_at": datetime.now().timestamp()
+    }
+
+
+class SessionLog:
+    """追加写入的会话事件日志，每行一个JSON对象（JSON Lines）
+
+    每条记录描述一段已经结束的工作、休息或空闲休息时间段。
+    文件只追加不改写，因此可以逐行流式读取。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def append(self, kind: str, start: datetime, end: datetime,
+               completed: bool = False) -> Optional[Dict[str, Any]]:
+        # 时间段太短（不足1秒）时不记录
+        duration = int((end - start).total_seconds())
+        if duration <= 0:
+            return None
+
+        event = make_event(kind, start.timestamp(), end.timestamp(), completed)
+        try:
+            self.append_many([event])
+        except Exception as e:
+            print(f"保存会话记录失败: {e}")
+            return None
+        return event
+
+    def append_many(self, events: Iterable[Dict[str, Any]]) -> int:
+        """一次性追加多条会话记录，返回写入的条数"""
+        return self.append_lines([_encode_event(event) + "\n" for event in events])
+
+    def append_lines(self, lines: List[str]) -> int:
+        """追加已经编码好的会话记录行"""
+        if not lines:
+            return 0
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with file_lock(self.path):
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.writelines(lines)
+        return len(lines)
+
+    def existing_ids(self) -> Set[str]:
+        """返回日志中已有的全部会话ID，用于去重"""
+        ids: Set[str] = set()
+        if not os.path.exists(self.path):
+            return ids
+        prefix = '{"id": "'
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                # 本模块写入的记录以ID开头，直接截取，避免逐行解析JSON
+                if line.startswith(prefix):
+                    end = line.find('"', len(prefix))
+                    if end > 0:
+                        ids.add(line[len(prefix):end])
+                        continue
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(event, dict) and "id" in event:
+                    ids.add(event["id"])
+        return ids
+
+    def iter_events(self, start: Optional[date] = None,
+                    end: Optional[date] = None) -> Iterator[Dict[str, Any]]:
+        """逐行读取会话记录，只返回日期在 [start, end] 范围内的记录"""
+        if not os.path.exists(self.path):
+            return
+
+        start_str = start.strftime("%Y-%m-%d") if start else None
+        end_str = end.strftime("%Y-%m-%d") if end else None
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    # 跳过损坏的行（例如写入时被中断）
+                    print(f"跳过损坏的会话记录: {self.path}:{line_no}")
+                    continue
+
+                event_date = event.get("date", "")
+                if start_str and event_date < start_str:
+                    continue
+                if end_str and event_date > end_str:
+                    continue
+                yield event
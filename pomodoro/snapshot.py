@@ -0,0 +1,224 @@
+import os
+import sys
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, timedelta
+from typing import Optional, Dict, Any, List, Tuple
+
+from .storage import get_app_dir, read_json_locked, HISTORY_FILE_NAME
+from .model import HistoryModel
+from .archive import HistoryArchive
+from .store import HistoryStore
+from . import dayclock
+
+SNAPSHOT_FORMATS = ("png", "pdf")
+
+# 趋势分析使用的历史天数（从季度第一天往前）
+ANALYTICS_DAYS = 365
+
+CHART_WIDTH = 800
+
+# (成员, 周一, 输出目录, 格式, 报告日期, 报告用到的几周的每日数据, 趋势分析结果)
+SnapshotJob = Tuple[str, date, str, Tuple[str, ...], date, Dict[str, Dict[str, Any]], Any]
+
+
+def parse_quarter(value: Optional[str], today: date) -> Tuple[date, date]:
+    """解析 2025Q2 这样的季度，返回季度的第一天和最后一天，默认为本季度"""
+    if value:
+        try:
+            year_text, quarter_text = value.upper().split("Q")
+            year, quarter = int(year_text), int(quarter_text)
+        except ValueError:
+            raise ValueError(f"季度格式应为 YYYYQn: {value}")
+        if not 1 <= quarter <= 4:
+            raise ValueError(f"季度应为 1 到 4: {value}")
+    else:
+        year, quarter = today.year, (today.month - 1) // 3 + 1
+    start = date(year, quarter * 3 - 2, 1)
+    end = date(year + quarter // 4, quarter * 3 % 12 + 1, 1) - timedelta(days=1)
+    return start, end
+
+
+def parse_member(value: str) -> Tuple[str, str]:
+    """解析 名称=目录，省略名称时使用目录名"""
+    name, sep, path = value.partition("=")
+    if not sep:
+        path = value
+        name = os.path.basename(os.path.normpath(value)) or "member"
+    return name, path
+
+
+def quarter_weeks(start: date, end: date, today: date) -> List[date]:
+    """季度中每一周的周一，不包括还没有开始的周"""
+    monday = start - timedelta(days=start.weekday())
+    weeks = []
+    while monday <= min(end, today):
+        weeks.append(monday)
+        monday += timedelta(weeks=1)
+    return weeks
+
+
+def load_member_history(app_dir: str, start: date, end: date) -> Dict[str, Dict[str, Any]]:
+    """读取成员在范围内的每日数据，包括归档中的数据"""
+    history = read_json_locked(os.path.join(app_dir, HISTORY_FILE_NAME), {}) or {}
+    store = HistoryStore(HistoryModel.from_dict(history), HistoryArchive(app_dir))
+    return {key: {"work_time": work, "break_time": rest, "idle_time": idle}
+            for key, work, rest, idle in store.range(start, end, "day")}
+
+
+def plan_jobs(members: List[Tuple[str, str]], start: date, end: date, today: date,
+              output_dir: str, formats: Tuple[str, ...]) -> List[SnapshotJob]:
+    """每个成员的数据只读取一次，再拆成每周一个任务
+
+    传给工作进程的只有这一周的报告用到的几周数据；趋势分析需要一整年的数据，在这里算好后只传结果。
+    """
+    from .analytics import analyze
+    from .report import REPORT_DAYS, REPORT_WEEKLY
+    jobs: List[SnapshotJob] = []
+    for name, app_dir in members:
+        if not os.path.isdir(app_dir):
+            raise ValueError(f"成员 {name} 的数据目录不存在: {app_dir}")
+        history = load_member_history(app_dir, start - timedelta(days=ANALYTICS_DAYS), min(end, today))
+        for monday in quarter_weeks(start, end, today):
+            report_day = min(monday + timedelta(days=6), today)
+            first_key = (report_day - timedelta(days=REPORT_DAYS[REPORT_WEEKLY] - 1)).strftime("%Y-%m-%d")
+            last_key = report_day.strftime("%Y-%m-%d")
+            days = {key: value for key, value in history.items() if first_key <= key <= last_key}
+            analytics = None
+            if "pdf" in formats:
+                # 周报告只统计到这一周的最后一天
+                analytics = analyze({key: value for key, value in history.items() if key <= last_key},
+                                    report_day)
+            jobs.append((name, monday, output_dir, formats, report_day, days, analytics))
+    return jobs
+
+
+# ---------------------------------------------------------------------------
+# 工作进程
+# ---------------------------------------------------------------------------
+
+_app = None
+
+
+def init_worker():
+    """每个工作进程创建一次 QApplication，之后的任务共用"""
+    global _app
+    # 即使父进程设置了 xcb 或 wayland，工作进程也不显示窗口，可以在没有显示器的环境中运行
+    os.environ["QT_QPA_PLATFORM"] = "offscreen"
+    from PyQt5.QtWidgets import QApplication
+    _app = QApplication.instance() or QApplication([])
+
+
+def render_chart(history: Dict[str, Dict[str, Any]], monday: date):
+    """绘制一周七天的时间分布图，没有记录的日子显示为无数据"""
+    from .chart import HistoryChartWidget
+    rows = []
+    for offset in range(7):
+        key = (monday + timedelta(days=offset)).strftime("%Y-%m-%d")
+        data = history.get(key)
+        rows.append((key, data["work_time"], data["break_time"], data["idle_time"]) if data else (key, 0, 0, 0))
+    widget = HistoryChartWidget()
+    widget.set_data(rows)
+    widget.resize(CHART_WIDTH, widget.chart_height())
+    image = widget.grab().toImage()
+    widget.deleteLater()
+    return image
+
+
+def render_pdf(path: str, html: str, chart):
+    """把图表和报告写入 PDF"""
+    from PyQt5.QtCore import QUrl, QSizeF
+    from PyQt5.QtGui import QTextDocument
+    from PyQt5.QtPrintSupport import QPrinter
+
+    document = QTextDocument()
+    document.addResource(QTextDocument.ImageResource, QUrl("chart.png"), chart)
+    document.setHtml(f"<p align='center'><img src='chart.png' width='{CHART_WIDTH * 0.8:.0f}'></p>{html}")
+
+    printer = QPrinter(QPrinter.HighResolution)
+    printer.setOutputFormat(QPrinter.PdfFormat)
+    printer.setOutputFileName(path)
+    document.setPageSize(QSizeF(printer.pageRect().size()))
+    document.print_(printer)
+
+
+def render_snapshot(job: SnapshotJob) -> List[str]:
+    """生成一个成员一周的快照，返回写入的文件"""
+    from .report import render_weekly
+
+    name, monday, output_dir, formats, report_day, history, analytics = job
+    member_dir = os.path.join(output_dir, name)
+    os.makedirs(member_dir, exist_ok=True)
+    year, week, _ = monday.isocalendar()
+    base = os.path.join(member_dir, f"{year}-W{week:02d}")
+
+    written = []
+    chart = render_chart(history, monday)
+    if "png" in formats:
+        if not chart.save(base + ".png"):
+            raise IOError(f"无法写入文件: {base}.png")
+        written.append(base + ".png")
+    if "pdf" in formats:
+        html = render_weekly(history, report_day, analytics)
+        render_pdf(base + ".pdf", html, chart)
+        written.append(base + ".pdf")
+    return written
+
+
+def _run_job(job: SnapshotJob) -> Tuple[str, List[str], Optional[str]]:
+    label = f"{job[0]} {job[1].strftime('%Y-%m-%d')}"
+    try:
+        return label, render_snapshot(job), None
+    except Exception as e:
+        return label, [], str(e)
+
+
+def render_all(jobs: List[SnapshotJob], workers: Optional[int] = None, progress=None) -> int:
+    """在进程池中生成全部快照，返回失败的任务数"""
+    failed = 0
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs) or 1))
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+        futures = [executor.submit(_run_job, job) for job in jobs]
+        for done, future in enumerate(as_completed(futures), 1):
+            label, written, error = future.result()
+            if error is not None:
+                failed += 1
+                print(f"生成快照失败 ({label}): {error}")
+            if progress is not None:
+                progress(done, len(jobs), label, written)
+    return failed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="批量生成每周图表和报告的 PNG/PDF 快照")
+    parser.add_argument("--quarter", help="季度，例如 2025Q2，默认为本季度")
+    parser.add_argument("--member", action="append", default=[],
+                        help="成员的数据目录，格式为 名称=目录，可以重复；默认为程序目录")
+    parser.add_argument("--output", default="snapshots", help="输出目录，默认为 snapshots")
+    parser.add_argument("--format", nargs="+", choices=SNAPSHOT_FORMATS, default=list(SNAPSHOT_FORMATS),
+                        help="输出格式，默认同时生成 png 和 pdf")
+    parser.add_argument("--workers", type=int, help="进程数，默认为 CPU 数")
+    args = parser.parse_args(argv)
+
+    today = dayclock.now().date()
+    try:
+        start, end = parse_quarter(args.quarter, today)
+        members = [parse_member(value) for value in args.member] or [("me", get_app_dir())]
+        jobs = plan_jobs(members, start, end, today, args.output, tuple(args.format))
+    except Exception as e:
+        print(f"生成快照失败: {e}")
+        return 1
+    if not jobs:
+        print("这个季度还没有开始，没有需要生成的快照")
+        return 0
+
+    def progress(done, total, label, written):
+        print(f"[{done}/{total}] {label}: {', '.join(written) if written else '失败'}")
+
+    failed = render_all(jobs, args.workers, progress)
+    print(f"已生成 {len(jobs) - failed} 个快照到 {args.output}" + (f"，{failed} 个失败" if failed else ""))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+import sys
+import os
+import json
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Optional, Tuple
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+# 数据文件名
+HISTORY_FILE_NAME = "pomodoro_history.json"
+STATE_FILE_NAME = "pomodoro_state.json"
+SESSIONS_FILE_NAME = "pomodoro_sessions.jsonl"
+
+# 状态文件的格式版本，见 pomodoro.migrate
+STATE_VERSION = 1
+
+# 等待其他进程释放文件锁的最长时间（秒）
+LOCK_TIMEOUT = 10.0
+
+
+def get_app_dir() -> str:
+    """返回数据文件所在的应用目录"""
+    # 判断是否是PyInstaller打包的应用
+    if getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'):
+        # 如果是打包后的应用，使用可执行文件所在目录作为应用目录
+        return os.path.dirname(sys.executable)
+    # 如果是开发环境，使用项目目录（pomodoro 包的上一级目录）
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_json(path: str, default: Any = None) -> Any:
+    """读取JSON文件，文件不存在或损坏时返回默认值"""
+    if not os.path.exists(path):
+        return default
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"读取 {path} 失败: {e}")
+        return default
+
+
+# ---------------------------------------------------------------------------
+# 跨进程文件锁
+# ---------------------------------------------------------------------------
+
+def _try_lock(f) -> bool:
+    try:
+        if sys.platform == "win32":
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock(f):
+    if sys.platform == "win32":
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+@contextmanager
+def file_lock(path: str, timeout: float = LOCK_TIMEOUT):
+    """对数据文件加跨进程互斥锁
+
+    锁加在旁边的 <path>.lock 文件上，数据文件本身可以被原子替换。
+    其他读写这些数据文件的工具应当使用同一个锁文件。
+    """
+    lock_file = open(path + ".lock", "a+")
+    try:
+        deadline = time.monotonic() + timeout
+        while not _try_lock(lock_file):
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"等待文件锁超时: {path}")
+            time.sleep(0.01)
+        try:
+            yield
+        finally:
+            _unlock(lock_file)
+    finally:
+        lock_file.close()
+
+
+def write_json_atomic(path: str, data: Any):
+    """先写入临时文件再替换，读取方不会看到写了一半的文件"""
+    write_bytes_atomic(path, json.dumps(data).encode("utf-8"))
+
+
+def write_bytes_atomic(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+    # Windows 上目标文件被其他进程短暂打开时替换会失败，稍后重试
+    for attempt in range(50):
+        try:
+            os.replace(tmp_path, path)
+            return
+        except PermissionError:
+            if attempt == 49:
+                os.remove(tmp_path)
+                raise
+            time.sleep(0.02)
+
+
+def read_json_locked(path: str, default: Any = None) -> Any:
+    with file_lock(path):
+        return load_json(path, default)
+
+
+def update_json(path: str, update: Callable[[Any], None], default: Any = None) -> Any:
+    """在文件锁保护下读取、修改并原子写回JSON文件，返回修改后的数据"""
+    with file_lock(path):
+        data = load_json(path, default)
+        update(data)
+        write_json_atomic(path, data)
+        return data
+
+
+def file_signature(path: str) -> Optional[Tuple[int, int]]:
+    """文件的修改时间和大小，用于判断文件是否被其他进程修改过"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
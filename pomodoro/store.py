@@ -0,0 +1,315 @@
+import heapq
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Optional, Dict, Any, Iterator, List, Set, Tuple
+
+from .model import HistoryModel, DURATION_FIELDS
+from .archive import HistoryArchive
+
+# 查询结果缓存最多保留的条目数
+CACHE_SIZE = 64
+
+GRANULARITIES = ("day", "week", "month")
+
+# (时间段, 工作秒数, 休息秒数, 空闲秒数)；时间段按粒度为 YYYY-MM-DD、该周周一的 YYYY-MM-DD 或 YYYY-MM
+PeriodRow = Tuple[str, int, int, int]
+
+
+def _key(day: Optional[date]) -> Optional[str]:
+    return day.strftime("%Y-%m-%d") if day is not None else None
+
+
+def _in_range(date_key: str, start_key: Optional[str], end_key: Optional[str]) -> bool:
+    return (start_key is None or date_key >= start_key) and (end_key is None or date_key <= end_key)
+
+
+def _overlaps(low: str, high: str, start_key: Optional[str], end_key: Optional[str]) -> bool:
+    return (start_key is None or high >= start_key) and (end_key is None or low <= end_key)
+
+
+def _month_end_key(month: str) -> str:
+    first = date(int(month[:4]), int(month[5:7]), 1)
+    last = (first.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    return last.strftime("%Y-%m-%d")
+
+
+def _week_key(date_key: str) -> str:
+    day = date(int(date_key[:4]), int(date_key[5:7]), int(date_key[8:10]))
+    return (day - timedelta(days=day.weekday())).strftime("%Y-%m-%d")
+
+
+class HistoryStore:
+    """历史数据的查询接口
+
+    合并内存中的热数据（HistoryModel）和归档中的旧数据，提供按日、周、月汇总的查询。
+    查询结果按 LRU 缓存，每条缓存记录它依赖的日期范围；热数据中某一天变化时，
+    只有范围包含这一天的缓存会失效；某个月重新归档时，只有范围和这个月重叠的缓存会失效。
+    整月都在归档中的月份直接使用索引中的月合计，不解压归档段。
+    返回的列表和字典来自缓存，调用方不应修改。
+    """
+
+    def __init__(self, hot: HistoryModel, archive: Optional[HistoryArchive] = None,
+                 cache_size: int = CACHE_SIZE):
+        self.hot = hot
+        self.archive = archive
+        self.cache_size = cache_size
+        # 缓存键 -> (结果, 依赖的开始日期, 依赖的结束日期)，None 表示不限
+        self.cache: "OrderedDict[Any, Tuple[Any, Optional[str], Optional[str]]]" = OrderedDict()
+        # 热数据中发生变化、尚未处理的日期；None 表示全部数据都可能变化
+        self.pending: Set[Optional[str]] = set()
+        self.hot_keys: List[str] = sorted(hot.keys())
+        self.hot_key_set: Set[str] = set(self.hot_keys)
+        self.archive_signature = archive.index_signature if archive is not None else None
+        # 每个归档月份当前的归档段文件，用于找出重新归档的月份
+        self.archive_files: Dict[str, str] = self._archive_files()
+        self.hits = 0
+        self.misses = 0
+        hot.add_listener(self.pending.add)
+
+    # ------------------------------------------------------------------
+    # 缓存
+    # ------------------------------------------------------------------
+
+    def invalidate(self, date_key: Optional[str] = None):
+        """使依赖 date_key 的缓存失效，date_key 为 None 时清空全部缓存"""
+        self.pending.add(date_key)
+
+    def _archive_files(self) -> Dict[str, str]:
+        if self.archive is None:
+            return {}
+        return {month: entry["file"] for month, entry in self.archive.months.items()}
+
+    def _changed_months(self) -> List[str]:
+        self.archive.refresh()
+        if self.archive.index_signature == self.archive_signature:
+            return []
+        self.archive_signature = self.archive.index_signature
+        files = self._archive_files()
+        changed = [month for month in set(files) | set(self.archive_files)
+                   if files.get(month) != self.archive_files.get(month)]
+        self.archive_files = files
+        return changed
+
+    def _sync(self):
+        # 数据变化时只记下日期，到下一次查询时再统一处理，频繁修改的代价很小
+        months = self._changed_months() if self.archive is not None else []
+        if not self.pending and not months:
+            return
+
+        pending = self.pending.copy()
+        self.pending.clear()
+        if None in pending:
+            self.cache.clear()
+            self.hot_keys = sorted(self.hot.keys())
+            self.hot_key_set = set(self.hot_keys)
+            return
+
+        if any((key in self.hot) != (key in self.hot_key_set) for key in pending):
+            self.hot_keys = sorted(self.hot.keys())
+            self.hot_key_set = set(self.hot_keys)
+        spans = [(key, key) for key in pending] + [(f"{month}-01", _month_end_key(month)) for month in months]
+        stale = [cache_key for cache_key, (_, start_key, end_key) in self.cache.items()
+                 if any(_overlaps(low, high, start_key, end_key) for low, high in spans)]
+        for cache_key in stale:
+            del self.cache[cache_key]
+
+    def _cached(self, cache_key, start_key: Optional[str], end_key: Optional[str], compute):
+        self._sync()
+        entry = self.cache.get(cache_key)
+        if entry is not None:
+            self.hits += 1
+            self.cache.move_to_end(cache_key)
+            return entry[0]
+        self.misses += 1
+        result = compute()
+        self.cache[cache_key] = (result, start_key, end_key)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return result
+
+    # ------------------------------------------------------------------
+    # 逐日数据
+    # ------------------------------------------------------------------
+
+    def _archive_months(self, start_key: Optional[str], end_key: Optional[str],
+                        changed_after: Optional[float] = None) -> List[str]:
+        if self.archive is None:
+            return []
+        return [month for month in self.archive.month_keys()
+                if (start_key is None or month >= start_key[:7])
+                and (end_key is None or month <= end_key[:7])
+                and (changed_after is None or self.archive.months[month]["updated_at"] > changed_after)]
+
+    def _iter_archive_days(self, months: List[str], start_key: Optional[str],
+                           end_key: Optional[str]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        for month in months:
+            segment = None
+            for date_key in self.archive.iter_day_keys(month):
+                if date_key in self.hot_key_set or not _in_range(date_key, start_key, end_key):
+                    continue
+                if segment is None:
+                    segment = self.archive.load_month(month)
+                yield date_key, segment[date_key]
+
+    def _iter_hot_days(self, start_key: Optional[str],
+                       end_key: Optional[str]) -> Iterator[Tuple[str, Any]]:
+        low = bisect_left(self.hot_keys, start_key) if start_key is not None else 0
+        high = bisect_right(self.hot_keys, end_key) if end_key is not None else len(self.hot_keys)
+        for date_key in self.hot_keys[low:high]:
+            yield date_key, self.hot[date_key]
+
+    def days(self, start: Optional[date] = None, end: Optional[date] = None,
+             changed_after: Optional[float] = None) -> Iterator[Tuple[str, Any]]:
+        """按日期顺序产出 (日期, 记录)，热数据优先
+
+        只解压范围内的归档段；changed_after 不为空时跳过最后修改时间不晚于它的整月归档，
+        用于增量导出。结果不缓存。
+        """
+        self._sync()
+        start_key, end_key = _key(start), _key(end)
+        months = self._archive_months(start_key, end_key, changed_after)
+        return heapq.merge(self._iter_archive_days(months, start_key, end_key),
+                           self._iter_hot_days(start_key, end_key),
+                           key=lambda item: item[0])
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    def range(self, start: Optional[date] = None, end: Optional[date] = None,
+              granularity: str = "day", limit: Optional[int] = None) -> List[PeriodRow]:
+        """按粒度汇总 [start, end] 内有记录的时间段，按时间排序
+
+        limit 不为空时只返回最后 limit 个时间段。
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"未知的汇总粒度: {granularity}")
+        start_key, end_key = _key(start), _key(end)
+
+        def compute() -> List[PeriodRow]:
+            if granularity == "day" and limit is not None:
+                return self._recent_days(start_key, end_key, limit)
+            rows = [row[:4] for row in self._aggregate(start_key, end_key, granularity)]
+            return rows[-limit:] if limit is not None else rows
+
+        return self._cached(("range", start_key, end_key, granularity, limit),
+                            start_key, end_key, compute)
+
+    def _recent_days(self, start_key: Optional[str], end_key: Optional[str], limit: int) -> List[PeriodRow]:
+        # 只需要最后几天时先看热数据，热数据不够时才读取归档
+        rows: List[PeriodRow] = []
+        low = bisect_left(self.hot_keys, start_key) if start_key is not None else 0
+        high = bisect_right(self.hot_keys, end_key) if end_key is not None else len(self.hot_keys)
+        if high - low >= limit or self.archive is None or not self.archive:
+            for date_key in self.hot_keys[max(low, high - limit):high]:
+                record = self.hot[date_key]
+                rows.append((date_key, record["work_time"], record["break_time"], record["idle_time"]))
+            return rows
+        return [row[:4] for row in self._aggregate(start_key, end_key, "day")[-limit:]]
+
+    def _aggregate(self, start_key: Optional[str], end_key: Optional[str],
+                   granularity: str) -> List[Tuple[str, int, int, int, int]]:
+        # 返回 (时间段, 工作, 休息, 空闲, 有记录的天数)
+        totals: Dict[str, List[int]] = {}
+        months = self._archive_months(start_key, end_key)
+        detail_months = []
+        for month in months:
+            # 整月都在范围内且没有被热数据覆盖的月份，按月汇总时直接使用索引中的合计
+            whole = ((start_key is None or start_key <= f"{month}-01")
+                     and (end_key is None or end_key >= _month_end_key(month)))
+            if granularity == "month" and whole and not self._hot_has_month(month):
+                month_totals = self.archive.month_totals(month)
+                totals[month] = [month_totals[field] for field in DURATION_FIELDS] + [month_totals["days"]]
+            else:
+                detail_months.append(month)
+
+        period_of = {"day": lambda key: key, "week": _week_key, "month": lambda key: key[:7]}[granularity]
+        days = heapq.merge(self._iter_archive_days(detail_months, start_key, end_key),
+                           self._iter_hot_days(start_key, end_key), key=lambda item: item[0])
+        for date_key, record in days:
+            period = period_of(date_key)
+            row = totals.get(period)
+            if row is None:
+                row = totals[period] = [0, 0, 0, 0]
+            for i, field in enumerate(DURATION_FIELDS):
+                row[i] += record.get(field, 0)
+            row[3] += 1
+        return [(period, *totals[period]) for period in sorted(totals)]
+
+    def _hot_has_month(self, month: str) -> bool:
+        index = bisect_left(self.hot_keys, month)
+        return index < len(self.hot_keys) and self.hot_keys[index].startswith(month)
+
+    def totals(self, start: Optional[date] = None, end: Optional[date] = None) -> Dict[str, int]:
+        """[start, end] 内的合计：工作、休息、空闲秒数和有记录的天数"""
+        start_key, end_key = _key(start), _key(end)
+
+        def compute() -> Dict[str, int]:
+            result = {field: 0 for field in DURATION_FIELDS}
+            result["days"] = 0
+            for _, work, rest, idle, days in self._aggregate(start_key, end_key, "month"):
+                result["work_time"] += work
+                result["break_time"] += rest
+                result["idle_time"] += idle
+                result["days"] += days
+            return result
+
+        return self._cached(("totals", start_key, end_key), start_key, end_key, compute)
+
+    def column(self, field: str = "work_time",
+               end: Optional[date] = None) -> Tuple[List[str], List[int]]:
+        """到 end 为止有记录的日期和某一项时间，包括归档中的旧数据，用于趋势分析"""
+        self._sync()
+        if self.archive is None or not self.archive:
+            # 没有归档时直接使用热数据的列
+            dates, values = self.hot.column(field)
+            if end is None:
+                return dates, values
+            end_key = _key(end)
+            pairs = [(key, value) for key, value in zip(dates, values) if key <= end_key]
+            return [key for key, _ in pairs], [value for _, value in pairs]
+        index = 1 + DURATION_FIELDS.index(field)
+        rows = self.range(None, end, "day")
+        return [row[0] for row in rows], [row[index] for row in rows]
+
+    def top_days(self, n: int = 10, field: str = "work_time") -> List[Tuple[str, int]]:
+        """某项时间最多的 n 天，返回 [(日期, 秒数)]"""
+        def compute() -> List[Tuple[str, int]]:
+            return heapq.nlargest(n, ((date_key, record.get(field, 0)) for date_key, record in self.days()),
+                                  key=lambda item: item[1])
+
+        return self._cached(("top", n, field), None, None, compute)
+
+    def streaks(self, today: Optional[date] = None) -> Dict[str, Any]:
+        """连续学习（工作时间大于0）的天数
+
+        返回 {"current": 截至今天或昨天的连续天数, "longest": 最长连续天数,
+              "longest_start": 开始日期, "longest_end": 结束日期}
+        """
+        today = today or date.today()
+
+        def compute() -> Dict[str, Any]:
+            longest = current = 0
+            longest_start = longest_end = None
+            run_start = previous = None
+            for date_key, record in self.days(end=today):
+                if record.get("work_time", 0) <= 0:
+                    continue
+                day = date(int(date_key[:4]), int(date_key[5:7]), int(date_key[8:10]))
+                if previous is not None and day - previous == timedelta(days=1):
+                    current += 1
+                else:
+                    current = 1
+                    run_start = day
+                if current > longest:
+                    longest, longest_start, longest_end = current, run_start, day
+                previous = day
+            # 今天还没开始学习时，截至昨天的连续天数仍然算作当前连续天数
+            if previous is None or today - previous > timedelta(days=1):
+                current = 0
+            return {"current": current, "longest": longest,
+                    "longest_start": longest_start, "longest_end": longest_end}
+
+        return self._cached(("streaks", _key(today)), None, _key(today), compute)
+
@@ -0,0 +1,163 @@
+import os
+from typing import Optional, Dict
+
+from PyQt5.QtWidgets import QApplication, QSystemTrayIcon, QMenu
+from PyQt5.QtCore import QObject, Qt, pyqtSignal
+from PyQt5.QtGui import QIcon, QPixmap, QPainter, QColor
+
+from .engine import TimerEngine, MODE_COLORS, format_countdown
+
+ICON_SIZE = 32
+
+# 设置为 0 时不使用托盘模式，关闭窗口即退出程序
+TRAY_ENABLED = os.environ.get("POMODORO_TRAY", "1") != "0"
+
+
+def tray_available() -> bool:
+    return TRAY_ENABLED and QSystemTrayIcon.isSystemTrayAvailable()
+
+
+def make_icon(color: str, running: bool) -> QIcon:
+    """画一个圆形图标，计时中为实心，未计时为空心"""
+    pixmap = QPixmap(ICON_SIZE, ICON_SIZE)
+    pixmap.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(pixmap)
+    painter.setRenderHint(QPainter.Antialiasing)
+    pen_color = QColor(color)
+    painter.setPen(pen_color)
+    painter.setBrush(pen_color if running else QColor(255, 255, 255))
+    painter.drawEllipse(3, 3, ICON_SIZE - 6, ICON_SIZE - 6)
+    painter.end()
+    return QIcon(pixmap)
+
+
+class TrayController(QObject):
+    """托盘模式
+
+    计时器（TimerEngine）一直运行，托盘图标的提示文字显示剩余时间，菜单中可以开始、暂停和空闲休息。
+    关闭主窗口时窗口连同图表、报告对话框一起销毁，只保留托盘图标，需要时再重新创建窗口，
+    在后台时不再占用这些控件的内存，每秒也只更新托盘的提示文字。
+    """
+
+    # 主窗口创建（True）或销毁（False）时发出
+    window_visible = pyqtSignal(bool)
+
+    def __init__(self, app_dir: Optional[str] = None, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.engine = TimerEngine(app_dir, self)
+        self.window = None
+        # 托盘上当前显示的内容，只有变化时才重新设置
+        self.shown: Dict[str, object] = {}
+        self.icons: Dict[tuple, QIcon] = {}
+        # 第一次关闭窗口时提示程序仍在托盘中运行
+        self.hint_shown = False
+
+        self.menu = QMenu()
+        self.start_action = self.menu.addAction("开始", self.engine.toggle_timer)
+        self.idle_action = self.menu.addAction("空闲休息", self.engine.toggle_idle_break)
+        self.menu.addAction("重置", self.engine.reset_timer)
+        self.menu.addSeparator()
+        self.menu.addAction("显示窗口", self.show_window)
+        self.menu.addAction("退出", self.quit)
+
+        self.tray = QSystemTrayIcon(self)
+        self.tray.setContextMenu(self.menu)
+        self.tray.activated.connect(self.on_activated)
+
+        self.engine.changed.connect(self.refresh)
+        self.engine.notify.connect(self.on_notify)
+        self.engine.warning.connect(self.on_warning)
+
+    def start(self):
+        """显示托盘图标和主窗口，然后恢复上次的状态"""
+        self.refresh()
+        self.tray.show()
+        # 托盘模式下关闭最后一个窗口不退出程序
+        QApplication.instance().setQuitOnLastWindowClosed(False)
+        self.show_window()
+        self.engine.load_state()
+
+    # ------------------------------------------------------------------
+    # 主窗口
+    # ------------------------------------------------------------------
+
+    def show_window(self):
+        if self.window is None:
+            from .app import PomodoroTimer
+            self.window = PomodoroTimer(self.engine)
+            # 关闭时销毁窗口，而不只是隐藏
+            self.window.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+            self.window.destroyed.connect(self.on_window_destroyed)
+            self.window_visible.emit(True)
+        self.window.bring_to_front()
+
+    def on_window_destroyed(self):
+        self.window = None
+        self.window_visible.emit(False)
+        if not self.hint_shown:
+            self.hint_shown = True
+            self.tray.showMessage("番茄工作法计时器", "程序仍在托盘中运行，计时不会停止",
+                                  QSystemTrayIcon.Information, 3000)
+
+    def on_activated(self, reason):
+        if reason in (QSystemTrayIcon.Trigger, QSystemTrayIcon.DoubleClick):
+            self.show_window()
+
+    # ------------------------------------------------------------------
+    # 显示
+    # ------------------------------------------------------------------
+
+    def refresh(self):
+        # 计时时每秒调用一次，只更新发生变化的部分
+        engine = self.engine
+        if engine.is_idle_break:
+            detail = f"空闲休息 {format_countdown(engine.idle_elapsed())}"
+        else:
+            mode = "工作" if engine.is_working else "休息"
+            remaining = format_countdown(engine.time_left)
+            if engine.is_running:
+                detail = f"{mode}中，剩余 {remaining}"
+            elif engine.is_paused:
+                detail = f"{mode}已暂停，剩余 {remaining}"
+            else:
+                detail = f"等待开始{mode}，剩余 {remaining}"
+        self.update_shown("tooltip", f"番茄工作法计时器\n{detail}", self.tray.setToolTip)
+
+        icon_key = (engine.mode, engine.is_running or engine.is_idle_break)
+        if self.shown.get("icon") != icon_key:
+            self.shown["icon"] = icon_key
+            icon = self.icons.get(icon_key)
+            if icon is None:
+                icon = self.icons[icon_key] = make_icon(MODE_COLORS[icon_key[0]], icon_key[1])
+            self.tray.setIcon(icon)
+
+        self.update_shown("start", engine.start_label, self.start_action.setText)
+        self.update_shown("start_enabled", not engine.is_idle_break, self.start_action.setEnabled)
+        self.update_shown("idle", "结束空闲休息" if engine.is_idle_break else "空闲休息",
+                          self.idle_action.setText)
+
+    def update_shown(self, key, value, setter):
+        if self.shown.get(key) != value:
+            self.shown[key] = value
+            setter(value)
+
+    def on_notify(self, title, text):
+        # 窗口打开时由窗口弹出消息框，否则显示托盘通知
+        if self.window is None:
+            self.tray.showMessage(title, text, QSystemTrayIcon.Information, 10000)
+
+    def on_warning(self, title, text):
+        if self.window is None:
+            self.tray.showMessage(title, text, QSystemTrayIcon.Warning, 10000)
+
+    # ------------------------------------------------------------------
+    # 退出
+    # ------------------------------------------------------------------
+
+    def quit(self):
+        self.hint_shown = True
+        if self.window is not None:
+            self.window.close()
+        self.engine.shutdown()
+        self.tray.hide()
+        QApplication.instance().quit()
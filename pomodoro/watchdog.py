@@ -0,0 +1,303 @@
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Optional, Callable, Dict, Any, Iterator, List, Tuple
+
+from PyQt5.QtCore import QObject, QTimer
+
+from .storage import get_app_dir
+
+STALL_LOG_FILE_NAME = "pomodoro_stalls.jsonl"
+
+# 主线程超过这个时间（毫秒）没有处理心跳时记为一次卡顿，可以用环境变量 POMODORO_STALL_MS 设置，0 表示关闭检测
+DEFAULT_THRESHOLD_MS = 500
+# 心跳间隔（毫秒）
+HEARTBEAT_MS = 100
+
+# 卡顿日志超过这个大小时轮换，保留几个旧文件
+LOG_MAX_BYTES = 256 * 1024
+LOG_BACKUPS = 3
+
+# 记录的调用栈最多几层
+STACK_DEPTH = 30
+
+# 两次检查之间系统睡眠超过这个秒数时，丢弃这段时间内的心跳间隔
+SLEEP_TOLERANCE = 1.0
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__)) + os.sep
+
+
+def threshold_from_env() -> int:
+    try:
+        return int(os.environ.get("POMODORO_STALL_MS", DEFAULT_THRESHOLD_MS))
+    except ValueError:
+        print("POMODORO_STALL_MS 应为毫秒数，使用默认值")
+        return DEFAULT_THRESHOLD_MS
+
+
+def sleep_clocks() -> Tuple[Callable[[], float], Callable[[], float]]:
+    """返回 (包含系统睡眠时间的时钟, 不包含系统睡眠时间的时钟)，两者走时之差就是系统睡眠的时间"""
+    if hasattr(time, "CLOCK_BOOTTIME"):
+        # Linux：CLOCK_BOOTTIME 包含睡眠时间，monotonic 不包含
+        return (lambda: time.clock_gettime(time.CLOCK_BOOTTIME)), time.monotonic
+    if sys.platform == "win32":
+        # Windows：monotonic 包含睡眠时间，QueryUnbiasedInterruptTime 不包含（单位为100纳秒）
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        value = ctypes.c_ulonglong()
+
+        def unbiased_time() -> float:
+            kernel32.QueryUnbiasedInterruptTime(ctypes.byref(value))
+            return value.value / 1e7
+
+        return time.monotonic, unbiased_time
+    # macOS 等：monotonic 不包含睡眠时间，与系统时间比较
+    return time.time, time.monotonic
+
+
+def capture_stack(thread_id: int) -> List[Tuple[str, int, str]]:
+    """取得线程当前的调用栈，最外层在前，每一层为 (文件, 行号, 函数名)"""
+    frame = sys._current_frames().get(thread_id)
+    stack = []
+    while frame is not None and len(stack) < STACK_DEPTH:
+        code = frame.f_code
+        stack.append((code.co_filename, frame.f_lineno, code.co_name))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def format_frame(frame: Tuple[str, int, str]) -> str:
+    filename, lineno, name = frame
+    if filename.startswith(PACKAGE_DIR):
+        filename = "pomodoro/" + filename[len(PACKAGE_DIR):].replace(os.sep, "/")
+    else:
+        filename = os.path.basename(filename)
+    return f"{filename}:{lineno} {name}"
+
+
+def stall_site(stack: List[Tuple[str, int, str]]) -> str:
+    """卡顿发生的位置：调用栈中最内层的本程序代码；没有时为最内层的一帧"""
+    for frame in reversed(stack):
+        if frame[0].startswith(PACKAGE_DIR) and not frame[0].endswith("watchdog.py"):
+            return format_frame(frame)
+    return format_frame(stack[-1]) if stack else "未知（没有 Python 调用栈）"
+
+
+class StallLog:
+    """卡顿记录，每行一个JSON对象，文件过大时轮换"""
+
+    def __init__(self, path: str, max_bytes: int = LOG_MAX_BYTES, backups: int = LOG_BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+
+    def paths(self) -> List[str]:
+        """当前文件和轮换出的旧文件，从旧到新"""
+        candidates = [f"{self.path}.{i}" for i in range(self.backups, 0, -1)] + [self.path]
+        return [path for path in candidates if os.path.exists(path)]
+
+    def append(self, record: Dict[str, Any]):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        try:
+            if os.path.exists(self.path) and os.path.getsize(self.path) + len(line) > self.max_bytes:
+                self.rotate()
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+        except OSError as e:
+            print(f"保存卡顿记录失败: {e}")
+
+    def rotate(self):
+        for i in range(self.backups - 1, 0, -1):
+            source = f"{self.path}.{i}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{i + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        for path in self.paths():
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(record, dict):
+                        yield record
+
+
+class StallWatchdog(QObject):
+    """检测界面卡顿
+
+    主线程中的定时器每 HEARTBEAT_MS 毫秒更新一次心跳时间；后台线程发现心跳超过阈值没有更新时，
+    通过 sys._current_frames 取得主线程此刻的调用栈，等主线程恢复后把卡顿时长和位置写入卡顿日志。
+    主线程在一次很长的C调用中持有 GIL 时（例如 json.dumps）后台线程自己也无法运行，
+    这时以后台线程被耽搁的时间作为卡顿时长。系统睡眠通过两个时钟的走时差识别，不算卡顿。
+    没有窗口显示时（托盘模式）用 set_active(False) 暂停检测，心跳和后台线程都不再定时唤醒。
+    用 python -m pomodoro.watchdog 查看卡顿最多的位置。
+    """
+
+    def __init__(self, app_dir: Optional[str] = None, threshold_ms: Optional[int] = None,
+                 parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.threshold = (threshold_ms if threshold_ms is not None else threshold_from_env()) / 1000
+        self.log = StallLog(os.path.join(app_dir or get_app_dir(), STALL_LOG_FILE_NAME))
+        self.main_thread_id = threading.main_thread().ident
+        self.last_beat = time.monotonic()
+        self.stop_event = threading.Event()
+        # 未设置时后台线程阻塞等待，不做检查
+        self.active_event = threading.Event()
+        self.active_event.set()
+        self.thread: Optional[threading.Thread] = None
+        self.total_clock, self.awake_clock = sleep_clocks()
+
+        self.heartbeat = QTimer(self)
+        self.heartbeat.setInterval(HEARTBEAT_MS)
+        self.heartbeat.timeout.connect(self.beat)
+
+    def beat(self):
+        self.last_beat = time.monotonic()
+
+    def start(self):
+        if self.threshold <= 0 or self.thread is not None:
+            return
+        self.beat()
+        if self.active_event.is_set():
+            self.heartbeat.start()
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, name="pomodoro-watchdog", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.thread is None:
+            return
+        self.heartbeat.stop()
+        self.stop_event.set()
+        self.active_event.set()
+        self.thread.join(2)
+        self.thread = None
+
+    def set_active(self, active: bool):
+        """暂停或恢复检测，托盘模式下窗口关闭时暂停"""
+        if active == self.active_event.is_set():
+            return
+        if active:
+            self.beat()
+            if self.thread is not None:
+                self.heartbeat.start()
+            self.active_event.set()
+        else:
+            self.active_event.clear()
+            self.heartbeat.stop()
+
+    def run(self):
+        # 后台线程：每隔四分之一阈值检查一次心跳
+        interval = self.threshold / 4
+        stall: Optional[Dict[str, Any]] = None
+        last_check = last_total = last_awake = None
+        while not self.stop_event.wait(interval):
+            if not self.active_event.is_set():
+                # 暂停期间阻塞等待，恢复后重新开始计时
+                self.active_event.wait()
+                last_check = None
+                stall = None
+                continue
+            now = time.monotonic()
+            total, awake = self.total_clock(), self.awake_clock()
+            if last_check is None:
+                last_check, last_total, last_awake = now, total, awake
+                continue
+            slept = (total - last_total) - (awake - last_awake)
+            # 这次检查比预定时间晚了多久
+            late = now - last_check - interval
+            last_check, last_total, last_awake = now, total, awake
+            if slept > SLEEP_TOLERANCE:
+                # 系统睡眠过，这段时间的心跳间隔不算卡顿
+                self.last_beat = now
+                stall = None
+                continue
+
+            beat = self.last_beat
+            if stall is None:
+                if now - beat > self.threshold:
+                    stack = capture_stack(self.main_thread_id)
+                    stall = {"beat": beat, "started": time.time() - (now - beat), "stack": stack}
+                elif late > self.threshold:
+                    # 心跳已经恢复，但后台线程被耽搁了：主线程刚刚结束一次持有 GIL 的长时间C调用，
+                    # 此时它的调用栈仍停在发起调用的函数中
+                    stack = capture_stack(self.main_thread_id)
+                    self.record({"started": time.time() - late, "stack": stack}, late, "gil")
+            elif beat != stall["beat"]:
+                # 主线程已经恢复，心跳间隔就是卡顿时长
+                self.record(stall, beat - stall["beat"])
+                stall = None
+        if stall is not None:
+            self.record(stall, time.monotonic() - stall["beat"])
+
+    def record(self, stall: Dict[str, Any], seconds: float, cause: str = "heartbeat"):
+        # cause 为 heartbeat（心跳超时）或 gil（主线程持有 GIL，后台线程无法运行）
+        stack = stall["stack"]
+        record = {
+            "time": datetime.fromtimestamp(stall["started"]).strftime("%Y-%m-%d %H:%M:%S"),
+            "duration_ms": round(seconds * 1000),
+            "cause": cause,
+            "site": stall_site(stack),
+            "stack": [format_frame(frame) for frame in stack],
+        }
+        print(f"界面卡顿 {record['duration_ms']} ms: {record['site']}")
+        self.log.append(record)
+
+
+# ---------------------------------------------------------------------------
+# 卡顿汇总
+# ---------------------------------------------------------------------------
+
+def summarize(records: Iterator[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """按卡顿位置汇总次数和时长，总时长最多的在前"""
+    sites: Dict[str, Dict[str, Any]] = defaultdict(lambda: {"count": 0, "total_ms": 0, "max_ms": 0})
+    for record in records:
+        site = record.get("site", "未知")
+        duration = int(record.get("duration_ms", 0))
+        summary = sites[site]
+        summary["count"] += 1
+        summary["total_ms"] += duration
+        if duration >= summary["max_ms"]:
+            summary["max_ms"] = duration
+            summary["stack"] = record.get("stack", [])
+            summary["last"] = record.get("time", "")
+    return sorted(({"site": site, **summary} for site, summary in sites.items()),
+                  key=lambda summary: summary["total_ms"], reverse=True)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="查看番茄计时器界面卡顿最多的位置")
+    parser.add_argument("--top", type=int, default=10, help="显示前几个位置")
+    parser.add_argument("--stack", action="store_true", help="显示每个位置最长一次卡顿的调用栈")
+    parser.add_argument("--data-dir", help="数据文件所在目录，默认为程序目录")
+    args = parser.parse_args(argv)
+
+    log = StallLog(os.path.join(args.data_dir or get_app_dir(), STALL_LOG_FILE_NAME))
+    summaries = summarize(log.iter_records())
+    if not summaries:
+        print("没有卡顿记录")
+        return 0
+
+    print(f"{'次数':>6}{'总时长':>10}{'最长':>10}  位置")
+    for summary in summaries[:args.top]:
+        print(f"{summary['count']:>6}{summary['total_ms'] / 1000:>9.1f}s{summary['max_ms']:>8}ms  {summary['site']}")
+        if args.stack:
+            for frame in summary["stack"]:
+                print(f"{'':>28}{frame}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,227 @@
+"""长时间运行检查（soak test）
+
+在虚拟时钟下反复执行开始、暂停、空闲休息和重置，模拟连续使用很多天，
+检查内存（tracemalloc）、Qt对象数量和图表场景中的图形项数量是否保持平稳，
+以及每种操作的耗时是否随运行时间变长。不需要显示器，可以在提交前或打包前运行：
+
+    python soak_harness.py
+    python soak_harness.py --cycles 5000 --chart scene
+    python soak_harness.py --tray
+
+任意一项检查不通过时返回非零退出码。数据写入临时目录，不会影响程序目录中的数据。
+"""
+import os
+import sys
+import argparse
+import statistics
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+# 每轮中计时和空闲休息各推进的虚拟秒数
+WORK_TICKS = 30
+IDLE_TICKS = 10
+
+# 预先写入的历史天数，让图表从一开始就显示满7天，图形项数量不会因为天数增加而变化
+SEED_DAYS = 7
+
+
+class VirtualClock:
+    """替代 dayclock.now 的虚拟时钟，只在调用 advance 时前进"""
+
+    def __init__(self, start: datetime):
+        self.current = start
+
+    def now(self) -> datetime:
+        return self.current
+
+    def advance(self, seconds: float):
+        self.current += timedelta(seconds=seconds)
+
+
+class MessageBoxStub:
+    """不弹出窗口的消息框，只记录调用次数"""
+
+    def __init__(self):
+        self.counts: Dict[str, int] = defaultdict(int)
+
+    def information(self, parent, title, text, *args):
+        self.counts["information"] += 1
+
+    def warning(self, parent, title, text, *args):
+        self.counts["warning"] += 1
+        print(f"警告: {title}: {text}")
+
+
+def traced_memory() -> int:
+    # 不计入本脚本自己记录的耗时数据
+    snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, __file__)])
+    return sum(stat.size for stat in snapshot.statistics("filename"))
+
+
+def seed_history(data_dir: str, today: datetime):
+    from pomodoro.storage import write_json_atomic, HISTORY_FILE_NAME
+
+    history = {}
+    for offset in range(SEED_DAYS, 0, -1):
+        day = (today - timedelta(days=offset)).strftime("%Y-%m-%d")
+        history[day] = {"work_time": 3600 * offset, "break_time": 600 * offset, "idle_time": 300,
+                        "updated_at": 0}
+    write_json_atomic(os.path.join(data_dir, HISTORY_FILE_NAME), history)
+
+
+def object_counts(app, window) -> Dict[str, int]:
+    from PyQt5.QtCore import QObject
+
+    counts = {"widgets": len(app.allWidgets())}
+    if window is not None:
+        counts["qt_objects"] = len(window.findChildren(QObject))
+        chart = window.chart_widget
+        if chart is not None and hasattr(chart, "item_count"):
+            counts["scene_items"] = chart.item_count()
+    return counts
+
+
+def run(args) -> int:
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QEvent
+
+    import pomodoro.app
+    from pomodoro import dayclock
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    clock = VirtualClock(datetime(2026, 1, 5, 8, 0, 0))
+    dayclock.now = clock.now
+    message_box = MessageBoxStub()
+    pomodoro.app.QMessageBox = message_box
+    pomodoro.app.CHART_BACKEND = args.chart or "raster"
+
+    data_dir = tempfile.mkdtemp(prefix="pomodoro_soak_")
+    seed_history(data_dir, clock.now())
+    if args.tray:
+        # 托盘模式：创建窗口后关闭，只保留托盘图标和计时器
+        from pomodoro.tray import TrayController
+        controller = TrayController(data_dir)
+        controller.start()
+        controller.window.close()
+        app.processEvents()
+        QApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+        window = None
+        engine = controller.engine
+    else:
+        window = pomodoro.app.PomodoroTimer(app_dir=data_dir)
+        engine = window.engine
+        if args.chart:
+            # 切换到历史记录选项卡，创建图表，之后每次保存都会刷新图表
+            window.tabs.setCurrentIndex(window.tabs.indexOf(window.history_tab))
+    app.processEvents()
+
+    # 每轮结束时把虚拟时钟推进到下一轮的开始时间，cycle_minutes 决定模拟的总天数
+    gap = max(0, args.cycle_minutes * 60 - WORK_TICKS - IDLE_TICKS)
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    start_day = engine.current_day
+
+    def timed(name, func):
+        started = time.perf_counter()
+        func()
+        latencies[name].append(time.perf_counter() - started)
+
+    def cycle():
+        timed("start", engine.toggle_timer)
+        for _ in range(WORK_TICKS):
+            clock.advance(1)
+            timed("tick", engine.update_timer)
+        timed("pause", engine.toggle_timer)
+        timed("idle_start", engine.toggle_idle_break)
+        for _ in range(IDLE_TICKS):
+            clock.advance(1)
+            timed("idle_tick", engine.update_idle_time)
+        timed("idle_end", engine.toggle_idle_break)
+        timed("reset", engine.reset_timer)
+        clock.advance(gap)
+
+    for _ in range(args.warmup):
+        cycle()
+    app.processEvents()
+
+    tracemalloc.start()
+    baseline_memory = traced_memory()
+    baseline_counts = object_counts(app, window)
+    for name in latencies:
+        latencies[name].clear()
+
+    started = time.perf_counter()
+    for i in range(1, args.cycles + 1):
+        cycle()
+        if i % 50 == 0:
+            app.processEvents()
+    app.processEvents()
+    elapsed = time.perf_counter() - started
+
+    final_memory = traced_memory()
+    tracemalloc.stop()
+    final_counts = object_counts(app, window)
+    days = len(engine.history_data)
+
+    print(f"完成 {args.cycles} 轮（预热 {args.warmup} 轮），用时 {elapsed:.1f} 秒，"
+          f"虚拟时间 {start_day} 至 {engine.current_day}，历史记录 {days} 天")
+    print(f"内存增长 {(final_memory - baseline_memory) / 1024:.1f} KB，预算 {args.memory_kb:.0f} KB")
+    for key, value in baseline_counts.items():
+        print(f"{key}: {value} -> {final_counts.get(key)}")
+
+    failed = False
+    if final_memory - baseline_memory > args.memory_kb * 1024:
+        print("错误: 内存持续增长")
+        failed = True
+    for key, value in baseline_counts.items():
+        if final_counts.get(key) != value:
+            print(f"错误: {key} 数量发生变化")
+            failed = True
+
+    # 比较开头和结尾各一段时间内的耗时中位数，历史文件随天数增长，允许一定的变化
+    print("操作          开头中位数    结尾中位数       p99")
+    for name, values in latencies.items():
+        window_size = max(1, len(values) // 10)
+        first = statistics.median(values[:window_size]) * 1e6
+        last = statistics.median(values[-window_size:]) * 1e6
+        p99 = sorted(values)[int(len(values) * 0.99)] * 1e6
+        print(f"{name:12s} {first:10.1f} us {last:10.1f} us {p99:10.1f} us")
+        if last > first * args.latency_factor and last - first > args.latency_floor_us:
+            print(f"错误: {name} 的耗时变长了")
+            failed = True
+
+    if message_box.counts["warning"]:
+        print(f"错误: 出现了 {message_box.counts['warning']} 次警告")
+        failed = True
+    if not failed:
+        print("通过")
+
+    if window is not None:
+        window.close()
+    else:
+        controller.quit()
+    return 1 if failed else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="番茄计时器长时间运行检查")
+    parser.add_argument("--cycles", type=int, default=2000, help="开始/暂停/空闲休息/重置的轮数")
+    parser.add_argument("--warmup", type=int, default=50, help="预热轮数，不计入结果")
+    parser.add_argument("--cycle-minutes", type=float, default=30, help="每轮推进的虚拟时间（分钟）")
+    parser.add_argument("--chart", choices=("raster", "scene"), help="同时刷新历史图表")
+    parser.add_argument("--tray", action="store_true", help="在托盘模式下运行（主窗口已销毁）")
+    parser.add_argument("--memory-kb", type=float, default=512, help="允许的内存增长（KB）")
+    parser.add_argument("--latency-factor", type=float, default=3.0, help="耗时中位数允许增长的倍数")
+    parser.add_argument("--latency-floor-us", type=float, default=50.0,
+                        help="耗时增长小于该值（微秒）时不算变长")
+    args = parser.parse_args(argv)
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
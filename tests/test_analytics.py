@@ -0,0 +1,76 @@
+from datetime import date, timedelta
+
+import pytest
+
+from pomodoro.analytics import analyze, np
+from pomodoro.archive import HistoryArchive, archive_old_days
+from pomodoro.model import HistoryModel
+from pomodoro.store import HistoryStore
+
+TODAY = date(2026, 10, 19)
+
+
+def make_history(days):
+    history = {}
+    for offset in range(days):
+        day = TODAY - timedelta(days=offset)
+        history[day.strftime("%Y-%m-%d")] = {"work_time": 600 * (offset % 9 + 1),
+                                             "break_time": 60, "idle_time": 0}
+    return history
+
+
+def make_store(tmp_path, history):
+    model = HistoryModel(history)
+    archive = HistoryArchive(str(tmp_path))
+    archive_old_days(model, archive, TODAY)
+    return HistoryStore(model, archive)
+
+
+def test_model_column_matches_records():
+    model = HistoryModel(make_history(10))
+    dates, values = model.column("work_time")
+    assert list(dates) == list(model.keys())
+    assert list(values) == [model[key]["work_time"] for key in dates]
+
+
+@pytest.mark.parametrize("use_numpy", [False] + ([True] if np is not None else []))
+def test_analyze_store_includes_archived_days(tmp_path, use_numpy):
+    history = make_history(400)
+    store = make_store(tmp_path, history)
+    # 大部分日期已经移入归档，只在查询接口中可见
+    assert len(store.hot) < 200
+
+    summary = analyze(store, TODAY, use_numpy)
+    expected = analyze(history, TODAY, use_numpy)
+    assert summary.days == expected.days == 400
+    assert summary.total == expected.total
+    assert summary.weekday_means == pytest.approx(expected.weekday_means)
+    assert summary.forecast_total == pytest.approx(expected.forecast_total)
+
+
+def test_store_column_stops_at_end(tmp_path):
+    store = make_store(tmp_path, make_history(400))
+    end = TODAY - timedelta(days=200)
+    dates, values = store.column("break_time", end)
+    assert len(dates) == len(values) == 200
+    assert dates == sorted(dates) and dates[-1] == end.strftime("%Y-%m-%d")
+    assert set(values) == {60}
+
+
+@pytest.mark.skipif(np is None, reason="没有安装 numpy")
+@pytest.mark.parametrize("days", [1, 5, 30, 400])
+def test_numpy_and_python_backends_agree(days):
+    # 有空缺的日期、今天之后的记录，以及今天还没有记录
+    history = {key: record for key, record in make_history(days).items() if int(key[8:10]) % 3}
+    history[(TODAY + timedelta(days=2)).strftime("%Y-%m-%d")] = {"work_time": 9999, "break_time": 0,
+                                                                 "idle_time": 0}
+    today = TODAY - timedelta(days=1)
+    python = analyze(history, today, use_numpy=False)
+    numpy = analyze(history, today, use_numpy=True)
+    for field in ("days", "total", "mean", "slope", "weekday_means", "weekday_index",
+                  "forecast_total", "last_week_total"):
+        assert getattr(python, field) == pytest.approx(getattr(numpy, field)), field
+    assert python.ewma.keys() == numpy.ewma.keys()
+    assert list(python.ewma.values()) == pytest.approx(list(numpy.ewma.values()))
+    assert [day for day, _ in python.forecast] == [day for day, _ in numpy.forecast]
+    assert [value for _, value in python.forecast] == pytest.approx([value for _, value in numpy.forecast])
@@ -0,0 +1,55 @@
+import json
+import os
+import time
+
+import pytest
+
+import pomodoro.app
+from pomodoro.storage import HISTORY_FILE_NAME
+
+
+class MessageBoxStub:
+    def __init__(self):
+        self.messages = []
+
+    def information(self, parent, title, text, *args):
+        self.messages.append((title, text))
+
+    def warning(self, parent, title, text, *args):
+        self.messages.append((title, text))
+
+
+@pytest.fixture
+def window(qapp, tmp_path, monkeypatch):
+    monkeypatch.setattr(pomodoro.app, "QMessageBox", MessageBoxStub())
+    window = pomodoro.app.PomodoroTimer(app_dir=str(tmp_path))
+    yield window
+    window.close()
+
+
+def test_import_runs_in_worker_thread(qapp, window, tmp_path, monkeypatch):
+    engine = window.engine
+    start = time.time() - 3600
+    source = tmp_path / "sessions.jsonl"
+    source.write_text(json.dumps({"start": start, "duration": 600, "kind": "work"}) + "\n", encoding="utf-8")
+    monkeypatch.setattr(pomodoro.app.QFileDialog, "getOpenFileNames", lambda *args: ([str(source)], ""))
+    engine.today_work_time = 100
+
+    window.import_records()
+    # 导入在后台进行，界面线程立即返回
+    assert window.import_task is not None and not window.import_button.isEnabled()
+    deadline = time.monotonic() + 10
+    while window.import_task is not None and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.01)
+
+    assert window.import_task is None and window.import_button.isEnabled()
+    assert pomodoro.app.QMessageBox.messages[-1][0] == "导入完成"
+    day = time.strftime("%Y-%m-%d", time.localtime(start))
+    with open(os.path.join(str(tmp_path), HISTORY_FILE_NAME), "r") as f:
+        saved = json.load(f)
+    # 一小时前可能是昨天
+    expected = 700 if day == engine.current_day else 600
+    assert saved[day]["work_time"] == expected
+    if day == engine.current_day:
+        assert engine.today_work_time == 700
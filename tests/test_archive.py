@@ -0,0 +1,104 @@
+import os
+from datetime import date, timedelta
+
+from pomodoro.archive import ARCHIVE_DIR_NAME, HistoryArchive, archive_cutoff, archive_old_days
+from pomodoro.model import HistoryModel
+from pomodoro.store import HistoryStore
+
+TODAY = date(2026, 10, 19)
+
+
+def make_history(days):
+    history = {}
+    for offset in range(days):
+        day = TODAY - timedelta(days=offset)
+        history[day.strftime("%Y-%m-%d")] = {"work_time": 60 * (offset % 13), "break_time": 30,
+                                             "idle_time": offset % 2, "updated_at": 1000.0 + offset}
+    return history
+
+
+def segment_files(app_dir):
+    return sorted(name for name in os.listdir(os.path.join(app_dir, ARCHIVE_DIR_NAME))
+                  if not name.startswith("index.json"))
+
+
+def test_archive_cutoff_keeps_whole_months():
+    assert archive_cutoff(TODAY, 92) == "2026-07-01"
+    assert archive_cutoff(date(2026, 10, 1), 0) == "2026-10-01"
+
+
+def test_archive_old_days_moves_months(tmp_path):
+    app_dir = str(tmp_path)
+    history = make_history(200)
+    model = HistoryModel(history)
+    archive = HistoryArchive(app_dir)
+
+    moved = archive_old_days(model, archive, TODAY)
+    cutoff = archive_cutoff(TODAY)
+    assert moved and all(key < cutoff for key in moved)
+    assert all(key >= cutoff for key in model.keys())
+    assert len(moved) + len(model) == 200
+
+    # 重新打开时从索引读取，不需要解压就能回答合计和是否存在
+    reopened = HistoryArchive(app_dir)
+    for key in moved:
+        assert reopened.contains(key)
+        assert reopened.get(key) == history[key]
+    month = moved[0][:7]
+    totals = reopened.month_totals(month)
+    days = [key for key in moved if key.startswith(month)]
+    assert totals["days"] == len(days)
+    assert totals["work_time"] == sum(history[key]["work_time"] for key in days)
+    assert list(reopened.iter_day_keys(month)) == sorted(days)
+
+
+def test_rearchiving_month_replaces_segment(tmp_path):
+    app_dir = str(tmp_path)
+    archive = HistoryArchive(app_dir)
+    archive.add_days({"2025-01-01": {"work_time": 10}, "2025-01-02": {"work_time": 20}})
+    first = segment_files(app_dir)
+
+    archive.add_days({"2025-01-02": {"work_time": 25}, "2025-01-03": {"work_time": 30}})
+    second = segment_files(app_dir)
+    assert len(first) == len(second) == 1 and first != second
+
+    reopened = HistoryArchive(app_dir)
+    assert {key: record["work_time"] for key, record in reopened.load_month("2025-01").items()} == \
+        {"2025-01-01": 10, "2025-01-02": 25, "2025-01-03": 30}
+    assert reopened.month_totals("2025-01")["work_time"] == 65
+
+
+def test_store_queries_span_hot_and_archive(tmp_path):
+    history = make_history(400)
+    model = HistoryModel(history)
+    archive = HistoryArchive(str(tmp_path))
+    archive_old_days(model, archive, TODAY)
+    store = HistoryStore(model, archive)
+
+    keys = sorted(history)
+    assert [key for key, _ in store.days()] == keys
+    assert store.range(limit=3) == [(key, history[key]["work_time"], history[key]["break_time"],
+                                     history[key]["idle_time"]) for key in keys[-3:]]
+
+    months = store.range(granularity="month")
+    assert sum(row[1] for row in months) == sum(record["work_time"] for record in history.values())
+    totals = store.totals(date(2025, 12, 1), date(2026, 1, 31))
+    expected = [history[key] for key in keys if "2025-12-01" <= key <= "2026-01-31"]
+    assert totals["days"] == len(expected) == 62
+    assert totals["work_time"] == sum(record["work_time"] for record in expected)
+
+
+def test_store_cache_invalidated_by_hot_change(tmp_path):
+    model = HistoryModel(make_history(30))
+    store = HistoryStore(model, HistoryArchive(str(tmp_path)))
+    today_key = TODAY.strftime("%Y-%m-%d")
+
+    before = store.totals(TODAY - timedelta(days=6), TODAY)
+    older = store.totals(TODAY - timedelta(days=29), TODAY - timedelta(days=20))
+    model[today_key]["work_time"] += 100
+
+    assert store.totals(TODAY - timedelta(days=6), TODAY)["work_time"] == before["work_time"] + 100
+    hits = store.hits
+    # 不包含这一天的缓存仍然有效
+    assert store.totals(TODAY - timedelta(days=29), TODAY - timedelta(days=20)) == older
+    assert store.hits == hits + 1
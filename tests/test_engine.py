@@ -0,0 +1,265 @@
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from pomodoro import dayclock
+from pomodoro.engine import TimerEngine
+from pomodoro.storage import HISTORY_FILE_NAME, write_json_atomic
+
+
+@pytest.fixture
+def engine(qapp, tmp_path):
+    engine = TimerEngine(str(tmp_path))
+    yield engine
+    for timer in (engine.timer, engine.idle_timer, engine.autosave_timer, engine.rollover_timer):
+        timer.stop()
+
+
+def read_history(app_dir):
+    with open(os.path.join(app_dir, HISTORY_FILE_NAME), "r") as f:
+        return json.load(f)
+
+
+def external_edit(app_dir, day, work_time):
+    # 模拟导入工具等其他程序修改历史文件
+    path = os.path.join(app_dir, HISTORY_FILE_NAME)
+    data = read_history(app_dir) if os.path.exists(path) else {}
+    data[day] = {"work_time": work_time, "break_time": 0, "idle_time": 0}
+    write_json_atomic(path, data)
+
+
+def yesterday(engine):
+    return (datetime.strptime(engine.current_day, "%Y-%m-%d") - timedelta(days=1)).strftime("%Y-%m-%d")
+
+
+def test_save_after_external_edit_keeps_today(engine, tmp_path):
+    engine.today_work_time = 1234
+    external_edit(str(tmp_path), yesterday(engine), 600)
+    engine.save_history_data()
+
+    saved = read_history(str(tmp_path))
+    assert saved[engine.current_day]["work_time"] == 1234
+    assert saved[yesterday(engine)]["work_time"] == 600
+    assert engine.history_data[engine.current_day]["work_time"] == 1234
+
+
+def test_repeated_external_edits_keep_today(engine, tmp_path):
+    engine.today_work_time = 100
+    engine.today_break_time = 50
+    engine.save_history_data()
+
+    external_edit(str(tmp_path), yesterday(engine), 600)
+    engine.today_work_time = 200
+    engine.save_history_data()
+
+    saved = read_history(str(tmp_path))
+    assert saved[engine.current_day]["work_time"] == 200
+    assert saved[engine.current_day]["break_time"] == 50
+    assert saved[yesterday(engine)]["work_time"] == 600
+
+
+def test_external_edit_of_clean_day_wins(engine, tmp_path):
+    engine.today_work_time = 100
+    engine.save_history_data()
+
+    # 本程序没有再修改的日期以文件内容为准
+    external_edit(str(tmp_path), engine.current_day, 5000)
+    engine.save_history_data()
+
+    assert read_history(str(tmp_path))[engine.current_day]["work_time"] == 5000
+
+
+def test_shutdown_saves_once(engine, tmp_path, monkeypatch):
+    engine.toggle_timer()
+    engine.segment_start -= timedelta(seconds=300)
+    engine.today_work_time = 300
+    saves = []
+    save_history_data = engine.save_history_data
+    monkeypatch.setattr(engine, "save_history_data", lambda: saves.append(save_history_data()))
+
+    # 退出菜单调用一次，之后 aboutToQuit 再调用一次
+    engine.shutdown()
+    engine.shutdown()
+
+    assert len(saves) == 1
+    assert len(list(engine.session_log.iter_events())) == 1
+    assert read_history(str(tmp_path))[engine.current_day]["work_time"] == 300
+
+
+def test_merge_adds_time_written_by_other_program_to_today(engine, tmp_path):
+    engine.today_work_time = 100
+    engine.save_history_data()
+
+    # 导入工具在文件中给今天加了 50 秒，同时计时器又增加了 30 秒
+    path = os.path.join(str(tmp_path), HISTORY_FILE_NAME)
+    data = read_history(str(tmp_path))
+    data[engine.current_day]["work_time"] += 50
+    write_json_atomic(path, data)
+    engine.today_work_time += 30
+    engine.save_history_data()
+
+    assert read_history(str(tmp_path))[engine.current_day]["work_time"] == 180
+    assert engine.today_work_time == 180
+    # 之后的保存不会用旧的今日统计覆盖合并结果
+    engine.save_history_data()
+    assert read_history(str(tmp_path))[engine.current_day]["work_time"] == 180
+
+
+# ---------------------------------------------------------------------------
+# 跨过午夜
+# ---------------------------------------------------------------------------
+
+class Clock:
+    """替换 dayclock.now 的可调时钟"""
+
+    def __init__(self, moment):
+        self.moment = moment
+
+    def __call__(self):
+        return self.moment
+
+
+@pytest.fixture
+def new_york(monkeypatch):
+    # 美国东部时间：2026-03-08 只有23小时，2026-11-01 有25小时
+    old = os.environ.get("TZ")
+    os.environ["TZ"] = "America/New_York"
+    time.tzset()
+    yield
+    if old is None:
+        del os.environ["TZ"]
+    else:
+        os.environ["TZ"] = old
+    time.tzset()
+
+
+@pytest.fixture
+def clock(new_york, monkeypatch):
+    clock = Clock(datetime(2026, 10, 10, 23, 55))
+    monkeypatch.setattr(dayclock, "now", clock)
+    return clock
+
+
+@pytest.fixture
+def clocked_engine(qapp, tmp_path, clock):
+    engine = TimerEngine(str(tmp_path))
+    yield engine
+    for timer in (engine.timer, engine.idle_timer, engine.autosave_timer, engine.rollover_timer):
+        timer.stop()
+
+
+def test_split_by_day_at_midnight(new_york):
+    parts = dayclock.split_by_day(datetime(2026, 10, 10, 23, 50), datetime(2026, 10, 11, 0, 20))
+    assert parts == [("2026-10-10", 600), ("2026-10-11", 1200)]
+    # 不跨过午夜时只有一段
+    assert dayclock.split_by_day(datetime(2026, 10, 10, 9), datetime(2026, 10, 10, 10)) == [("2026-10-10", 3600)]
+
+
+def test_idle_break_across_midnight(clocked_engine, clock, tmp_path):
+    engine = clocked_engine
+    engine.today_idle_time = 100
+    clock.moment = datetime(2026, 10, 11, 0, 20)
+    engine.add_idle_time(datetime(2026, 10, 10, 23, 50), clock.moment)
+
+    assert engine.current_day == "2026-10-11"
+    assert engine.today_idle_time == 1200
+    assert engine.history_data["2026-10-10"]["idle_time"] == 700
+
+    engine.save_history_data()
+    saved = read_history(str(tmp_path))
+    assert saved["2026-10-10"]["idle_time"] == 700
+    assert saved["2026-10-11"]["idle_time"] == 1200
+
+
+def test_timer_tick_after_midnight_counts_for_new_day(clocked_engine, clock):
+    engine = clocked_engine
+    engine.today_work_time = 500
+    engine.is_running = True
+    engine.time_left = 100
+    clock.moment = datetime(2026, 10, 11, 0, 0, 1)
+    engine.update_timer()
+
+    assert engine.current_day == "2026-10-11"
+    assert engine.today_work_time == 1
+    assert engine.history_data["2026-10-10"]["work_time"] == 500
+
+
+def test_rollover_deadline_after_suspend(clocked_engine, clock, tmp_path):
+    engine = clocked_engine
+    engine.today_work_time = 500
+    # 系统睡眠了三天多，唤醒后截止时间的定时器才触发
+    clock.moment = datetime(2026, 10, 14, 9, 0)
+    engine.on_rollover_deadline()
+
+    assert engine.current_day == "2026-10-14"
+    assert engine.today_work_time == 0
+    saved = read_history(str(tmp_path))
+    assert saved["2026-10-10"]["work_time"] == 500
+    # 跳过的日期没有记录
+    assert "2026-10-12" not in saved
+    # 下一次截止时间是新的一天的午夜，最多一小时后重新检查
+    assert engine.day_start_ts == datetime(2026, 10, 14).timestamp()
+    assert engine.day_end_ts == datetime(2026, 10, 15).timestamp()
+    assert 0 < engine.rollover_timer.interval() <= dayclock.MAX_ROLLOVER_INTERVAL_MS
+
+
+@pytest.mark.parametrize("day, hours", [(datetime(2026, 3, 8, 12), 23), (datetime(2026, 11, 1, 12), 25),
+                                         (datetime(2026, 10, 10, 12), 24)])
+def test_day_length_on_dst_transitions(new_york, day, hours):
+    start, end = dayclock.day_bounds(day)
+    assert end - start == hours * 3600
+    parts = dayclock.split_by_day(day.replace(hour=0), day.replace(hour=0) + timedelta(days=1))
+    assert parts == [(day.strftime("%Y-%m-%d"), hours * 3600)]
+
+
+def test_rollover_on_dst_end_day(clocked_engine, clock):
+    engine = clocked_engine
+    clock.moment = datetime(2026, 11, 1, 23, 59)
+    engine.on_rollover_deadline()
+    assert engine.day_end_ts - engine.day_start_ts == 25 * 3600
+    assert engine.rollover_timer.interval() == 60 * 1000
+
+    # 跨过夏令时结束那一夜的空闲休息，按本地午夜切分
+    clock.moment = datetime(2026, 11, 2, 1, 0)
+    engine.add_idle_time(datetime(2026, 11, 1, 23, 0), clock.moment)
+    assert engine.history_data["2026-11-01"]["idle_time"] == 3600
+    assert engine.today_idle_time == 3600
+
+
+def test_merge_with_writer_between_load_and_save(qapp, tmp_path):
+    app_dir = str(tmp_path)
+    today = dayclock.now()
+    a, b, c, d = ((today - timedelta(days=n)).strftime("%Y-%m-%d") for n in (1, 2, 3, 4))
+    stale = {day: {"work_time": 100 * n, "break_time": 0, "idle_time": 0, "updated_at": 1000.0}
+             for n, day in enumerate((a, b, d), 1)}
+    write_json_atomic(os.path.join(app_dir, HISTORY_FILE_NAME), stale)
+    engine = TimerEngine(app_dir)
+    try:
+        # 本程序修改并保存了 a
+        noon = datetime.strptime(a, "%Y-%m-%d").replace(hour=12)
+        engine.add_idle_time(noon, noon + timedelta(hours=1))
+        engine.save_history_data()
+        saved_a = read_history(app_dir)[a]
+
+        # 另一个程序在此之前读取了文件，现在写回：a 是旧记录，b 被丢掉，c 是新的一天，d 是更新的记录
+        other = {key: dict(value) for key, value in stale.items() if key != b}
+        other[c] = {"work_time": 700, "break_time": 0, "idle_time": 0, "updated_at": 1000.0}
+        other[d] = {"work_time": 800, "break_time": 0, "idle_time": 0, "updated_at": today.timestamp() + 100}
+        write_json_atomic(os.path.join(app_dir, HISTORY_FILE_NAME), other)
+
+        engine.today_work_time = 30
+        engine.save_history_data()
+        merged = read_history(app_dir)
+        # 每一天保留修改时间较新的记录，两边的日期都没有丢失
+        assert merged[a] == saved_a and saved_a["idle_time"] == 3600
+        assert merged[b]["work_time"] == 200
+        assert merged[c]["work_time"] == 700
+        assert merged[d]["work_time"] == 800
+        assert merged[engine.current_day]["work_time"] == 30
+        assert engine.history_data[d]["work_time"] == 800
+    finally:
+        for timer in (engine.timer, engine.idle_timer, engine.autosave_timer, engine.rollover_timer):
+            timer.stop()
@@ -0,0 +1,84 @@
+import csv
+import os
+from datetime import date, datetime
+
+import pytest
+
+from pomodoro.export import EXPORT_STATE_FILE_NAME, export_data, main
+from pomodoro.importer import import_files
+from pomodoro.storage import HISTORY_FILE_NAME, write_json_atomic
+
+HISTORY = {
+    "2026-10-01": {"work_time": 100, "break_time": 0, "idle_time": 0, "updated_at": 1000.0},
+    "2026-10-02": {"work_time": 200, "break_time": 0, "idle_time": 0, "updated_at": 3000.0},
+    "2026-10-03": {"work_time": 300, "break_time": 0, "idle_time": 0, "updated_at": 2000.0},
+}
+
+
+@pytest.fixture
+def app_dir(tmp_path):
+    write_json_atomic(os.path.join(str(tmp_path), HISTORY_FILE_NAME), HISTORY)
+    return str(tmp_path)
+
+
+def read_dates(path):
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return [row["date"] for row in csv.DictReader(f)]
+
+
+def test_export_date_range(app_dir, tmp_path):
+    output = str(tmp_path / "days.csv")
+    count = export_data("days", output, start=date(2026, 10, 2), end=date(2026, 10, 3), app_dir=app_dir)
+    assert count == 2
+    assert read_dates(output) == ["2026-10-02", "2026-10-03"]
+
+
+def test_incremental_export_moves_watermark(app_dir, tmp_path):
+    output = str(tmp_path / "days.csv")
+    assert export_data("days", output, incremental=True, app_dir=app_dir) == 3
+    assert export_data("days", output, incremental=True, app_dir=app_dir) == 0
+
+    history = dict(HISTORY)
+    history["2026-10-01"] = dict(history["2026-10-01"], work_time=150, updated_at=4000.0)
+    write_json_atomic(os.path.join(app_dir, HISTORY_FILE_NAME), history)
+    assert export_data("days", output, incremental=True, app_dir=app_dir) == 1
+    assert read_dates(output) == ["2026-10-01"]
+
+
+def test_incremental_export_rejects_date_range(app_dir, tmp_path):
+    output = str(tmp_path / "days.csv")
+    with pytest.raises(ValueError):
+        export_data("days", output, start=date(2026, 10, 2), incremental=True, app_dir=app_dir)
+    # 没有写出文件，也没有移动水位
+    assert not os.path.exists(output)
+    assert not os.path.exists(os.path.join(app_dir, EXPORT_STATE_FILE_NAME))
+    assert export_data("days", output, incremental=True, app_dir=app_dir) == 3
+
+
+def test_cli_rejects_incremental_with_range(app_dir, tmp_path, capsys):
+    output = str(tmp_path / "days.csv")
+    assert main(["days", output, "--incremental", "--end", "2026-10-02", "--data-dir", app_dir]) == 1
+    assert "增量导出" in capsys.readouterr().out
+
+
+def test_incremental_export_between_import_batches(tmp_path):
+    app_dir = str(tmp_path)
+    source = tmp_path / "sessions.csv"
+    first = datetime(2026, 10, 10, 9, 0).timestamp()
+    second = datetime(2026, 10, 11, 9, 0).timestamp()
+    source.write_text(f"start,duration,kind\n{first},1500,work\n{second},1500,work\n", encoding="utf-8")
+    exported = {"days": [], "sessions": []}
+
+    def export_all():
+        for kind in exported:
+            output = str(tmp_path / f"{kind}-{len(exported[kind])}.csv")
+            export_data(kind, output, incremental=True, app_dir=app_dir)
+            exported[kind].append(read_dates(output))
+
+    # 每行一批，第一批提交后、第二批提交前运行一次增量导出
+    import_files([str(source)], app_dir, batch_size=1, progress=lambda stats: stats.rows == 1 and export_all())
+    export_all()
+
+    for kind in exported:
+        assert exported[kind][0] == ["2026-10-10"]
+        assert "2026-10-11" in exported[kind][-1]
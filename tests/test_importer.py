@@ -0,0 +1,105 @@
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+from pomodoro.importer import Importer, import_files, parse_seconds
+from pomodoro.model import HistoryModel, MAX_SECONDS
+from pomodoro.sessions import SessionLog
+from pomodoro.storage import HISTORY_FILE_NAME, SESSIONS_FILE_NAME, write_json_atomic
+
+
+def write_file(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return str(path)
+
+
+def read_history(app_dir):
+    with open(os.path.join(app_dir, HISTORY_FILE_NAME), "r") as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("", 0), (None, 0), (90, 90), ("90", 90), ("1:30", 90), ("01:00:05", 3605), ("12.7", 12),
+])
+def test_parse_seconds(value, expected):
+    assert parse_seconds(value) == expected
+
+
+@pytest.mark.parametrize("value", ["-5", -5, "-1:00", "1:-30", str(MAX_SECONDS + 1), "abc"])
+def test_parse_seconds_rejects(value):
+    with pytest.raises(ValueError):
+        parse_seconds(value)
+
+
+def test_import_days_then_reload(tmp_path):
+    app_dir = str(tmp_path)
+    source = write_file(tmp_path / "days.csv",
+                        "date,work,break,idle\n2026-10-10,-5,0,0\n2026-10-11,3600,600,60\n"
+                        f"2026-10-12,{MAX_SECONDS + 1},0,0\n2026-10-13,1:00:00,5:00,\n")
+    stats = import_files([source], app_dir)
+    assert (stats.days, stats.errors) == (2, 2)
+
+    history = read_history(app_dir)
+    assert set(history) == {"2026-10-11", "2026-10-13"}
+    assert history["2026-10-13"]["work_time"] == 3600
+    # 重新加载时不会因为超出范围的数据失败
+    model = HistoryModel.from_dict(history)
+    assert model["2026-10-11"]["break_time"] == 600
+
+    # 再次导入时全部视为重复
+    stats = import_files([source], app_dir)
+    assert (stats.days, stats.duplicates) == (0, 2)
+
+
+def test_import_sessions_accumulates_days(tmp_path):
+    app_dir = str(tmp_path)
+    start = datetime(2026, 10, 10, 9, 0).timestamp()
+    source = write_file(tmp_path / "sessions.jsonl", "\n".join(json.dumps(row) for row in [
+        {"start": start, "duration": 1500, "kind": "work"},
+        {"start": start + 1500, "duration": 300, "kind": "break"},
+        {"start": start + 1800, "duration": 1500, "kind": "work"},
+        {"start": start + 1800, "duration": 1500, "kind": "work"},
+        {"start": start + 4000, "duration": -10, "kind": "work"},
+    ]) + "\n")
+    stats = import_files([source], app_dir)
+    assert (stats.sessions, stats.duplicates, stats.errors) == (3, 1, 1)
+
+    day = read_history(app_dir)["2026-10-10"]
+    assert (day["work_time"], day["break_time"]) == (3000, 300)
+    events = list(SessionLog(os.path.join(app_dir, SESSIONS_FILE_NAME)).iter_events())
+    assert len(events) == 3
+
+
+def test_overflowing_session_is_skipped_without_partial_write(tmp_path):
+    app_dir = str(tmp_path)
+    write_json_atomic(os.path.join(app_dir, HISTORY_FILE_NAME),
+                      {"2026-10-10": {"work_time": MAX_SECONDS - 10, "break_time": 0, "idle_time": 0}})
+    history = HistoryModel.from_dict(read_history(app_dir))
+    session_log = SessionLog(os.path.join(app_dir, SESSIONS_FILE_NAME))
+    start = datetime(2026, 10, 10, 9, 0).timestamp()
+    source = write_file(tmp_path / "sessions.csv",
+                        f"start,duration,kind\n{start},100,work\n{start + 200},100,break\n")
+
+    importer = Importer(history, session_log, os.path.join(app_dir, HISTORY_FILE_NAME))
+    stats = importer.import_file(source)
+
+    assert (stats.sessions, stats.errors) == (1, 1)
+    assert history["2026-10-10"]["work_time"] == MAX_SECONDS - 10
+    assert history["2026-10-10"]["break_time"] == 100
+    assert [event["kind"] for event in session_log.iter_events()] == ["break"]
+    assert read_history(app_dir)["2026-10-10"]["break_time"] == 100
+
+
+def test_day_row_and_session_on_same_date(tmp_path):
+    app_dir = str(tmp_path)
+    start = datetime(2026, 10, 10, 9, 0).timestamp()
+    source = write_file(tmp_path / "mixed.jsonl", "\n".join(json.dumps(row) for row in [
+        {"date": "2026-10-10", "work": 3600, "break": 0, "idle": 0},
+        {"start": start, "duration": 1500, "kind": "work"},
+    ]) + "\n")
+    stats = import_files([source], app_dir)
+    assert (stats.days, stats.sessions, stats.errors) == (1, 1, 0)
+    assert read_history(app_dir)["2026-10-10"]["work_time"] == 5100
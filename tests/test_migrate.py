@@ -0,0 +1,141 @@
+import json
+import os
+from datetime import date, timedelta
+
+import pytest
+
+from pomodoro.archive import HistoryArchive, archive_cutoff
+from pomodoro.migrate import (CHECKPOINT_FILE_NAME, HistoryMigration, MigrationError,
+                              iter_history_records, migrate_state, salvage_history_file)
+from pomodoro.storage import HISTORY_FILE_NAME, STATE_FILE_NAME, STATE_VERSION
+
+TODAY = date(2026, 10, 19)
+
+
+def make_history(days):
+    history = {}
+    for offset in range(days, 0, -1):
+        day = TODAY - timedelta(days=offset)
+        history[day.strftime("%Y-%m-%d")] = {"work_time": 60 * (offset % 17), "break_time": offset % 5,
+                                             "idle_time": 0}
+    return history
+
+
+def write_history(app_dir, history, indent=None):
+    path = os.path.join(app_dir, HISTORY_FILE_NAME)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=indent)
+    return path
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 20])
+@pytest.mark.parametrize("indent", [None, 4])
+def test_iter_history_records_matches_json(tmp_path, chunk_size, indent):
+    history = make_history(50)
+    path = write_history(str(tmp_path), history, indent)
+    stats = {}
+    records = {key: record for key, record, _ in iter_history_records(path, stats=stats, chunk_size=chunk_size)}
+    assert records == history
+    assert stats == {"records": 50, "damaged": 0}
+
+
+def test_iter_history_records_resumes_from_offset(tmp_path):
+    path = write_history(str(tmp_path), make_history(10))
+    items = list(iter_history_records(path, chunk_size=16))
+    rest = list(iter_history_records(path, offset=items[3][2], chunk_size=16))
+    assert rest == items[4:]
+
+
+def test_salvage_skips_damaged_records(tmp_path):
+    path = os.path.join(str(tmp_path), HISTORY_FILE_NAME)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"2026-01-01": {"work_time": 100, "break_time": 0, "idle_time": 0}, '
+                '"2026-01-02": {"work_time": -5}, '
+                '"2026-01-03": {"work_time": "abc"}, '
+                '"2026-01-04": {"work_time": 40, "break_time": 10, "idle_time": 0}, '
+                '"2026-01-05": {"work_time": 7')
+    data, stats = salvage_history_file(path)
+    assert sorted(data) == ["2026-01-01", "2026-01-04"]
+    assert data["2026-01-04"]["break_time"] == 10
+    assert stats["damaged"] == 3
+    assert any(name.startswith(HISTORY_FILE_NAME + ".corrupt-") for name in os.listdir(str(tmp_path)))
+
+
+def check_migrated(app_dir, history):
+    cutoff = archive_cutoff(TODAY)
+    with open(os.path.join(app_dir, HISTORY_FILE_NAME), "r") as f:
+        hot = json.load(f)
+    assert hot == {key: record for key, record in history.items() if key >= cutoff}
+    archive = HistoryArchive(app_dir)
+    for key, record in history.items():
+        if key < cutoff:
+            assert archive.get(key) == record
+
+
+def test_migration_in_place(tmp_path):
+    app_dir = str(tmp_path)
+    history = make_history(500)
+    write_history(app_dir, history)
+
+    result = HistoryMigration(app_dir, today=TODAY, batch_days=100).run()
+    assert result["days"] == 500
+    assert result["archived_days"] + result["hot_days"] == 500
+    check_migrated(app_dir, history)
+    assert os.path.exists(os.path.join(app_dir, HISTORY_FILE_NAME + ".pre-migrate"))
+    assert not os.path.exists(os.path.join(app_dir, CHECKPOINT_FILE_NAME))
+
+
+def test_interrupted_migration_resumes(tmp_path):
+    app_dir = str(tmp_path)
+    history = make_history(500)
+    write_history(app_dir, history)
+
+    def interrupt(offset, stats):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        HistoryMigration(app_dir, today=TODAY, batch_days=100).run(progress=interrupt)
+    with open(os.path.join(app_dir, CHECKPOINT_FILE_NAME), "r") as f:
+        checkpoint = json.load(f)
+    assert checkpoint["phase"] == "convert" and checkpoint["offset"] > 0
+
+    offsets = []
+    HistoryMigration(app_dir, today=TODAY, batch_days=100).run(progress=lambda offset, stats: offsets.append(offset))
+    # 从上次保存的位置继续，而不是从头读取
+    assert offsets[0] > checkpoint["offset"]
+    check_migrated(app_dir, history)
+
+
+def test_migration_rejects_modified_source(tmp_path):
+    app_dir = str(tmp_path)
+    path = write_history(app_dir, make_history(200))
+    migration = HistoryMigration(app_dir, today=TODAY)
+
+    def modify(offset, stats):
+        # 迁移期间计时器写入了历史文件
+        write_history(app_dir, make_history(201))
+
+    original = migration.convert
+    migration.convert = lambda progress=None: original(modify)
+    with pytest.raises(MigrationError):
+        migration.run()
+    # 源文件保持不变
+    with open(path, "r") as f:
+        assert json.load(f) == make_history(201)
+
+
+def test_migrate_state_recovers_fields(tmp_path):
+    app_dir = str(tmp_path)
+    path = os.path.join(app_dir, STATE_FILE_NAME)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"is_working": false, "is_running": true, "time_left": 90, "timestamp": 1.7e9, "idle_')
+    state = migrate_state(app_dir)
+    assert state == {"version": STATE_VERSION, "is_working": False, "is_running": True,
+                     "is_idle_break": False, "time_left": 90, "timestamp": 1.7e9,
+                     "idle_break_timestamp": None}
+    with open(path, "r") as f:
+        assert json.load(f) == state
+
+
+def test_migrate_state_without_file(tmp_path):
+    assert migrate_state(str(tmp_path)) is None
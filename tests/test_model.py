@@ -0,0 +1,71 @@
+import pytest
+
+from pomodoro.model import HistoryModel
+
+DATA = {
+    "2026-01-01": {"work_time": 3600, "break_time": 600, "idle_time": 300, "updated_at": 1.7e9},
+    "2026-01-02": {"work_time": 1800, "break_time": 0, "idle_time": 0},
+    "2026-01-03": {"work_time": 0, "break_time": 300, "idle_time": 60, "updated_at": 1.8e9},
+}
+
+
+def test_round_trip_keeps_old_format():
+    model = HistoryModel.from_dict(DATA)
+    assert model.to_dict() == DATA
+    # 没有修改时间的记录不写出 updated_at
+    assert "updated_at" not in model.to_dict()["2026-01-02"]
+
+
+def test_record_view_writes_back():
+    model = HistoryModel(DATA)
+    record = model["2026-01-02"]
+    record["work_time"] += 60
+    assert model["2026-01-02"].work_time == 1860
+    assert dict(record)["work_time"] == 1860
+
+
+def test_delete_keeps_other_rows():
+    model = HistoryModel(DATA)
+    view = model["2026-01-03"]
+    del model["2026-01-01"]
+    assert "2026-01-01" not in model
+    assert len(model) == 2
+    # 最后一行移到了被删除的位置，视图仍然指向原来的日期
+    assert view["work_time"] == 0 and view["break_time"] == 300
+    assert model.to_dict() == {key: DATA[key] for key in ("2026-01-02", "2026-01-03")}
+
+
+def test_copy_survives_clear():
+    model = HistoryModel(DATA)
+    copied = dict(model["2026-01-01"])
+    model.clear()
+    assert len(model) == 0
+    assert copied["work_time"] == 3600
+    with pytest.raises(KeyError):
+        model["2026-01-01"]
+
+
+def test_listeners_receive_changed_dates():
+    model = HistoryModel(DATA)
+    changes = []
+    model.add_listener(changes.append)
+    model["2026-01-04"] = {"work_time": 1}
+    model["2026-01-01"]["idle_time"] = 5
+    del model["2026-01-02"]
+    model.clear()
+    assert changes == ["2026-01-04", "2026-01-01", "2026-01-02", None]
+
+
+def test_setdefault_returns_view():
+    model = HistoryModel()
+    record = model.setdefault("2026-02-01", {"work_time": 10})
+    record["work_time"] = 20
+    assert model["2026-02-01"]["work_time"] == 20
+
+
+@pytest.mark.parametrize("value", [-1, 2 ** 32])
+def test_out_of_range_durations_rejected(value):
+    model = HistoryModel()
+    with pytest.raises(OverflowError):
+        model["2026-01-01"] = {"work_time": value}
+    assert "2026-01-01" not in model
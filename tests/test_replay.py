@@ -0,0 +1,88 @@
+import pytest
+
+from pomodoro.replay import CURRENT_CADENCE, SessionSpans, collect_spans, make_grid, np, simulate
+
+needs_numpy = pytest.mark.skipif(np is None, reason="没有安装 numpy")
+
+CADENCES = make_grid((20, 25, 50), (5, 10), (0, 15, 30), (2, 4)) + [(60, 0, 0, 0), (1500, 300, 900, 1)]
+
+
+def make_spans(lengths_by_day):
+    spans = SessionSpans()
+    for day, lengths in enumerate(lengths_by_day):
+        spans.day_keys.append(f"2026-10-{day + 1:02d}")
+        for length in lengths:
+            spans.lengths.append(length)
+            spans.day_index.append(day)
+    return spans
+
+
+# 包括不到一个番茄、正好一个循环、两三个完整循环加零头，以及在长休息中结束的时间段
+SPANS = make_spans([[600, 1500, 1800], [7200, 3 * 3600 + 17], [2100], [5 * 3600 + 1234, 59, 2700 + 4500]])
+
+
+def step_by_step(length, cadence):
+    """逐个阶段模拟：工作、休息交替，每完成 N 个番茄长休息一次"""
+    work_seconds, short_break, long_break, long_every = cadence
+    work = completed = interrupted = 0
+    left = length
+    while left > 0:
+        done = min(left, work_seconds)
+        work += done
+        left -= done
+        if done == work_seconds:
+            completed += 1
+        else:
+            interrupted += 1
+        if long_break > 0 and long_every > 0 and completed % long_every == 0:
+            left -= long_break
+        else:
+            left -= short_break
+    return work, completed, interrupted
+
+
+@pytest.mark.parametrize("use_numpy", [False] + ([True] if np is not None else []))
+def test_closed_form_matches_step_by_step(use_numpy):
+    results = simulate(SPANS, CADENCES, use_numpy)
+    for cadence, result in zip(CADENCES, results):
+        expected = [step_by_step(length, cadence) for length in SPANS.lengths]
+        assert result["work_time"] == sum(work for work, _, _ in expected)
+        assert result["completed"] == sum(done for _, done, _ in expected)
+        assert result["interrupted"] == sum(cut for _, _, cut in expected)
+        assert result["break_time"] == sum(SPANS.lengths) - result["work_time"]
+
+
+def test_two_cycles_with_long_break():
+    # 25/5，每2个番茄长休息15：一个循环 25+5+25+15 = 70 分钟
+    spans = make_spans([[140 * 60 + 10 * 60]])
+    result = simulate(spans, [(1500, 300, 900, 2)], use_numpy=False)[0]
+    assert result["completed"] == 4
+    assert result["work_time"] == 4 * 1500 + 600
+    assert result["interrupted"] == 1
+
+
+@needs_numpy
+def test_numpy_and_python_backends_agree():
+    python = simulate(SPANS, CADENCES, use_numpy=False)
+    numpy = simulate(SPANS, CADENCES, use_numpy=True)
+    assert len(python) == len(numpy) == len(CADENCES)
+    for a, b in zip(python, numpy):
+        assert a.keys() == b.keys()
+        for field in a:
+            assert a[field] == pytest.approx(b[field]), field
+
+
+def test_collect_spans_merges_short_gaps():
+    events = [
+        {"kind": "work", "start": 0, "end": 1500, "date": "2026-10-01"},
+        {"kind": "break", "start": 1560, "end": 2160, "date": "2026-10-01"},
+        {"kind": "idle", "start": 2160, "end": 4000, "date": "2026-10-01"},
+        {"kind": "work", "start": 4000, "end": 5500, "date": "2026-10-01"},
+        {"kind": "work", "start": 90000, "end": 91500, "date": "2026-10-02"},
+    ]
+    spans = collect_spans(events)
+    assert spans.lengths == [2160, 1500, 1500]
+    assert spans.day_index == [0, 0, 1]
+    assert spans.day_keys == ["2026-10-01", "2026-10-02"]
+    assert spans.recorded == {"work_time": 4500, "break_time": 600, "idle_time": 1840}
+    assert simulate(spans, [CURRENT_CADENCE], use_numpy=False)[0]["idle_time"] == 1840
@@ -0,0 +1,36 @@
+import os
+from datetime import date, timedelta
+
+from pomodoro.analytics import analyze
+from pomodoro.report import REPORT_DAYS, REPORT_WEEKLY
+from pomodoro.snapshot import init_worker, plan_jobs
+from pomodoro.storage import HISTORY_FILE_NAME, write_json_atomic
+
+TODAY = date(2026, 10, 19)
+
+
+def test_jobs_carry_only_their_weeks(tmp_path):
+    history = {}
+    for offset in range(400):
+        key = (TODAY - timedelta(days=offset)).strftime("%Y-%m-%d")
+        history[key] = {"work_time": 600 * (offset % 7), "break_time": 60, "idle_time": 0}
+    write_json_atomic(os.path.join(str(tmp_path), HISTORY_FILE_NAME), history)
+
+    jobs = plan_jobs([("me", str(tmp_path))], date(2026, 7, 1), date(2026, 9, 30), TODAY,
+                     str(tmp_path / "out"), ("png", "pdf"))
+    assert len(jobs) == 14
+    for _, monday, _, _, report_day, days, analytics in jobs:
+        # 只包含报告用到的几周，读取的数据到季度最后一天为止
+        first = (report_day - timedelta(days=REPORT_DAYS[REPORT_WEEKLY] - 1)).strftime("%Y-%m-%d")
+        last = min(report_day.strftime("%Y-%m-%d"), "2026-09-30")
+        assert sorted(days) == sorted(key for key in history if first <= key <= last)
+        assert monday.strftime("%Y-%m-%d") in days
+        # 趋势分析在主进程中使用这一周之前的全部数据
+        visible = {key: value for key, value in history.items() if "2025-07-01" <= key <= last}
+        assert analytics.total == analyze(visible, report_day).total
+
+
+def test_worker_forces_offscreen(qapp, monkeypatch):
+    monkeypatch.setenv("QT_QPA_PLATFORM", "xcb")
+    init_worker()
+    assert os.environ["QT_QPA_PLATFORM"] == "offscreen"
@@ -0,0 +1,36 @@
+import os
+import threading
+
+import pytest
+
+from pomodoro.storage import HISTORY_FILE_NAME, file_lock, load_json, write_json_atomic
+
+
+def test_file_lock_excludes_second_writer(tmp_path):
+    path = os.path.join(str(tmp_path), HISTORY_FILE_NAME)
+    with file_lock(path):
+        with pytest.raises(TimeoutError):
+            with file_lock(path, timeout=0.05):
+                pass
+    # 释放后可以再次加锁
+    with file_lock(path, timeout=0.05):
+        pass
+
+
+def test_file_lock_serializes_read_modify_write(tmp_path):
+    path = os.path.join(str(tmp_path), HISTORY_FILE_NAME)
+    write_json_atomic(path, {"count": 0})
+
+    def add(times):
+        for _ in range(times):
+            with file_lock(path):
+                data = load_json(path)
+                data["count"] += 1
+                write_json_atomic(path, data)
+
+    threads = [threading.Thread(target=add, args=(50,)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert load_json(path) == {"count": 200}
@@ -0,0 +1,102 @@
+from datetime import date, timedelta
+
+import pytest
+
+from pomodoro.archive import HistoryArchive, archive_cutoff, archive_old_days
+from pomodoro.model import HistoryModel
+from pomodoro.store import HistoryStore
+
+TODAY = date(2026, 10, 19)
+
+
+def make_history(days):
+    history = {}
+    for offset in range(days):
+        day = TODAY - timedelta(days=offset)
+        history[day.strftime("%Y-%m-%d")] = {"work_time": 60 * (offset % 7 + 1), "break_time": 30,
+                                             "idle_time": 0, "updated_at": 1000.0 + offset}
+    return history
+
+
+@pytest.fixture
+def store(tmp_path):
+    model = HistoryModel(make_history(200))
+    archive = HistoryArchive(str(tmp_path))
+    archive_old_days(model, archive, TODAY)
+    return HistoryStore(model, archive)
+
+
+def key(day):
+    return day.strftime("%Y-%m-%d")
+
+
+WEEK = (TODAY - timedelta(days=6), TODAY)
+OLD_MONTH = (date(2026, 5, 1), date(2026, 5, 31))
+
+
+def queries(store, start, end):
+    return (store.range(start, end), store.range(start, end, "week"), store.totals(start, end))
+
+
+def test_hot_write_inside_range_refreshes(store):
+    rows, weeks, totals = queries(store, *WEEK)
+    store.hot[key(TODAY)]["work_time"] += 100
+
+    fresh_rows, fresh_weeks, fresh_totals = queries(store, *WEEK)
+    assert fresh_rows[-1][1] == rows[-1][1] + 100
+    assert sum(row[1] for row in fresh_weeks) == sum(row[1] for row in weeks) + 100
+    assert fresh_totals["work_time"] == totals["work_time"] + 100
+    assert store.hits == 0
+
+
+def test_hot_write_outside_range_keeps_cache(store):
+    before = queries(store, *OLD_MONTH)
+    store.hot[key(TODAY)]["work_time"] += 100
+    store.hot[key(TODAY + timedelta(days=1))] = {"work_time": 50, "break_time": 0, "idle_time": 0}
+
+    assert queries(store, *OLD_MONTH) == before
+    assert store.hits == 3
+
+
+def test_new_hot_day_inside_range_refreshes(store):
+    tomorrow = TODAY + timedelta(days=1)
+    assert store.totals(TODAY, tomorrow)["days"] == 1
+    store.hot[key(tomorrow)] = {"work_time": 50, "break_time": 0, "idle_time": 0}
+    totals = store.totals(TODAY, tomorrow)
+    assert totals["days"] == 2
+    assert store.range(TODAY, tomorrow)[-1] == (key(tomorrow), 50, 0, 0)
+
+
+def test_archive_rewrite_evicts_only_overlapping_ranges(store, tmp_path):
+    assert key(OLD_MONTH[1]) < archive_cutoff(TODAY)
+    old_rows, _, old_totals = queries(store, *OLD_MONTH)
+    week = queries(store, *WEEK)
+    dates, values = store.column("work_time", OLD_MONTH[1])
+
+    # 其他进程重新归档了五月的一天
+    day = key(date(2026, 5, 10))
+    record = dict(HistoryArchive(str(tmp_path)).get(day), work_time=9999)
+    HistoryArchive(str(tmp_path)).add_days({day: record})
+
+    rows, _, totals = queries(store, *OLD_MONTH)
+    assert dict((row[0], row[1]) for row in rows)[day] == 9999
+    assert totals["work_time"] == old_totals["work_time"] - dict((row[0], row[1]) for row in old_rows)[day] + 9999
+    new_dates, new_values = store.column("work_time", OLD_MONTH[1])
+    assert new_dates == dates
+    assert new_values[dates.index(day)] == 9999
+    assert sum(new_values) == sum(values) - values[dates.index(day)] + 9999
+
+    # 不包含五月的缓存仍然有效
+    hits = store.hits
+    assert queries(store, *WEEK) == week
+    assert store.hits == hits + 3
+
+
+def test_archiving_moves_days_without_changing_results(store):
+    totals = store.totals(None, TODAY)
+    months = store.range(granularity="month")
+    # 把更多的热数据移入归档，查询结果不变
+    archive_old_days(store.hot, store.archive, TODAY, hot_days=10)
+    assert store.totals(None, TODAY) == totals
+    assert store.range(granularity="month") == months
+    assert len(store.hot) <= 31
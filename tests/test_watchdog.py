@@ -0,0 +1,90 @@
+import time
+
+import pytest
+
+from pomodoro.watchdog import StallLog, StallWatchdog
+
+THRESHOLD_MS = 200
+
+
+@pytest.fixture
+def watchdog(qapp, tmp_path):
+    watchdog = StallWatchdog(str(tmp_path), THRESHOLD_MS)
+    yield watchdog
+    watchdog.stop()
+
+
+def beat_for(watchdog, seconds):
+    # 测试中没有事件循环，手动更新心跳
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        watchdog.beat()
+        time.sleep(0.01)
+
+
+def hold_gil():
+    # sum 在C代码中循环，期间不释放 GIL，后台线程无法运行（约0.5秒）
+    return sum(range(2 * 10 ** 7))
+
+
+def test_stall_holding_gil_is_recorded(watchdog):
+    watchdog.start()
+    beat_for(watchdog, 0.2)
+    hold_gil()
+    beat_for(watchdog, 0.3)
+    watchdog.stop()
+
+    records = list(watchdog.log.iter_records())
+    assert len(records) == 1
+    assert records[0]["duration_ms"] > THRESHOLD_MS
+
+
+def test_system_sleep_is_not_recorded(watchdog):
+    sleeping = []
+    awake_clock = watchdog.awake_clock
+    # 模拟系统睡眠：包含睡眠时间的时钟比另一个时钟多走了5秒
+    watchdog.total_clock = lambda: awake_clock() + (5 if sleeping else 0)
+    watchdog.start()
+    beat_for(watchdog, 0.2)
+    sleeping.append(True)
+    hold_gil()
+    beat_for(watchdog, 0.3)
+    watchdog.stop()
+
+    assert list(watchdog.log.iter_records()) == []
+
+
+def test_inactive_watchdog_does_not_wake(watchdog):
+    watchdog.start()
+    watchdog.set_active(False)
+    assert not watchdog.heartbeat.isActive()
+    # 暂停期间没有心跳也不算卡顿
+    time.sleep(THRESHOLD_MS * 2 / 1000)
+
+    watchdog.set_active(True)
+    assert watchdog.heartbeat.isActive()
+    beat_for(watchdog, 0.2)
+
+    started = time.monotonic()
+    watchdog.stop()
+    assert time.monotonic() - started < 1
+    assert list(watchdog.log.iter_records()) == []
+
+
+def test_stop_while_inactive(watchdog):
+    watchdog.start()
+    watchdog.set_active(False)
+    time.sleep(0.1)
+    thread = watchdog.thread
+    watchdog.stop()
+    assert not thread.is_alive()
+
+
+def test_stall_log_rotates(tmp_path):
+    log = StallLog(str(tmp_path / "stalls.jsonl"), max_bytes=100, backups=2)
+    for i in range(10):
+        log.append({"duration_ms": i, "site": "x" * 30})
+    assert len(log.paths()) == 3
+    durations = [record["duration_ms"] for record in log.iter_records()]
+    # 只保留最近的记录，从旧到新
+    assert durations == sorted(durations) and durations[-1] == 9
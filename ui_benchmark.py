@@ -0,0 +1,254 @@
+"""界面渲染基准测试
+
+在无界面的 Qt 平台（offscreen）下测量主窗口和图表的耗时：创建主窗口、按 7/30/365 天刷新历史图表
+（两种图表绘制方式）、生成学习报告的HTML并显示在报告对话框中，以及计时时每秒一次的刷新。
+结果写入JSON文件，可以与其他提交的结果比较：
+
+    python ui_benchmark.py --output before.json
+    python ui_benchmark.py --output after.json --compare before.json
+
+数据写入临时目录，不会影响程序目录中的数据。
+"""
+import os
+import sys
+import json
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+# 预先写入的历史天数，超过热数据天数的部分会在第一次启动时移入归档
+SEED_DAYS = 400
+
+# 历史图表的行数
+ROW_COUNTS = (7, 30, 365)
+
+CHART_BACKENDS = ("raster", "scene")
+
+
+class MessageBoxStub:
+    """不弹出窗口的消息框"""
+
+    def information(self, parent, title, text, *args):
+        pass
+
+    def warning(self, parent, title, text, *args):
+        print(f"警告: {title}: {text}")
+
+
+def seed_history(data_dir: str, today: datetime):
+    from pomodoro.storage import write_json_atomic, HISTORY_FILE_NAME
+
+    history = {}
+    for offset in range(SEED_DAYS, 0, -1):
+        day = (today - timedelta(days=offset)).strftime("%Y-%m-%d")
+        history[day] = {"work_time": 600 * (offset % 37 + 1), "break_time": 120 * (offset % 11 + 1),
+                        "idle_time": 60 * (offset % 7), "updated_at": 0}
+    write_json_atomic(os.path.join(data_dir, HISTORY_FILE_NAME), history)
+
+
+def measure(func: Callable[[], Any], runs: int, setup: Optional[Callable[[], Any]] = None) -> List[float]:
+    """执行 runs 次，返回每次的耗时（毫秒）；setup 在每次之前执行，不计入耗时"""
+    values = []
+    for _ in range(runs):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        func()
+        values.append((time.perf_counter() - started) * 1000)
+    return values
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    return {"median_ms": round(statistics.median(values), 4), "min_ms": round(min(values), 4),
+            "max_ms": round(max(values), 4), "runs": len(values)}
+
+
+def git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def close_window(app, window):
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QEvent
+
+    window.close()
+    window.deleteLater()
+    app.processEvents()
+    QApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+
+
+def run(args) -> Dict[str, Any]:
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QT_VERSION_STR
+
+    import pomodoro.app
+    from pomodoro import dayclock
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    pomodoro.app.QMessageBox = MessageBoxStub()
+    data_dir = tempfile.mkdtemp(prefix="pomodoro_ui_bench_")
+    seed_history(data_dir, dayclock.now())
+
+    results: Dict[str, Dict[str, float]] = {}
+    scene_items: Dict[str, int] = {}
+
+    def record(name: str, values: List[float]):
+        results[name] = summarize(values)
+        print(f"{name:40s} {results[name]['median_ms']:10.3f} ms  (最小 {results[name]['min_ms']:.3f} ms)")
+
+    # 第一次启动会把旧数据移入归档，不计入结果
+    close_window(app, pomodoro.app.PomodoroTimer(app_dir=data_dir))
+
+    # 创建主窗口（包括读取历史和恢复状态）
+    windows = []
+    record("construct", measure(lambda: windows.append(pomodoro.app.PomodoroTimer(app_dir=data_dir)),
+                                args.runs, setup=lambda: windows and close_window(app, windows.pop())))
+    close_window(app, windows.pop())
+
+    for backend in CHART_BACKENDS:
+        pomodoro.app.CHART_BACKEND = backend
+        window = pomodoro.app.PomodoroTimer(app_dir=data_dir)
+        window.show()
+        app.processEvents()
+
+        # 第一次切换到历史记录选项卡：创建图表和日历并绘制
+        pomodoro.app.HISTORY_CHART_DAYS = 7
+        record(f"open_history_tab[{backend}]", measure(
+            lambda: (window.tabs.setCurrentIndex(window.tabs.indexOf(window.history_tab)), app.processEvents()),
+            1))
+
+        viewport = window.chart_view.viewport()
+        for rows in ROW_COUNTS:
+            pomodoro.app.HISTORY_CHART_DAYS = rows
+
+            def invalidate():
+                # 清空图表记住的数据，让每次刷新都真正重新绘制
+                window.chart_widget.rows = []
+
+            def update():
+                window.update_history_display()
+                viewport.repaint()
+
+            record(f"update_history_display[{backend},{rows}]", measure(update, args.runs, setup=invalidate))
+            if backend == "scene":
+                scene_items[str(rows)] = window.chart_widget.item_count()
+        pomodoro.app.HISTORY_CHART_DAYS = 7
+        if backend == "raster":
+            tick_window = window
+        else:
+            close_window(app, window)
+    pomodoro.app.CHART_BACKEND = "raster"
+
+    # 学习报告：生成HTML，再显示在对话框中
+    from pomodoro.report import RENDERERS, REPORT_TYPES, ReportDialog, snapshot_history
+    from pomodoro.analytics import analyze
+
+    engine = tick_window.engine
+    today = dayclock.now().date()
+    record("analytics", measure(lambda: analyze(engine.history_store, today), args.runs))
+    analytics = analyze(engine.history_store, today)
+    dialog = ReportDialog(tick_window)
+    dialog.show()
+    for report_type in REPORT_TYPES:
+        def build():
+            return RENDERERS[report_type](snapshot_history(engine.history_store, report_type, today),
+                                          today, analytics)
+
+        html = build()
+        record(f"report_html[{report_type}]", measure(build, args.runs))
+        record(f"report_set_html[{report_type}]", measure(lambda: (dialog.set_html(html), dialog.repaint()),
+                                                           args.runs))
+    dialog.close()
+
+    # 计时时每秒一次的刷新：只更新界面的部分，以及包括重绘在内的全部耗时
+    tick_window.tabs.setCurrentIndex(0)
+    engine.toggle_timer()
+    engine.timer.stop()
+    engine.time_left = 10 ** 6
+    app.processEvents()
+    tick_runs = args.runs * 20
+    record("tick", measure(engine.update_timer, tick_runs))
+    record("tick_with_paint", measure(lambda: (engine.update_timer(), app.processEvents()), tick_runs))
+    engine.toggle_timer()
+    close_window(app, tick_window)
+
+    return {
+        "meta": {
+            "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "qt": QT_VERSION_STR,
+            "platform": platform.platform(),
+            "qpa": os.environ.get("QT_QPA_PLATFORM"),
+            "runs": args.runs,
+        },
+        "results": results,
+        "scene_items": scene_items,
+    }
+
+
+def compare(current: Dict[str, Any], previous: Dict[str, Any], threshold: float) -> int:
+    """与之前的结果比较，返回变慢超过阈值的项目数"""
+    slower = 0
+    print()
+    print(f"与 {previous['meta'].get('commit') or '之前的结果'} 比较：")
+    for name, result in current["results"].items():
+        old = previous.get("results", {}).get(name)
+        if not old or old["median_ms"] <= 0:
+            continue
+        ratio = result["median_ms"] / old["median_ms"]
+        mark = ""
+        if ratio > 1 + threshold:
+            mark = "  变慢"
+            slower += 1
+        print(f"{name:40s} {old['median_ms']:10.3f} -> {result['median_ms']:10.3f} ms ({ratio - 1:+.0%}){mark}")
+    for rows, count in current["scene_items"].items():
+        old_count = previous.get("scene_items", {}).get(rows)
+        if old_count is not None and old_count != count:
+            print(f"场景图形项数量 ({rows} 行): {old_count} -> {count}")
+    return slower
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="番茄计时器界面渲染基准测试")
+    parser.add_argument("--runs", type=int, default=20, help="每项测量的次数")
+    parser.add_argument("--output", default="ui_benchmark.json", help="结果JSON文件")
+    parser.add_argument("--compare", help="与之前保存的结果JSON比较")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="比较时中位数变慢超过该比例时返回非零退出码")
+    args = parser.parse_args(argv)
+
+    previous = None
+    if args.compare:
+        try:
+            with open(args.compare, "r", encoding="utf-8") as f:
+                previous = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"读取比较结果失败: {e}")
+            return 1
+
+    current = run(args)
+    print(f"场景图形项数量: {current['scene_items']}")
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(current, f, ensure_ascii=False, indent=2)
+    print(f"结果已保存到 {args.output}")
+
+    if previous is not None and compare(current, previous, args.threshold):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())